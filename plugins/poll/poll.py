@@ -34,9 +34,13 @@ class PollWinnerData(TypedDict):
     winnerIdx: int
 
 
-PollStart: DefineMessageIn[PollStartData] = define_message_in("POLL_START")
+PollStart: DefineMessageIn[PollStartData] = define_message_in(
+    "POLL_START", PollStartData
+)
 PollEnd = define_message_in("POLL_END")
-PollCancel: DefineMessageIn[PollCancelData] = define_message_in("POLL_CANCEL")
+PollCancel: DefineMessageIn[PollCancelData] = define_message_in(
+    "POLL_CANCEL", PollCancelData
+)
 PollWinner: DefineMessageOut[PollWinnerData] = define_message_out("POLL_WINNER")
 
 
@@ -0,0 +1,78 @@
+"""Compares sending messages with the default fixed timing of packets against timing adapted at runtime, over a simulated link with a game that misses buttons held down for less than two ticks.
+
+Run from the project root: `python -m scripts.benchmarks.adaptive_timing`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+from src.owtp.timing import TICK
+
+MESSAGES = 30
+BUTTONS_TICKS = 3
+MIN_HELD_TICKS = 2
+RESPONSE_DELAY = 0.3
+"Time between the last packet of a frame and its confirmation showing up in the Workshop log."
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+
+
+async def _measure(adaptive: bool):
+    link = SimulatedLink(
+        [CHAT],
+        response_delay=RESPONSE_DELAY,
+        ticks=BUTTONS_TICKS,
+        adaptive_timing=adaptive,
+    )
+    await link.connect()
+    link.input.min_held_time = MIN_HELD_TICKS * TICK - TICK / 2
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    start = time.perf_counter()
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(Chat({"text": f"gg {idx}"}))
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    link.owtp.cleanup()
+
+    return elapsed, link.input.missed, link.owtp.timing.snapshot()
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'timing':>8} | {'time (s)':>8} | {'missed packets':>14} | {'final ticks (down/up)':>21}"
+    )
+
+    for adaptive in (False, True):
+        elapsed, missed, timing = await _measure(adaptive)
+        ticks = f"{timing['buttons_down_ticks']}/{timing['buttons_up_ticks']}"
+        print(
+            f"{'adaptive' if adaptive else 'fixed':>8} | {elapsed:>8.2f} | {missed:>14} | {ticks:>21}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
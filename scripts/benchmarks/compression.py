@@ -0,0 +1,94 @@
+"""Shows how many packets the optional payload compression saves on realistic outgoing messages, verifying every message with the reference Workshop decoder.
+
+Run from the project root: `python -m scripts.benchmarks.compression`"""
+
+from typing import Any
+
+from scripts.simulation.workshop import SimulatedWorkshop
+from src.owtp import MessageDataType, MessageDefinition, MessageOut
+from src.owtp.timing import TICK
+
+BUTTONS_DOWN_TICKS = 3
+BUTTONS_UP_TICKS = 3
+
+PAYLOADS: list[tuple[str, MessageDataType, Any]] = [
+    ("poll winner", MessageDataType.NUMBER, 2),
+    (
+        "short chat",
+        MessageDataType.STRING,
+        "gg wp everyone, that was close",
+    ),
+    (
+        "long chat",
+        MessageDataType.STRING,
+        "Streamer is definitely going to lose this round, the enemy team has "
+        "been stacking on the point for the whole match and nobody on our side "
+        "is even trying to contest it, this is going to be a long game",
+    ),
+    (
+        "chat spam",
+        MessageDataType.STRING,
+        "LUL LUL LUL LUL LUL LUL LUL LUL !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!",
+    ),
+    (
+        "choices",
+        MessageDataType.ARRAY,
+        [
+            "Low Gravity",
+            "Big Heads",
+            "Speedy",
+            "Low Gravity + Big Heads",
+            "Big Heads + Speedy",
+            "Speedy + Low Gravity",
+        ],
+    ),
+    (
+        "player list",
+        MessageDataType.ARRAY,
+        [
+            {"name": f"Player{idx}", "team": idx % 2, "slot": idx}
+            for idx in range(10)
+        ],
+    ),
+]
+
+
+def main():
+    packet_time = (BUTTONS_DOWN_TICKS + BUTTONS_UP_TICKS) * TICK
+    workshop = SimulatedWorkshop()
+    total_plain = total_compressed = 0
+
+    print(
+        f"{'payload':>12} | {'plain':>5} | {'compressed':>10} | {'saved':>6} | {'time saved (s)':>14}"
+    )
+
+    for label, data_type, value in PAYLOADS:
+        definition = MessageDefinition(
+            "BENCHMARK", [1, 2], {"value": data_type.value}
+        )
+        plain = MessageOut("BENCHMARK", {"value": value})
+        compressed = MessageOut("BENCHMARK", {"value": value})
+        plain.prepare(definition)
+        compressed.prepare(definition, compress=True)
+
+        for packet in plain.packets + compressed.packets:
+            workshop.receive(packet)
+
+        assert not workshop.errors, workshop.errors
+        assert workshop.received[-1] == workshop.received[-2]
+
+        saved = len(plain.packets) - len(compressed.packets)
+        total_plain += len(plain.packets)
+        total_compressed += len(compressed.packets)
+
+        print(
+            f"{label:>12} | {len(plain.packets):>5} | {len(compressed.packets):>10} | {saved / len(plain.packets):>6.1%} | {saved * packet_time:>14.2f}"
+        )
+
+    print(
+        f"{'total':>12} | {total_plain:>5} | {total_compressed:>10} | {1 - total_compressed / total_plain:>6.1%} | {(total_plain - total_compressed) * packet_time:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compares the number of packets needed to stream positions of a moving spectator camera packed as fixed-point values in full and as differences from keyframes, verifying every received message with the reference Workshop decoder. Some messages are lost on the way, to show that it doesn't throw the Workshop mode off.
+
+Run from the project root: `python -m scripts.benchmarks.delta_encoding`"""
+
+import math
+import random
+
+from scripts.simulation.workshop import SimulatedWorkshop
+from src.owtp import (
+    DeltaDecoder,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    Vector,
+)
+
+MESSAGES = 1000
+LOSS_RATE = 0.1
+
+VECTOR = MessageDataType.VECTOR.value
+
+FULL_DEFINITION = MessageDefinition(
+    "CAMERA", [1, 2], {"position": [VECTOR, 2], "facing": [VECTOR, 2, 2]}
+)
+DELTA_DEFINITION = MessageDefinition(
+    "CAMERA",
+    [1, 2],
+    {"position": [VECTOR, 2, 3, 2], "facing": [VECTOR, 2, 2, 1]},
+)
+
+
+def _camera_path(step: int):
+    "Camera slowly circling around the point of interest, always facing it."
+    angle = step / 1000 * math.tau
+    position = Vector(80 * math.cos(angle), 15, 80 * math.sin(angle))
+    return {
+        "position": position,
+        "facing": Vector(-math.cos(angle), -0.2, -math.sin(angle)),
+    }
+
+
+def _stream(definition: MessageDefinition):
+    rng = random.Random(0)
+    workshop = SimulatedWorkshop()
+    decoder = DeltaDecoder(definition.data_types, definition.fixed_point)
+    packets = keyframes = 0
+
+    for step in range(MESSAGES):
+        data = _camera_path(step)
+        message = MessageOut("CAMERA", data)
+        message.prepare(definition)
+        packets += len(message.packets)
+
+        if rng.random() < LOSS_RATE:
+            continue
+
+        # the message got through and has been confirmed
+        for packet in message.packets:
+            workshop.receive(packet)
+
+        if definition.delta_state is None:
+            values, rest = workshop.received[-1].unpack(definition)
+        else:
+            values, rest = decoder.decode(workshop.received[-1].data)
+
+        if message.keyframe and definition.delta_state:
+            definition.delta_state.confirm(message.keyframe)
+            keyframes += 1
+
+        assert not rest
+
+        for name, precision in [("position", 0.005), ("facing", 0.005)]:
+            vector: Vector = data[name]
+            sent = [vector.x, vector.y, vector.z]
+
+            for expected, received in zip(sent, values[name]):  # type: ignore
+                assert abs(expected - received) <= precision + 1e-9
+
+    assert not workshop.errors
+    return packets, keyframes
+
+
+def main():
+    full_packets, _ = _stream(FULL_DEFINITION)
+    delta_packets, keyframes = _stream(DELTA_DEFINITION)
+
+    print(f"{'encoding':>8} | {'packets/message':>15}")
+    print(f"{'full':>8} | {full_packets / MESSAGES:>15.1f}")
+    print(f"{'delta':>8} | {delta_packets / MESSAGES:>15.1f}")
+    print(
+        f"{full_packets / delta_packets:.1f}x fewer packets, {keyframes} confirmed keyframes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compares the number of packets needed to send telemetry-heavy messages with NUMBER and VECTOR fields as text and packed as fixed-point values, verifying packed values with the reference Workshop decoder.
+
+Run from the project root: `python -m scripts.benchmarks.fixed_point`"""
+
+import random
+
+from scripts.simulation.workshop import SimulatedWorkshop
+from src.owtp import MessageDataType, MessageDefinition, MessageOut, Vector
+
+MESSAGES = 1000
+
+VECTOR = MessageDataType.VECTOR.value
+NUMBER = MessageDataType.NUMBER.value
+
+# camera position and facing direction, field of view
+TEXT_DEFINITION = MessageDefinition(
+    "CAMERA", [1, 2], {"position": VECTOR, "facing": VECTOR, "fov": NUMBER}
+)
+PACKED_DEFINITION = MessageDefinition(
+    "CAMERA",
+    [1, 2],
+    {"position": [VECTOR, 2], "facing": [VECTOR, 3, 2], "fov": [NUMBER, 1, 2]},
+)
+
+
+def _random_camera(rng: random.Random):
+    return {
+        "position": Vector(
+            rng.uniform(-300, 300), rng.uniform(-20, 60), rng.uniform(-300, 300)
+        ),
+        "facing": Vector(
+            rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)
+        ),
+        "fov": rng.choice([70, 90, 103]) + rng.random(),
+    }
+
+
+def main():
+    rng = random.Random(0)
+    workshop = SimulatedWorkshop()
+    text_packets = packed_packets = 0
+
+    for _ in range(MESSAGES):
+        data = _random_camera(rng)
+        text = MessageOut("CAMERA", data)
+        packed = MessageOut("CAMERA", data)
+        text.prepare(TEXT_DEFINITION)
+        packed.prepare(PACKED_DEFINITION)
+
+        text_packets += len(text.packets)
+        packed_packets += len(packed.packets)
+
+        for packet in packed.packets:
+            workshop.receive(packet)
+
+        values, rest = workshop.received[-1].unpack(PACKED_DEFINITION)
+        assert not rest
+
+        for name, precision in [("position", 0.005), ("facing", 0.0005)]:
+            vector: Vector = data[name]
+            sent = [vector.x, vector.y, vector.z]
+
+            for expected, received in zip(sent, values[name]):  # type: ignore
+                assert abs(expected - received) <= precision + 1e-9
+
+        assert abs(data["fov"] - values["fov"]) <= 0.05 + 1e-9  # type: ignore
+
+    assert not workshop.errors
+
+    print(f"{'packing':>7} | {'packets/message':>15}")
+    print(f"{'text':>7} | {text_packets / MESSAGES:>15.1f}")
+    print(f"{'packed':>7} | {packed_packets / MESSAGES:>15.1f}")
+    print(f"{text_packets / packed_packets:.1f}x fewer packets")
+
+
+if __name__ == "__main__":
+    main()
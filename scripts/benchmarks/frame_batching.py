@@ -0,0 +1,120 @@
+"""Compares sending a burst of small queued messages one by one against batching them into frames with a single confirmation, over a simulated link with the Workshop mode. Also shows a frame with a message the Workshop mode rejects being split, so the other messages still get through.
+
+Run from the project root: `python -m scripts.benchmarks.frame_batching`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+from src.owtp.timing import TICK
+
+MESSAGES = 20
+RESPONSE_DELAY = 0.3
+"Time between the last packet of a frame and its confirmation showing up in the Workshop log."
+PACKET_TIME = 6 * TICK
+"Time of sending a single packet with the default `buttons_down_ticks` and `buttons_up_ticks`."
+FRAME_SIZES = [0, 32, 64, 128]
+
+SPAWN = MessageDefinition(
+    "SPAWN_BOT", [2, 3], {"hero": MessageDataType.NUMBER.value}
+)
+KICK = MessageDefinition(
+    "KICK", [4, 5], {"slot": MessageDataType.NUMBER.value}
+)
+
+
+class SpawnData(TypedDict):
+    hero: int
+
+
+class KickData(TypedDict):
+    slot: int
+
+
+Spawn: DefineMessageOut[SpawnData] = define_message_out(SPAWN.name)
+Kick: DefineMessageOut[KickData] = define_message_out(KICK.name)
+
+
+async def _measure(max_frame_size: int):
+    link = SimulatedLink(
+        [SPAWN, KICK],
+        [Feature.BATCHING],
+        RESPONSE_DELAY,
+        max_frame_size=max_frame_size,
+    )
+    await link.connect()
+
+    start = time.perf_counter()
+    round_trips, packets = link.round_trips, link.workshop.packets
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(Spawn({"hero": idx}))
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    round_trips = link.round_trips - round_trips
+    packets = link.workshop.packets - packets
+    link.owtp.cleanup()
+
+    return round_trips, packets, elapsed + packets * PACKET_TIME
+
+
+async def _split_failed_frame():
+    link = SimulatedLink(
+        [SPAWN, KICK], [Feature.BATCHING], RESPONSE_DELAY, max_frame_size=64
+    )
+    await link.connect()
+    link.rejected_ids.add(bytes(KICK.id))
+
+    finished: list[MessageOut] = []
+    failed: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    link.owtp.events.send_message_error.on(lambda msg, _: failed.append(msg))
+
+    link.owtp.add_message(Spawn({"hero": 1}))
+    link.owtp.add_message(Kick({"slot": 3}, number_of_attempts=1))
+    link.owtp.add_message(Spawn({"hero": 2}))
+    link.owtp.add_message(Spawn({"hero": 3}))
+
+    while len(finished) + len(failed) < 4:
+        await asyncio.sleep(0.01)
+
+    link.owtp.cleanup()
+    return finished, failed
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'max frame':>9} | {'round trips':>11} | {'packets':>7} | {'est. time (s)':>13}"
+    )
+
+    for size in FRAME_SIZES:
+        round_trips, packets, estimate = await _measure(size)
+        print(
+            f"{size or 'off':>9} | {round_trips:>11} | {packets:>7} | {estimate:>13.2f}"
+        )
+
+    finished, failed = await _split_failed_frame()
+    print(
+        f"\nFrame with a rejected message: sent {[m.name for m in finished]}, failed {[m.name for m in failed]}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Shows how throughput of :class:`WorkshopLogProcessor` changes with the size of bursts of Workshop output.
+
+Run from the project root: `python -m scripts.benchmarks.log_batches`"""
+
+import asyncio
+import statistics
+from typing import Any
+
+from src.logging import set_logging
+from src.owtp import DefineMessageIn, MessageIn, OWTPEvents, define_message_in
+from src.owtp.latency import LatencyMetrics
+from src.owtp.log_processor import WorkshopLogProcessor
+
+BURST_SIZES = [1, 10, 50, 200, 1000]
+LINES = 20_000
+
+EchoMessage: DefineMessageIn[Any] = define_message_in("ECHO")
+LINE = '[12:34:56] [["OWTP_messageName","ECHO"],["text","Lorem ipsum"],["value",42]]'
+
+
+class _StubOWTP:
+    "Bare minimum of :class:`OWTP` needed by the processor."
+
+    def __init__(self):
+        self._stop_event = asyncio.Event()
+        self.events = OWTPEvents()
+        self.latency = LatencyMetrics()
+        self.registered_messages_in = {EchoMessage.name: EchoMessage}
+        self.received = 0
+
+    async def _dispatch_message(self, _: MessageIn):
+        self.received += 1
+
+
+async def _measure(burst_size: int):
+    owtp = _StubOWTP()
+    processor = WorkshopLogProcessor(owtp)  # type: ignore
+
+    for _ in range(LINES // burst_size):
+        processor.add_lines([LINE] * burst_size)
+        # let the watcher deliver the next burst on the next loop iteration
+        await asyncio.sleep(0)
+
+    await processor.join()
+    processor.cleanup()
+
+    assert owtp.received == LINES // burst_size * burst_size
+    return list(processor.batch_timings)
+
+
+async def _main():
+    set_logging(None)
+
+    print(
+        f"{'burst':>6} | {'lines/batch':>11} | {'µs/line':>8} | {'parse µs/line':>13} | {'lines/s':>10}"
+    )
+
+    for burst_size in BURST_SIZES:
+        timings = await _measure(burst_size)
+        lines = sum(t.lines for t in timings)
+        total = sum(t.total_time for t in timings)
+        parse = sum(t.parse_time for t in timings)
+
+        print(
+            f"{burst_size:>6} | {statistics.mean(t.lines for t in timings):>11.1f} | {total / lines * 1e6:>8.2f} | {parse / lines * 1e6:>13.2f} | {lines / total:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
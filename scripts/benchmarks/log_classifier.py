@@ -0,0 +1,87 @@
+"""Compares classifying mixed Workshop output by attempting to decode every line against the cheap structural check done by :class:`WorkshopLogProcessor`.
+
+Run from the project root: `python -m scripts.benchmarks.log_classifier`"""
+
+import random
+import timeit
+
+from src.owtp.log_processor import WorkshopLogProcessor
+
+LINES = 10_000
+MESSAGE_RATIOS = [0.0, 0.1, 0.5, 0.9]
+REPEATS = 5
+
+PLAIN_LINES = [
+    "[12:34:56] Round started",
+    "[12:34:56] Player 3 picked up health pack at (12.5, 3.0, -7.25)",
+    "[12:34:56] [1, 2, 3]",
+    '[12:34:56] ["debug", "value", 42]',
+    "[12:34:56] Debug: mutator queue = {Low Gravity, Big Heads}",
+]
+MESSAGE_LINES = [
+    '[12:34:56] [["OWTP_messageName","OWTP_CONFIRM"]]',
+    '[12:34:56] [["OWTP_messageName","REGISTER_PLAYER"],["name","Patriq"],["team",1],["slot",3]]',
+    '[12:34:56] [["OWTP_messageName","POLL_START"],["timeout",30],["choices",["Low Gravity","Big Heads","Speedy"]]]',
+]
+
+
+def _decode_everything(lines: list[str]):
+    "Previous behaviour - decode every line, treating failures as plain logs."
+    logs = 0
+
+    for line in lines:
+        try:
+            WorkshopLogProcessor.parse_workshop_output(line)
+        except Exception:
+            logs += 1
+
+    return logs
+
+
+def _classify_first(lines: list[str]):
+    logs = 0
+
+    for line in lines:
+        _, payload = WorkshopLogProcessor.split_workshop_output(line)
+
+        if not WorkshopLogProcessor.is_message_payload(payload):
+            logs += 1
+            continue
+
+        try:
+            WorkshopLogProcessor.parse_payload(payload)
+        except Exception:
+            logs += 1
+
+    return logs
+
+
+def main():
+    rng = random.Random(0)
+
+    print(
+        f"{'messages':>8} | {'decode all (µs/line)':>20} | {'classify (µs/line)':>18} | {'speedup':>7}"
+    )
+
+    for ratio in MESSAGE_RATIOS:
+        lines = [
+            rng.choice(MESSAGE_LINES if rng.random() < ratio else PLAIN_LINES)
+            for _ in range(LINES)
+        ]
+
+        assert _decode_everything(lines) == _classify_first(lines)
+
+        old = min(
+            timeit.repeat(lambda: _decode_everything(lines), number=1, repeat=REPEATS)
+        )
+        new = min(
+            timeit.repeat(lambda: _classify_first(lines), number=1, repeat=REPEATS)
+        )
+
+        print(
+            f"{ratio:>8.0%} | {old / LINES * 1e6:>20.2f} | {new / LINES * 1e6:>18.2f} | {old / new:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
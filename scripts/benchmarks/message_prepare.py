@@ -0,0 +1,114 @@
+"""Compares the cost of :meth:`MessageOut.prepare` using encoders compiled per message definition against the previous generic implementation, for large STRING and ARRAY payloads.
+
+Run from the project root: `python -m scripts.benchmarks.message_prepare`"""
+
+import json
+import random
+import string
+import timeit
+from typing import Any
+
+from src.owtp import (
+    ALPHABET,
+    MessageDefinition,
+    MessageDataType,
+    MessageOut,
+    ReservedPackets,
+)
+
+SIZES = [10, 100, 1000, 10_000]
+REPEATS = 5
+
+
+def _legacy_checksum(data: list[int]):
+    mod = 113
+    mix_a = 73
+    mix_b = 59
+
+    def _norm(value: int) -> int:
+        v = value % mod
+        return v if v != 0 else mod - 1
+
+    sum_part = 0
+    prod_part = 1
+
+    for i, x in enumerate(data):
+        sum_part = _norm(sum_part + (x * (i + 1) * mix_a))
+        prod_part = _norm(prod_part * (x + mix_b + i))
+
+    return [sum_part, prod_part]
+
+
+def _legacy_prepare(definition: MessageDefinition, data: dict[str, Any]):
+    "Previous implementation - JSON dump of the values, per character alphabet lookup and per element checksum."
+    prepared_data = [data[name] for name in definition.data_types]
+    data_packets = [
+        ALPHABET.index(char) + 1
+        for char in json.dumps(prepared_data, separators=(",", ":"))[1:-1]
+    ]
+    checksum = _legacy_checksum(definition.id + data_packets)
+
+    packets = [ReservedPackets.START_END_CONFIRM.value]
+    packets += checksum
+    packets.append(ReservedPackets.COMMA.value)
+    packets += definition.id
+    packets.append(ReservedPackets.COMMA.value)
+    packets += data_packets
+    packets.append(ReservedPackets.START_END_CONFIRM.value)
+
+    return packets
+
+
+def _payloads(rng: random.Random, size: int):
+    text = "".join(rng.choice(string.printable[:94]) for _ in range(size))
+    array = [
+        rng.choice([rng.randint(-1000, 1000), rng.random() * 100, "abc"])
+        for _ in range(max(size // 5, 1))
+    ]
+
+    return [
+        ("STRING", MessageDataType.STRING, text),
+        ("ARRAY", MessageDataType.ARRAY, array),
+    ]
+
+
+def main():
+    rng = random.Random(0)
+
+    print(
+        f"{'type':>6} | {'size':>6} | {'packets':>7} | {'legacy (µs)':>11} | {'compiled (µs)':>13} | {'speedup':>7}"
+    )
+
+    for size in SIZES:
+        for label, data_type, value in _payloads(rng, size):
+            definition = MessageDefinition(
+                "BENCHMARK", [1, 2], {"value": data_type.value}
+            )
+            data = {"value": value}
+            message = MessageOut("BENCHMARK", data)
+            message.prepare(definition)
+
+            assert list(message.packets) == _legacy_prepare(definition, data)
+
+            legacy = min(
+                timeit.repeat(
+                    lambda: _legacy_prepare(definition, data),
+                    number=10,
+                    repeat=REPEATS,
+                )
+            )
+            compiled = min(
+                timeit.repeat(
+                    lambda: message.prepare(definition),
+                    number=10,
+                    repeat=REPEATS,
+                )
+            )
+
+            print(
+                f"{label:>6} | {size:>6} | {len(message.packets):>7} | {legacy / 10 * 1e6:>11.1f} | {compiled / 10 * 1e6:>13.1f} | {legacy / compiled:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Shows how many keypresses wider packets, typed using additional keybinds, save on realistic outgoing messages, verifying every frame with the reference Workshop decoder. Also sends a few messages over a simulated link with negotiated packet width.
+
+Run from the project root: `python -m scripts.benchmarks.packet_width`"""
+
+import asyncio
+from typing import TypedDict
+
+from scripts.benchmarks.compression import PAYLOADS
+from scripts.simulation.link import SimulatedLink
+from scripts.simulation.workshop import SimulatedWorkshop
+from src.logging import set_logging
+from src.owtp import (
+    BASE_PACKET_WIDTH,
+    MAX_PACKET_WIDTH,
+    DefineMessageOut,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    PacketWidth,
+    define_message_out,
+)
+
+WIDTHS = range(BASE_PACKET_WIDTH, MAX_PACKET_WIDTH + 1)
+LINK_WIDTH = 10
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out("CHAT")
+
+
+def _count_packets(width: int):
+    workshop = SimulatedWorkshop()
+    encoder = PacketWidth(width)
+    total = 0
+
+    for _, data_type, value in PAYLOADS:
+        definition = MessageDefinition(
+            "BENCHMARK", [1, 2], {"value": data_type.value}
+        )
+        message = MessageOut("BENCHMARK", {"value": value})
+        message.prepare(definition)
+        packets = encoder.encode(message.packets)
+
+        for packet in packets:
+            workshop.receive(packet)
+
+        assert not workshop.errors, workshop.errors
+        assert workshop.received[-1].data == message.packets[7:-1]
+        total += len(packets)
+
+    return total
+
+
+async def _send_over_link():
+    chat = MessageDefinition(
+        Chat.name, [2, 3], {"text": MessageDataType.STRING.value}
+    )
+    link = SimulatedLink([chat], packet_width=LINK_WIDTH)
+    await link.connect()
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+
+    for text in ("gg", "that was close", "rematch?"):
+        link.owtp.add_message(Chat({"text": text}))
+
+    while len(finished) < 3:
+        await asyncio.sleep(0.01)
+
+    width = link.owtp.packet_width
+    texts = [message.text for message in link.workshop.received[1:]]
+    link.owtp.cleanup()
+
+    return width, texts
+
+
+def main():
+    set_logging(40)
+    baseline = _count_packets(BASE_PACKET_WIDTH)
+
+    print(f"{'width':>5} | {'packets':>7} | {'saved':>6}")
+
+    for width in WIDTHS:
+        packets = _count_packets(width)
+        print(f"{width:>5} | {packets:>7} | {1 - packets / baseline:>6.1%}")
+
+    width, texts = asyncio.run(_send_over_link())
+    print(f"\nNegotiated {width} bits over a simulated link, received {texts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compares goodput of frames carrying different numbers of parity segments, over a simulated link with a Workshop mode that receives some packets corrupted. Damaged segments that can't be rebuilt are resent selectively in every case.
+
+Run from the project root: `python -m scripts.benchmarks.parity`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    add_parity,
+    define_message_out,
+    segment_frame,
+)
+
+MESSAGES = 5
+CORRUPTION_RATES = [0.005, 0.01, 0.02]
+PARITY_SEGMENTS = [0, 1, 2, 4]
+RESPONSE_DELAY = 0.05
+ATTEMPTS = 50
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+TEXT = "the quick brown fox jumps over the lazy dog, " * 4
+
+
+async def _measure(parity_segments: int, corruption: float):
+    features = [Feature.SELECTIVE_RETRANSMISSION]
+
+    if parity_segments:
+        features.append(Feature.PARITY)
+
+    link = SimulatedLink(
+        [CHAT],
+        features,
+        RESPONSE_DELAY,
+        adaptive_timing=False,
+        parity_segments=parity_segments,
+    )
+    await link.connect()
+    link.input.corruption = corruption
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    start = time.perf_counter()
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(
+            Chat({"text": f"{idx} {TEXT}"}, number_of_attempts=ATTEMPTS)
+        )
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    texts = [message.text for message in link.workshop.received[1:]]
+    payload = sum(len(message.packets) for message in finished)
+    link.owtp.cleanup()
+
+    assert texts == [f'"{idx} {TEXT}"' for idx in range(MESSAGES)], texts
+
+    return payload, link.workshop.packets, len(link.workshop.errors), elapsed
+
+
+async def main():
+    set_logging(40)
+
+    packets = Chat({"text": f"0 {TEXT}"})
+    packets.prepare(CHAT)
+    frame = segment_frame(packets.packets)
+
+    print(
+        f"{'corruption':>10} | {'parity':>6} | {'overhead':>8} | {'packets':>7} | {'errors':>6} | {'goodput':>7} | {'time (s)':>8}"
+    )
+
+    for corruption in CORRUPTION_RATES:
+        for parity_segments in PARITY_SEGMENTS:
+            overhead = (
+                len(add_parity(frame, parity_segments))
+                if parity_segments
+                else len(frame)
+            ) / len(packets.packets) - 1
+            payload, sent, errors, elapsed = await _measure(
+                parity_segments, corruption
+            )
+            print(
+                f"{corruption:>10.1%} | {parity_segments:>6} | {overhead:>8.1%} | {sent:>7} | {errors:>6} | {payload / sent:>7.1%} | {elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
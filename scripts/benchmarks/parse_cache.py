@@ -0,0 +1,75 @@
+"""Compares parsing Workshop output with and without the parse cache of :class:`WorkshopLogProcessor` for different shares of repeated lines.
+
+Run from the project root: `python -m scripts.benchmarks.parse_cache`"""
+
+import asyncio
+import random
+import timeit
+from typing import Any
+
+from src.owtp import DefineMessageIn, OWTPEvents, define_message_in
+from src.owtp.latency import LatencyMetrics
+from src.owtp.log_processor import WorkshopLogProcessor
+
+LINES = 10_000
+REPEATED_RATIOS = [0.0, 0.5, 0.9, 0.99]
+REPEATS = 5
+
+PollStart: DefineMessageIn[Any] = define_message_in("POLL_START")
+REPEATED_LINE = '[12:34:56] [["OWTP_messageName","POLL_START"],["timeout",30],["choices",["Low Gravity","Big Heads","Speedy"]]]'
+
+
+class _StubOWTP:
+    "Bare minimum of :class:`OWTP` needed by the processor."
+
+    def __init__(self):
+        self._stop_event = asyncio.Event()
+        self.events = OWTPEvents()
+        self.latency = LatencyMetrics()
+        self.registered_messages_in = {PollStart.name: PollStart}
+
+
+def _unique_line(idx: int):
+    return f'[12:34:56] [["OWTP_messageName","POLL_START"],["timeout",{idx}],["choices",["Low Gravity","Big Heads","Speedy"]]]'
+
+
+async def main():
+    rng = random.Random(0)
+
+    print(
+        f"{'repeated':>8} | {'uncached (µs/line)':>18} | {'cached (µs/line)':>16} | {'hit rate':>8} | {'speedup':>7}"
+    )
+
+    for ratio in REPEATED_RATIOS:
+        lines = [
+            REPEATED_LINE if rng.random() < ratio else _unique_line(idx)
+            for idx in range(LINES)
+        ]
+
+        processor = WorkshopLogProcessor(_StubOWTP())  # type: ignore
+
+        def parse_uncached():
+            for line in lines:
+                processor.clear_parse_cache()
+                processor._parse_line(line)  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+
+        def parse_cached():
+            processor.clear_parse_cache()
+            for line in lines:
+                processor._parse_line(line)  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+
+        uncached = min(timeit.repeat(parse_uncached, number=1, repeat=REPEATS))
+
+        processor.parse_cache_stats.hits = processor.parse_cache_stats.misses = 0
+        cached = min(timeit.repeat(parse_cached, number=1, repeat=REPEATS))
+        hit_rate = processor.parse_cache_stats.hit_rate
+
+        processor.cleanup()
+
+        print(
+            f"{ratio:>8.0%} | {uncached / LINES * 1e6:>18.2f} | {cached / LINES * 1e6:>16.2f} | {hit_rate:>8.1%} | {uncached / cached:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Compares the throughput of waiting for a confirmation of every frame against keeping several frames awaiting confirmation at once, over a simulated link with the Workshop mode in real time.
+
+Run from the project root: `python -m scripts.benchmarks.pipelining`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+
+MESSAGES = 20
+TICKS = 1
+"Number of ticks every button is held down and released for, kept low so the benchmark finishes quickly."
+RESPONSE_DELAY = 0.3
+"Time between the last packet of a frame and its confirmation showing up in the Workshop log."
+WINDOW_SIZES = [1, 2, 4, 8]
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+
+
+async def _measure(window_size: int):
+    link = SimulatedLink(
+        [CHAT],
+        [Feature.PIPELINING],
+        RESPONSE_DELAY,
+        TICKS,
+        window_size=window_size,
+    )
+    await link.connect()
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    start = time.perf_counter()
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(Chat({"text": f"hello {idx}"}))
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    texts = [message.text for message in link.workshop.received[1:]]
+    link.owtp.cleanup()
+
+    assert not link.workshop.errors, link.workshop.errors
+    assert sorted(texts) == sorted(
+        f'"hello {idx}"' for idx in range(MESSAGES)
+    ), texts
+
+    return elapsed
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'window':>6} | {'time (s)':>8} | {'messages/s':>10} | {'speedup':>7}"
+    )
+    baseline = None
+
+    for window_size in WINDOW_SIZES:
+        elapsed = await _measure(window_size)
+        baseline = baseline or elapsed
+        print(
+            f"{window_size:>6} | {elapsed:>8.2f} | {MESSAGES / elapsed:>10.2f} | {baseline / elapsed:>6.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Measures how long an urgent message waits while a long message of lower priority is being typed, with and without preempting the frame in flight, over a simulated link with the Workshop mode in real time.
+
+Run from the project root: `python -m scripts.benchmarks.preemption`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+    is_message_out,
+)
+from src.owtp.dispatcher import PREEMPTING_PRIORITY
+
+TICKS = 1
+"Number of ticks every button is held down and released for, kept low so the benchmark finishes quickly."
+RESPONSE_DELAY = 0.3
+"Time between the last packet of a frame and its confirmation showing up in the Workshop log."
+URGENT_AFTER = 0.5
+"Time after which the urgent message is added, while the long one is still being typed."
+URGENT_PRIORITY = PREEMPTING_PRIORITY - 1
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+LONG_TEXT = "the quick brown fox jumps over the lazy dog, " * 4
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+UrgentChat: DefineMessageOut[ChatData] = define_message_out(
+    CHAT.name, URGENT_PRIORITY
+)
+
+
+async def _measure(pipelining: bool, preempting: bool):
+    link = SimulatedLink(
+        [CHAT],
+        [Feature.PREEMPTION, *([Feature.PIPELINING] if pipelining else [])],
+        RESPONSE_DELAY,
+        TICKS,
+        adaptive_timing=False,
+        preempting_priority=PREEMPTING_PRIORITY if preempting else None,
+    )
+    await link.connect()
+
+    finished: dict[MessageOut[ChatData], float] = {}
+
+    def on_finish(message: MessageOut):
+        if is_message_out(message, Chat):
+            finished.setdefault(message, time.perf_counter())
+
+    link.owtp.events.send_message_finish.on(on_finish)
+    start = time.perf_counter()
+
+    long = Chat({"text": LONG_TEXT})
+    link.owtp.add_message(long)
+    await asyncio.sleep(URGENT_AFTER)
+
+    urgent_at = time.perf_counter()
+    urgent = UrgentChat({"text": "urgent"})
+    link.owtp.add_message(urgent)
+
+    while len(finished) < 2:
+        await asyncio.sleep(0.01)
+
+    texts = [message.text for message in link.workshop.received[1:]]
+    link.owtp.cleanup()
+
+    assert not link.workshop.errors, link.workshop.errors
+    assert sorted(texts) == sorted(['"urgent"', f'"{LONG_TEXT}"']), texts
+
+    return (
+        finished[urgent] - urgent_at,
+        max(finished.values()) - start,
+        link.workshop.aborted,
+    )
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'mode':>10} | {'preemption':>10} | {'urgent latency (s)':>18} | {'total (s)':>9} | {'aborted':>7}"
+    )
+
+    for pipelining in (False, True):
+        for preempting in (False, True):
+            latency, total, aborted = await _measure(pipelining, preempting)
+            mode = "pipelined" if pipelining else "stop-wait"
+            print(
+                f"{mode:>10} | {str(preempting):>10} | {latency:>18.2f} | {total:>9.2f} | {aborted:>7}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Measures how timeouts and retry back-off estimated from round trip times behave on a link whose confirmations take longer than the initial timeout and on a fast link that corrupts some packets.
+
+Run from the project root: `python -m scripts.benchmarks.round_trip`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+
+MESSAGES = 10
+SCENARIOS = [
+    ("slow log", 2.0, 0.0, "gg"),
+    ("fast, corrupted", 0.05, 0.01, "the quick brown fox jumps over the lazy dog"),
+]
+"Name, time between the last packet of a frame and its confirmation showing up in the Workshop log, corruption of packets and the text sent."
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+
+
+async def _measure(response_delay: float, corruption: float, text: str):
+    link = SimulatedLink(
+        [CHAT], response_delay=response_delay, adaptive_timing=False
+    )
+    await link.connect()
+    link.input.corruption = corruption
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    start = time.perf_counter()
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(Chat({"text": f"{idx} {text}"}, 20))
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    tries = link.workshop.frames + len(link.workshop.errors) - 1
+    round_trip = link.owtp.latency.round_trip
+    link.owtp.cleanup()
+
+    return elapsed, tries, round_trip.summary()
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'scenario':>15} | {'time (s)':>8} | {'tries':>5} | {'srtt (s)':>8} | {'timeout (s)':>11} | {'timeouts':>8}"
+    )
+
+    for name, response_delay, corruption, text in SCENARIOS:
+        elapsed, tries, summary = await _measure(
+            response_delay, corruption, text
+        )
+        print(
+            f"{name:>15} | {elapsed:>8.2f} | {tries:>5} | {summary['smoothed'] or 0:>8.2f} | {summary['timeout']:>11.2f} | {summary['timeouts']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
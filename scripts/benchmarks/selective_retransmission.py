@@ -0,0 +1,85 @@
+"""Compares resending whole frames against resending only their damaged segments, over a simulated link with a Workshop mode that receives some packets corrupted.
+
+Run from the project root: `python -m scripts.benchmarks.selective_retransmission`"""
+
+import asyncio
+import time
+from typing import TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.logging import set_logging
+from src.owtp import (
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+
+MESSAGES = 5
+CORRUPTION_RATES = [0.002, 0.005, 0.01]
+RESPONSE_DELAY = 0.05
+ATTEMPTS = 50
+"Number of tries of a message, high enough for whole frames to get through eventually."
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+TEXT = "the quick brown fox jumps over the lazy dog, " * 4
+
+
+async def _measure(selective: bool, corruption: float):
+    features: list[Feature] = (
+        [Feature.SELECTIVE_RETRANSMISSION] if selective else []
+    )
+    link = SimulatedLink(
+        [CHAT], features, RESPONSE_DELAY, adaptive_timing=False
+    )
+    await link.connect()
+    link.input.corruption = corruption
+
+    finished: list[MessageOut] = []
+    link.owtp.events.send_message_finish.on(finished.append)
+    start = time.perf_counter()
+
+    for idx in range(MESSAGES):
+        link.owtp.add_message(
+            Chat({"text": f"{idx} {TEXT}"}, number_of_attempts=ATTEMPTS)
+        )
+
+    while len(finished) < MESSAGES:
+        await asyncio.sleep(0.01)
+
+    elapsed = time.perf_counter() - start
+    texts = [message.text for message in link.workshop.received[1:]]
+    link.owtp.cleanup()
+
+    assert texts == [f'"{idx} {TEXT}"' for idx in range(MESSAGES)], texts
+
+    return link.workshop.packets, len(link.workshop.errors), elapsed
+
+
+async def main():
+    set_logging(40)
+
+    print(
+        f"{'corruption':>10} | {'mode':>9} | {'packets':>7} | {'errors':>6} | {'time (s)':>8}"
+    )
+
+    for corruption in CORRUPTION_RATES:
+        for selective in (False, True):
+            packets, errors, elapsed = await _measure(selective, corruption)
+            mode = "segments" if selective else "frames"
+            print(
+                f"{corruption:>10.1%} | {mode:>9} | {packets:>7} | {errors:>6} | {elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
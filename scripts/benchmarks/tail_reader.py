@@ -0,0 +1,94 @@
+"""Measures per-event cost of :class:`TextFileEventHandler.read_file` as the Workshop log grows.
+
+Run from the project root: `python -m scripts.benchmarks.tail_reader`"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+from src.file_watcher.text import TextFileEventHandler
+
+LINE = '[12:34:56] [["OWTP_messageName","ECHO"],["text","Lorem ipsum dolor sit amet"]]\n'
+LOG_SIZES = [1_000, 10_000, 100_000, 500_000]
+LINES_PER_EVENT = 5
+EVENTS = 200
+
+
+def _create_log(directory: str, size: int):
+    path = os.path.join(directory, "Log-2026-01-01-00-00-00.txt")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(LINE * size)
+
+    return path
+
+
+def _measure(path: str, read: Callable[[], None]):
+    "Appends lines to the log and returns average time spent in `read` per event."
+    elapsed = 0.0
+
+    with open(path, "a", encoding="utf-8") as f:
+        for _ in range(EVENTS):
+            f.write(LINE * LINES_PER_EVENT)
+            f.flush()
+
+            start = time.perf_counter()
+            read()
+            elapsed += time.perf_counter() - start
+
+    return elapsed / EVENTS
+
+
+def _bench_tail(directory: str, size: int):
+    path = _create_log(directory, size)
+    received: list[str] = []
+
+    handler = TextFileEventHandler(
+        on_create=lambda _: None,
+        on_modify=received.extend,
+        on_close=lambda _: None,
+    )
+    handler.read_file(path)
+
+    result = _measure(path, lambda: handler.read_file(path))
+    assert len(received) == size + EVENTS * LINES_PER_EVENT
+
+    return result
+
+
+def _bench_full_read(directory: str, size: int):
+    "Reference implementation re-reading the whole file on every event."
+    path = _create_log(directory, size)
+    previous: list[str] = []
+
+    def read():
+        nonlocal previous
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.readlines()
+        _ = content[len(previous) :]
+        previous = content
+
+    read()
+    return _measure(path, read)
+
+
+def main():
+    print(
+        f"{'log lines':>10} | {'tail read (µs/event)':>20} | {'full read (µs/event)':>20}"
+    )
+
+    for size in LOG_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            tail_time = _bench_tail(directory, size)
+
+        with tempfile.TemporaryDirectory() as directory:
+            full_time = _bench_full_read(directory, size)
+
+        print(
+            f"{size:>10} | {tail_time * 1e6:>20.1f} | {full_time * 1e6:>20.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
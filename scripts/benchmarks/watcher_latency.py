@@ -0,0 +1,89 @@
+"""Compares latency between appending a line to a Workshop log and receiving it on the event loop, for each :class:`FileWatcherBackend`, and how many modify events were coalesced into a single read.
+
+Run from the project root: `python -m scripts.benchmarks.watcher_latency`"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import TextIO
+
+from src.file_watcher import FileWatcherBackend, WorkshopLogFileWatcher
+
+BURSTS = 100
+BURST_SIZE = 10
+LINE_INTERVAL = 0.0002
+BURST_INTERVAL = 0.01
+COALESCE_WINDOWS = [0.0, 0.005]
+
+
+def _write_bursts(f: TextIO, written: dict[str, float]):
+    for burst in range(BURSTS):
+        # every flush results in a separate modify event
+        for i in range(BURST_SIZE):
+            line = f"[00:00:00] line {burst}-{i}"
+            written[line] = time.perf_counter()
+            f.write(line + "\n")
+            f.flush()
+            time.sleep(LINE_INTERVAL)
+
+        time.sleep(BURST_INTERVAL)
+
+
+async def _measure(backend: FileWatcherBackend, coalesce_window: float):
+    latencies: list[float] = []
+    written: dict[str, float] = {}
+    created = asyncio.Event()
+
+    def on_modify(lines: list[str]):
+        now = time.perf_counter()
+        latencies.extend(now - written[line] for line in lines)
+
+    with tempfile.TemporaryDirectory() as directory:
+        watcher = WorkshopLogFileWatcher(
+            directory,
+            asyncio.get_running_loop(),
+            on_create=lambda _: created.set(),
+            on_modify=on_modify,
+            on_close=lambda _: None,
+            backend=backend,
+            coalesce_window=coalesce_window,
+        )
+        path = os.path.join(directory, "Workshop", "Log-2026-01-01.txt")
+
+        try:
+            # like the game, keep the log open until everything's written
+            with open(path, "a", encoding="utf-8") as f:
+                await asyncio.wait_for(created.wait(), 5)
+                await asyncio.to_thread(_write_bursts, f, written)
+
+            # give the last events some time to arrive
+            await asyncio.sleep(0.5)
+        finally:
+            watcher.cleanup()
+
+    return latencies, watcher.stats
+
+
+async def _main():
+    print(
+        f"{'backend':>10} | {'window (ms)':>11} | {'received':>8} | {'p50 (µs)':>10} | {'p90 (µs)':>10} | {'p99 (µs)':>10} | {'events':>6} | {'reads':>6}"
+    )
+
+    for backend in [FileWatcherBackend.WATCHDOG, FileWatcherBackend.INOTIFY]:
+        for window in COALESCE_WINDOWS:
+            try:
+                latencies, stats = await _measure(backend, window)
+            except OSError as e:
+                print(f"{backend.value:>10} | not supported: {e}")
+                break
+
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{backend.value:>10} | {window * 1e3:>11} | {len(latencies):>8} | {quantiles[49] * 1e6:>10.0f} | {quantiles[89] * 1e6:>10.0f} | {quantiles[98] * 1e6:>10.0f} | {stats.events:>6} | {stats.reads:>6}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,203 @@
+"""Connects a real :class:`OWTP` instance with :class:`SimulatedWorkshop`, replacing the keyboard with a simulated input method and the Workshop log with responses written straight into :meth:`OWTP.add_workshop_output`.
+
+Used by benchmarks to exercise the whole transmission logic without the game."""
+
+import asyncio
+import json
+import random
+from typing import Any
+
+from src.owtp import (
+    BASE_PACKET_WIDTH,
+    OWTP,
+    ErrorCode,
+    Feature,
+    MessageDefinition,
+    MessageName,
+    ReservedPackets,
+)
+
+from .workshop import (
+    InvalidFrame,
+    ReceivedMessage,
+    SimulatedWorkshop,
+    read_sequence,
+)
+
+WORKSHOP_VERSION = "0.2.0"
+
+
+def _as_key_value_pairs(value: Any) -> Any:
+    "Converts dicts into lists of key-value pairs, which is how the Workshop mode logs structures."
+    if isinstance(value, dict):
+        return [
+            [key, _as_key_value_pairs(item)]
+            for key, item in value.items()  # pyright: ignore[reportUnknownVariableType]
+        ]
+
+    return value
+
+
+def workshop_output(message_name: str, /, **data: Any):
+    "Formats a message the way the Workshop mode logs it."
+    pairs = _as_key_value_pairs({"OWTP_messageName": message_name, **data})
+    return f"[00:00:00] {json.dumps(pairs, separators=(',', ':'))}"
+
+
+class SimulatedInput:
+    """Input method pressing buttons of the simulated Workshop mode instead of the keyboard. Buttons held down for less than `min_held_time` seconds are missed, like they are by a game that's struggling to keep up.
+
+    With probability `corruption`, a packet other than the start or the end of a frame is received as a different one."""
+
+    name = "Simulated"
+
+    def __init__(
+        self,
+        workshop: SimulatedWorkshop,
+        min_held_time: float = 0.0,
+        packet_width: int = BASE_PACKET_WIDTH,
+        corruption: float = 0.0,
+        seed: int = 0,
+    ):
+        self.workshop = workshop
+        self.min_held_time = min_held_time
+        self.packet_width = packet_width
+        self.corruption = corruption
+        self.missed = 0
+        self.corrupted = 0
+        self._random = random.Random(seed)
+
+    async def send_input(self, key: int, held_time: float):
+        await asyncio.sleep(held_time)
+
+        if held_time < self.min_held_time:
+            self.missed += 1
+            return
+
+        # start and end packets have all the bits set
+        if key & (key + 1) and self._random.random() < self.corruption:
+            key = self._random.choice(
+                [
+                    packet
+                    for packet in range(1, ReservedPackets.CONNECT.value)
+                    if packet != key
+                ]
+            )
+            self.corrupted += 1
+
+        self.workshop.receive(key)
+
+
+class SimulatedLink:
+    "Workshop mode on the other side of an :class:`OWTP` connection, confirming every valid frame after `response_delay` seconds."
+
+    def __init__(
+        self,
+        definitions: list[MessageDefinition],
+        features: list[Feature] | None = None,
+        response_delay: float = 0.0,
+        ticks: int = 0,
+        packet_width: int = BASE_PACKET_WIDTH,
+        **owtp_options: Any,
+    ):
+        self.workshop = SimulatedWorkshop(
+            self._on_frame,
+            self._on_error,
+            bool(
+                {Feature.SELECTIVE_RETRANSMISSION, Feature.PARITY}
+                & set(features or [])
+            ),
+            Feature.PARITY in (features or []),
+            Feature.PREEMPTION in (features or []),
+        )
+        self.input = SimulatedInput(self.workshop, packet_width=packet_width)
+        self.owtp = OWTP(
+            self.input,  # type: ignore
+            ticks,
+            ticks,
+            **owtp_options,
+        )
+        self.response_delay = response_delay
+        self.rejected_ids: set[bytes] = set()
+        "Ids of messages the Workshop mode rejects, e.g. to simulate a message it cannot handle."
+        self.round_trips = 0
+
+        self._definitions = definitions
+        self._features = features or []
+
+    async def connect(self):
+        connected = asyncio.Event()
+        self.owtp.events.connect.on(lambda _: connected.set())
+        self.respond(
+            workshop_output(
+                MessageName.CONNECT,
+                interactive=False,
+                version=WORKSHOP_VERSION,
+                mode={
+                    "name": "Simulation",
+                    "code": "",
+                    "version": "1",
+                    "author": "",
+                    "game_mode": "",
+                    "map": "",
+                },
+                features=self._features,
+                packetWidth=self.input.packet_width,
+            )
+        )
+        await connected.wait()
+
+        for definition in self._definitions:
+            data = definition.as_data()
+            self.respond(
+                workshop_output(
+                    MessageName.REGISTER_MESSAGE_DEFINITION,
+                    name=data["name"],
+                    id=data["id"],
+                    dataTypes=data["dataTypes"],
+                )
+            )
+
+        while len(self.owtp.registered_msg_def) < len(self._definitions) + 2:
+            await asyncio.sleep(0)
+
+    def respond(self, line: str):
+        self.owtp.add_workshop_output([line])
+
+    def _respond_later(self, line: str):
+        self.round_trips += 1
+        asyncio.get_running_loop().call_later(
+            self.response_delay, self.respond, line
+        )
+
+    def _on_frame(self, sequence: int | None, messages: list[ReceivedMessage]):
+        sequence_data = {} if sequence is None else {"sequence": sequence}
+
+        if any(message.id in self.rejected_ids for message in messages):
+            self._respond_later(
+                workshop_output(
+                    MessageName.ERROR,
+                    errorCode=ErrorCode.INVALID_MESSAGE,
+                    packets=[],
+                    **sequence_data,
+                )
+            )
+            return
+
+        self._respond_later(
+            workshop_output(MessageName.CONFIRM, **sequence_data)
+        )
+
+    def _on_error(self, frame: bytes, error: InvalidFrame):
+        # the sequence number itself might be damaged, but it's the best guess of which frame to resend
+        sequence = (
+            error.sequence if error.packets else read_sequence(frame)
+        )
+        self._respond_later(
+            workshop_output(
+                MessageName.ERROR,
+                errorCode=ErrorCode.INVALID_PACKET,
+                packets=error.packets,
+                **({} if sequence is None else {"sequence": sequence}),
+            )
+        )
@@ -0,0 +1,238 @@
+"""Reference implementation of the receiving side of OWTP, doing what the Workshop mode does with packets it receives.
+
+Used by benchmarks and simulations to verify that whatever the application sends can be decoded."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.owtp import (
+    ALPHABET,
+    BASE_PACKET_WIDTH,
+    MAX_PACKET_WIDTH,
+    RETRANSMISSION_WINDOW,
+    SEQUENCE_SPACE,
+    ChecksumState,
+    DamagedSegments,
+    MessageDataType,
+    MessageDefinition,
+    PacketWidth,
+    ReservedPackets,
+    SegmentReassembler,
+    decompress,
+)
+
+START_END = ReservedPackets.START_END_CONFIRM.value
+COMMA = ReservedPackets.COMMA.value
+
+
+class InvalidFrame(Exception):
+    def __init__(
+        self,
+        message: str,
+        packets: list[list[int]] | None = None,
+        sequence: int | None = None,
+    ):
+        super().__init__(message)
+        self.packets = packets or []
+        "Ranges of damaged packets, if the frame is segmented."
+        self.sequence = sequence
+
+
+@dataclass(frozen=True)
+class ReceivedMessage:
+    id: bytes
+    data: bytes
+    "Data packets, after decompression."
+
+    @property
+    def text(self):
+        return decode_text(self.data)
+
+    def unpack(self, definition: MessageDefinition):
+        "Decodes fields packed as fixed-point values, returning them together with the text of the rest of the fields."
+        values: dict[str, float | list[float]] = {}
+        position = 0
+
+        for name, packing in definition.fixed_point.items():
+            count = (
+                3 if definition.data_types[name] == MessageDataType.VECTOR else 1
+            )
+            unpacked = [
+                packing.unpack(
+                    self.data[position + idx * packing.width :][: packing.width]
+                )
+                for idx in range(count)
+            ]
+            values[name] = unpacked if count == 3 else unpacked[0]
+            position += count * packing.width
+
+        return values, decode_text(self.data[position:])
+
+
+def decode_text(data_packets: bytes) -> str:
+    return "".join(ALPHABET[packet - 1] for packet in data_packets)
+
+
+def read_sequence(frame: bytes) -> int | None:
+    "Returns the sequence number of a frame, or `None` if it's sent without one. Checksum packets are never a separator, so a frame with a sequence number has the separator one packet further."
+    if (
+        len(frame) > 4
+        and frame[3] != COMMA
+        and frame[4] == COMMA
+        and 1 <= frame[1] <= SEQUENCE_SPACE
+    ):
+        return frame[1] - 1
+
+    return None
+
+
+def decode_frame(frame: bytes) -> tuple[int | None, list[ReceivedMessage]]:
+    "Decodes packets of a frame, from the start packet to the end packet inclusive, into its sequence number and the messages it contains."
+    if len(frame) < 5 or frame[0] != START_END or frame[-1] != START_END:
+        raise InvalidFrame(f"Malformed frame {list(frame)}")
+
+    sequence = read_sequence(frame)
+    header = frame[1:2] if sequence is not None else b""
+    frame = frame[len(header) :]
+
+    if frame[3] != COMMA:
+        raise InvalidFrame(f"Missing separator after the checksum {list(frame)}")
+
+    comma = bytes((COMMA,))
+    bodies = frame[4:-1].split(comma * 2)
+
+    checksum = ChecksumState().update(header)
+    checksum = checksum.update(b"".join(bodies).replace(comma, b""))
+
+    if checksum.digest() != frame[1:3]:
+        raise InvalidFrame(f"Checksum mismatch {list(frame)}")
+
+    messages: list[ReceivedMessage] = []
+
+    for body in bodies:
+        id, _, data = body.partition(comma)  # pylint: disable=W0622
+
+        try:
+            messages.append(ReceivedMessage(id, decompress(data)))
+        except ValueError as e:
+            raise InvalidFrame(f"Cannot decode data {list(data)}") from e
+
+    return sequence, messages
+
+
+class SimulatedWorkshop:
+    """Receives packets one by one, like the Workshop mode does, and decodes every complete frame. The width of packets of a frame is recognized from its start packet, which has all the bits set.
+
+    If `preemption` is set, a frame whose last packet before the end packet is :attr:`PacketWidth.abort` has been preempted by a more urgent one - it's thrown away without reporting an error.
+
+    A frame that's identical to the last one received with its sequence number, while that number is among the `RETRANSMISSION_WINDOW` numbers up to the newest one received, is a retransmission of a frame whose confirmation got lost - it's passed to `on_frame` to be confirmed again, but its messages aren't received twice. See :func:`encode_frame`.
+
+    If `segmented`, frames are expected to be split by :func:`segment_frame`, and damaged segments are reported and repaired instead of the whole frame. If `parity` is set as well, frames are expected to carry parity segments added by :func:`add_parity`."""
+
+    def __init__(
+        self,
+        on_frame: Callable[
+            [int | None, list[ReceivedMessage]], None
+        ] = lambda *_: None,
+        on_error: Callable[[bytes, InvalidFrame], None] = lambda *_: None,
+        segmented: bool = False,
+        parity: bool = False,
+        preemption: bool = False,
+    ):
+        self.received: list[ReceivedMessage] = []
+        self.errors: list[InvalidFrame] = []
+        self.frames = 0
+        self.duplicates = 0
+        self.aborted = 0
+        self.packets = 0
+        self._last_frames: dict[int, bytes] = {}
+        self._newest_sequence: int | None = None
+        self._on_frame = on_frame
+        self._on_error = on_error
+        self._frame: list[int] = []
+        self._segments = SegmentReassembler(parity) if segmented else None
+        self._preemption = preemption
+
+    def receive(self, packet: int):
+        self.packets += 1
+
+        if not self._frame:
+            if (
+                BASE_PACKET_WIDTH <= packet.bit_length() <= MAX_PACKET_WIDTH
+                and packet & (packet + 1) == 0
+            ):
+                self._frame.append(packet)
+            return
+
+        self._frame.append(packet)
+
+        if packet != self._frame[0]:
+            return
+
+        packets = self._frame
+        self._frame = []
+        packet_width = PacketWidth(packet.bit_length(), self._preemption)
+
+        if (
+            self._preemption
+            and len(packets) > 2
+            and packets[-2] == packet_width.abort
+        ):
+            self.aborted += 1
+            return
+
+        try:
+            frame = packet_width.decode(packets)
+        except ValueError as e:
+            error = InvalidFrame(f"Cannot decode wide packets {packets}: {e}")
+            self.errors.append(error)
+            self._on_error(b"", error)
+            return
+
+        try:
+            if self._segments:
+                frame = self._segments.receive(frame, read_sequence(frame))
+
+            sequence, messages = decode_frame(frame)
+        except DamagedSegments as e:
+            error = InvalidFrame(str(e), e.packets, e.sequence)
+            self.errors.append(error)
+            self._on_error(frame, error)
+            return
+        except InvalidFrame as e:
+            self.errors.append(e)
+            self._on_error(frame, e)
+            return
+        except ValueError as e:
+            error = InvalidFrame(f"Cannot repair frame {list(frame)}: {e}")
+            self.errors.append(error)
+            self._on_error(frame, error)
+            return
+
+        if sequence is not None:
+            recent = (
+                self._newest_sequence is not None
+                and (self._newest_sequence - sequence) % SEQUENCE_SPACE
+                < RETRANSMISSION_WINDOW
+            )
+
+            if recent and self._last_frames.get(sequence) == frame:
+                self.duplicates += 1
+                self._on_frame(sequence, messages)
+                return
+
+            self._last_frames[sequence] = frame
+
+            if not recent:
+                self._newest_sequence = sequence
+                # whatever the same numbers carry next is a new frame
+                self._last_frames = {
+                    number: last
+                    for number, last in self._last_frames.items()
+                    if (sequence - number) % SEQUENCE_SPACE
+                    < RETRANSMISSION_WINDOW
+                }
+
+        self.frames += 1
+        self.received += messages
+        self._on_frame(sequence, messages)
@@ -1,9 +1,16 @@
 import json
 import os
 import sys
-from typing import Any, TypedDict
+from typing import Any, NotRequired, TypedDict
 
+from .file_watcher import FileWatcherBackend
 from .logging import create_logger
+from .owtp.dispatcher import (
+    MAX_FRAME_SIZE,
+    PARITY_SEGMENTS,
+    PREEMPTING_PRIORITY,
+    WINDOW_SIZE,
+)
 from .plugin import IPlugin
 from .utils import PROJECT_ROOT, validate_dict
 
@@ -20,6 +27,14 @@ class KeybindsConfig(TypedDict):
     move_slow: str
     move_down: str
     move_up: str
+    move_forward: NotRequired[str]
+    "Optional keybinds adding a bit to every packet each, used in order until the first one that isn't set."
+    move_backward: NotRequired[str]
+    move_left: NotRequired[str]
+    move_right: NotRequired[str]
+    jump: NotRequired[str]
+    crouch: NotRequired[str]
+    interact: NotRequired[str]
 
 
 class ConfigData(TypedDict):
@@ -27,6 +42,13 @@ class ConfigData(TypedDict):
     keybinds: KeybindsConfig
     buttons_down_ticks: int
     buttons_up_ticks: int
+    file_watcher_backend: NotRequired[str]
+    file_watcher_coalesce_window: NotRequired[float]
+    max_frame_size: NotRequired[int]
+    window_size: NotRequired[int]
+    adaptive_timing: NotRequired[bool]
+    parity_segments: NotRequired[int]
+    preempting_priority: NotRequired[int | None]
     plugins: dict[str, Any]
 
 
@@ -47,6 +69,13 @@ DEFAULT_CONFIG = ConfigData(
     keybinds=DEFAULT_KEYBINDS,
     buttons_down_ticks=3,
     buttons_up_ticks=3,
+    file_watcher_backend=FileWatcherBackend.AUTO.value,
+    file_watcher_coalesce_window=0.0,
+    max_frame_size=MAX_FRAME_SIZE,
+    window_size=WINDOW_SIZE,
+    adaptive_timing=True,
+    parity_segments=PARITY_SEGMENTS,
+    preempting_priority=PREEMPTING_PRIORITY,
     plugins={},
 )
 
@@ -82,6 +111,9 @@ class Config:
                 data = json.load(file)
                 validate_dict(data, ConfigData)
 
+                for key in ConfigData.__optional_keys__:
+                    data.setdefault(key, DEFAULT_CONFIG[key])
+
                 config = ConfigData(data)
 
                 for plugin in self.plugins:
@@ -0,0 +1,143 @@
+"Linux-only observer that reads inotify events directly on the asyncio event loop, without a separate observer thread."
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import platform
+import struct
+
+from watchdog.events import (
+    FileClosedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
+
+from ..logging import create_logger
+
+logger = create_logger("InotifyObserver")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+EVENT_HEADER = struct.Struct("iIII")
+WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_MODIFY | IN_CLOSE_WRITE
+
+
+def _load_libc():
+    if platform.system() != "Linux":
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, "inotify_init1"):
+        return None
+
+    return libc
+
+
+_libc = _load_libc()
+
+
+class InotifyObserver:
+    "Drop-in replacement for watchdog's `Observer` that registers an inotify file descriptor with the event loop via `loop.add_reader`. Events are dispatched on the loop's thread."
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        if not _libc:
+            raise OSError("inotify is not supported on this system")
+
+        self._loop = loop
+        self._fd = -1
+        self._watches: dict[int, tuple[str, FileSystemEventHandler]] = {}
+        self._scheduled: list[tuple[str, FileSystemEventHandler]] = []
+
+    @staticmethod
+    def is_supported():
+        return _libc is not None
+
+    def schedule(
+        self, event_handler: FileSystemEventHandler, path: str, **_: object
+    ):
+        "Watches `path` (non-recursively) and passes its events to `event_handler` once started."
+        self._scheduled.append((os.fsdecode(path), event_handler))
+
+    def start(self):
+        assert _libc
+
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        for path, handler in self._scheduled:
+            wd = _libc.inotify_add_watch(
+                self._fd, os.fsencode(path), WATCH_MASK
+            )
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), path)
+
+            self._watches[wd] = (path, handler)
+
+        self._loop.add_reader(self._fd, self._read_events)
+        logger.debug("Watching %s", [path for path, _ in self._scheduled])
+
+    def stop(self):
+        if self._fd < 0:
+            return
+
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = -1
+        self._watches = {}
+
+    def join(self):
+        "Nothing to wait for - there's no observer thread."
+
+    def _read_events(self):
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify event queue overflowed")
+                continue
+
+            if wd not in self._watches or mask & IN_ISDIR:
+                continue
+
+            directory, handler = self._watches[wd]
+            path = os.path.join(directory, os.fsdecode(name))
+            event: FileSystemEvent
+
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                event = FileCreatedEvent(path)
+            elif mask & IN_MODIFY:
+                event = FileModifiedEvent(path)
+            elif mask & IN_CLOSE_WRITE:
+                event = FileClosedEvent(path)
+            else:
+                continue
+
+            handler.dispatch(event)
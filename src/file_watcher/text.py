@@ -1,6 +1,9 @@
+import asyncio
 import os
 import platform
 from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
 
 from watchdog.events import (
     DirCreatedEvent,
@@ -11,26 +14,88 @@ from watchdog.events import (
     FileSystemEventHandler,
 )
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
 from watchdog.observers.polling import PollingObserver
 
 from ..logging import create_logger
+from .inotify import InotifyObserver
 
 logger = create_logger("TextFileWatcher")
 
 
+class FileWatcherBackend(StrEnum):
+    "Possible backends used for watching the file system."
+
+    AUTO = "auto"
+    "Native inotify backend if available, otherwise watchdog."
+    INOTIFY = "inotify"
+    "Linux-only - inotify events are handled directly on the asyncio event loop."
+    WATCHDOG = "watchdog"
+    "Watchdog observer running in a separate thread."
+
+
+type Scheduler = Callable[[Callable[[], None], float], None]
+"Runs passed callback after a delay (in seconds) on the thread consuming the events."
+
+
+def _run_inline(callback: Callable[[], None], _: float):
+    callback()
+
+
+@dataclass
+class TextFileWatcherStats:
+    "Statistics of handled modify events."
+
+    events: int = 0
+    "Number of received modify events."
+    reads: int = 0
+    "Number of performed reads of the file."
+
+    @property
+    def coalesced(self):
+        "Number of modify events that didn't require a separate read."
+        return self.events - self.reads
+
+
 class TextFileEventHandler(FileSystemEventHandler):
     def __init__(
         self,
         on_create: Callable[[str], None],
         on_modify: Callable[[list[str]], None],
         on_close: Callable[[str], None],
+        scheduler: Scheduler = _run_inline,
+        coalesce_window: float = 0.0,
     ):
         self._on_create = on_create
         self._on_modify = on_modify
         self._on_close = on_close
+        self._scheduler = scheduler
+        self._coalesce_window = coalesce_window
 
-        self._previous_content: list[str] = []
         self._current_file_path: str = ""
+        self._offset: int = 0
+        self._partial_line: bytes = b""
+
+        self._read_scheduled = False
+        self._pending_events = 0
+        self.stats = TextFileWatcherStats()
+
+    @property
+    def current_file_path(self):
+        return self._current_file_path
+
+    @property
+    def offset(self):
+        "Position in the current file right after the last complete line that has been read."
+        return self._offset - len(self._partial_line)
+
+    def _reset(self, offset: int = 0):
+        self._offset = offset
+        self._partial_line = b""
+
+    def resume(self, path: str, offset: int):
+        "Starts watching already existing file `path` as if it has just been created, reading it from `offset`."
+        self._scheduler(lambda: self._open(path, offset), 0)
 
     def on_created(self, event: DirCreatedEvent | FileCreatedEvent):
         if not isinstance(event.src_path, str):
@@ -39,10 +104,8 @@ class TextFileEventHandler(FileSystemEventHandler):
         if event.is_directory or not event.src_path.endswith(".txt"):
             return
 
-        logger.debug('Opening file: "%s"', event.src_path)
-        self._current_file_path = event.src_path
-        self._on_create(self._current_file_path)
-        self.read_file(event.src_path)
+        path = event.src_path
+        self._scheduler(lambda: self._open(path), 0)
 
     def on_modified(self, event: DirModifiedEvent | FileModifiedEvent):
         if not isinstance(event.src_path, str):
@@ -51,62 +114,178 @@ class TextFileEventHandler(FileSystemEventHandler):
         if event.src_path != self._current_file_path or event.is_directory:
             return
 
-        self.read_file(event.src_path)
+        self._pending_events += 1
+
+        # any modification made until the scheduled read executes will be handled by it
+        if self._read_scheduled:
+            return
+
+        self._read_scheduled = True
+        self._scheduler(self._flush, self._coalesce_window)
 
     def on_closed(self, event: FileClosedEvent):
+        if not isinstance(event.src_path, str):
+            return
+
         if event.src_path != self._current_file_path or event.is_directory:
             return
 
-        self._previous_content = []
+        path = event.src_path
+        self._scheduler(lambda: self._close(path), self._coalesce_window)
+
+    def _open(self, path: str, offset: int = 0):
+        logger.debug('Opening file: "%s" from offset %s', path, offset)
+        self._current_file_path = path
+        self._reset(offset)
+        self._on_create(path)
+        self.read_file(path)
+
+    def _flush(self):
+        self._read_scheduled = False
+        events, self._pending_events = self._pending_events, 0
+
+        if not self._current_file_path:
+            return
+
+        self.stats.events += events
+        self.stats.reads += 1
+
+        if events > 1:
+            logger.debug("Coalesced %s modify events into a single read", events)
+
+        self.read_file(self._current_file_path)
+
+    def _close(self, path: str):
+        if path != self._current_file_path:
+            return
+
+        self.read_file(path)
+
+        # file won't be written to anymore, so the trailing line is complete
+        last_line = self._partial_line.decode("utf-8", errors="ignore").strip()
+        if last_line:
+            self._on_modify([last_line])
 
-        logger.debug('File closed: "%s"', self._current_file_path)
-        self._on_close(self._current_file_path)
+        self._reset()
+        self._current_file_path = ""
+
+        logger.debug('File closed: "%s"', path)
+        self._on_close(path)
 
     def read_file(self, path: str):
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            new_content = f.readlines()
-
-            # Find the difference (new lines)
-            new_lines = []
-            if len(new_content) > len(self._previous_content):
-                new_lines = [
-                    line.strip()
-                    for line in new_content[len(self._previous_content) :]
-                    if line.strip()
-                ]
-
-                self._on_modify(new_lines)
-            elif len(new_content) < len(self._previous_content):
+        "Reads only the bytes appended since the previous read and passes complete, non-empty lines to `on_modify`."
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            if size < self._offset:
                 raise RuntimeError(
                     f"Content in the log file {path} was removed - this should never happen!"
                 )
 
-            self._previous_content = new_content
+            if size == self._offset:
+                return
+
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+
+        self._offset += len(chunk)
+
+        # the last element is either an empty string or a line that hasn't been fully written yet
+        *complete, self._partial_line = (self._partial_line + chunk).split(b"\n")
+
+        new_lines = [
+            text
+            for text in (
+                line.decode("utf-8", errors="ignore").strip()
+                for line in complete
+            )
+            if text
+        ]
+
+        if new_lines:
+            self._on_modify(new_lines)
 
 
 class TextFileWatcher:
-    def __init__(self, directory: str):
+    def __init__(
+        self,
+        directory: str,
+        loop: asyncio.AbstractEventLoop | None = None,
+        backend: FileWatcherBackend = FileWatcherBackend.AUTO,
+        coalesce_window: float = 0.0,
+    ):
         self.directory = directory
+        self._loop = loop
 
         if not os.path.isdir(self.directory):
             raise NotADirectoryError(
                 f'Path "{self.directory}" is not a directory or it doesn\'t exists!'
             )
 
-        event_handler = TextFileEventHandler(
+        self._observer = self._create_observer(loop, backend)
+        logger.debug("Using %s", type(self._observer).__name__)
+
+        self._event_handler = TextFileEventHandler(
             on_create=self.on_create,
             on_modify=self.on_modify,
             on_close=self.on_close,
+            scheduler=self._schedule if loop else _run_inline,
+            coalesce_window=coalesce_window,
         )
 
+        self._observer.schedule(
+            self._event_handler, self.directory, recursive=True
+        )
+        self._observer.start()
+
+    @staticmethod
+    def _create_observer(
+        loop: asyncio.AbstractEventLoop | None, backend: FileWatcherBackend
+    ) -> BaseObserver | InotifyObserver:
+        if backend != FileWatcherBackend.WATCHDOG and loop:
+            if InotifyObserver.is_supported():
+                return InotifyObserver(loop)
+
+        if backend == FileWatcherBackend.INOTIFY:
+            raise OSError(
+                "inotify backend is not supported on this system or without an event loop"
+            )
+
         # WORKAROUND: https://github.com/gorakhargosh/watchdog/issues/915
         if platform.system() == "Windows":
-            self._observer = PollingObserver(timeout=0.1)
-        else:
-            self._observer = Observer()
+            return PollingObserver(timeout=0.1)
 
-        self._observer.schedule(event_handler, self.directory, recursive=True)
-        self._observer.start()
+        return Observer()
+
+    @property
+    def is_loop_native(self):
+        "Whether the events are handled directly on the event loop's thread."
+        return isinstance(self._observer, InotifyObserver)
+
+    @property
+    def stats(self):
+        return self._event_handler.stats
+
+    @property
+    def current_file_path(self):
+        return self._event_handler.current_file_path
+
+    @property
+    def offset(self):
+        return self._event_handler.offset
+
+    def resume(self, path: str, offset: int):
+        self._event_handler.resume(path, offset)
+
+    def _schedule(self, callback: Callable[[], None], delay: float):
+        "Runs `callback` on the event loop, so the file is read and callbacks are called on the loop's thread."
+        assert self._loop
+
+        if self.is_loop_native:
+            self._loop.call_later(delay, callback)
+        else:
+            self._loop.call_soon_threadsafe(self._loop.call_later, delay, callback)
 
     def cleanup(self):
         self._observer.stop()
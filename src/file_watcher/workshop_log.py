@@ -3,7 +3,7 @@ import os
 from collections.abc import Callable
 
 from ..logging import create_logger
-from .text import TextFileWatcher
+from .text import FileWatcherBackend, TextFileWatcher
 
 logger = create_logger("WSLogWatcher")
 
@@ -16,9 +16,9 @@ class WorkshopLogFileWatcher(TextFileWatcher):
         on_create: Callable[[str], None],
         on_modify: Callable[[list[str]], None],
         on_close: Callable[[str], None],
+        backend: FileWatcherBackend = FileWatcherBackend.AUTO,
+        coalesce_window: float = 0.0,
     ):
-        self._loop = loop
-
         self._on_create = on_create
         self._on_modify = on_modify
         self._on_close = on_close
@@ -34,13 +34,28 @@ class WorkshopLogFileWatcher(TextFileWatcher):
             logger.debug('"%s" doesn\'t exists - creating...', directory)
             os.mkdir(directory)
 
-        super().__init__(directory)
+        super().__init__(directory, loop, backend, coalesce_window)
+
+    def find_latest_log(self) -> str | None:
+        "Returns path of the most recently modified Workshop log file, if any exists."
+        logs = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(".txt")
+        ]
+
+        if not logs:
+            return None
+
+        return max(logs, key=lambda entry: entry.stat().st_mtime).path
+
+    # events are already being handled on the loop's thread
 
     def on_create(self, path: str):
-        self._loop.call_soon_threadsafe(self._on_create, path)
+        self._on_create(path)
 
     def on_modify(self, lines: list[str]):
-        self._loop.call_soon_threadsafe(self._on_modify, lines)
+        self._on_modify(lines)
 
     def on_close(self, path: str):
-        self._loop.call_soon_threadsafe(self._on_close, path)
+        self._on_close(path)
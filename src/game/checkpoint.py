@@ -0,0 +1,95 @@
+"Stores :class:`Checkpoint` allowing to resume handling of a Workshop log after the application has been restarted mid-lobby."
+
+import json
+import os
+import time
+from typing import TypedDict
+
+from ..logging import create_logger
+from ..owtp.connection import ConnectionState
+from ..utils import PROJECT_ROOT, validate_dict
+
+CHECKPOINT_PATH = os.path.join(PROJECT_ROOT, "checkpoint.json")
+
+ACTIVE_LOG_MAX_AGE = 10 * 60
+"Time (in seconds) since the last modification after which a Workshop log without a checkpoint is no longer considered active."
+
+SAVE_INTERVAL = 1.0
+"Minimum time (in seconds) between saves triggered by Workshop output, so handling every batch of it doesn't write the checkpoint."
+
+logger = create_logger("Checkpoint")
+
+
+class CheckpointData(TypedDict):
+    path: str
+    offset: int
+    connection: ConnectionState
+
+
+class Checkpoint:
+    "Persists position in the currently handled Workshop log and the state of the connection with the Workshop mode."
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self._path = path
+        self._last_saved: CheckpointData | None = None
+        self._saved_at = float("-inf")
+
+    def load(self) -> CheckpointData | None:
+        if not os.path.isfile(self._path):
+            return None
+
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+                validate_dict(data, CheckpointData)
+                return CheckpointData(data)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning("Ignoring invalid checkpoint: %s", repr(e))
+            return None
+
+    @property
+    def next_save_at(self):
+        "Time (as returned by :func:`time.monotonic`) from which a save triggered by Workshop output is due, see `SAVE_INTERVAL`."
+        return self._saved_at + SAVE_INTERVAL
+
+    def save(self, data: CheckpointData):
+        if data == self._last_saved:
+            return
+
+        # write to a temporary file first, so a crash mid-write won't leave a corrupted checkpoint behind
+        temp_path = self._path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+        os.replace(temp_path, self._path)
+        self._last_saved = data
+        self._saved_at = time.monotonic()
+
+    def clear(self):
+        self._last_saved = None
+
+        if os.path.isfile(self._path):
+            os.remove(self._path)
+
+    def find_resume_point(
+        self, latest_log: str | None
+    ) -> tuple[int, ConnectionState | None] | None:
+        "Returns offset from which `latest_log` should be read and the connection state to restore, or `None` if the log isn't active anymore."
+        if not latest_log or not os.path.isfile(latest_log):
+            return None
+
+        checkpoint = self.load()
+        size = os.path.getsize(latest_log)
+
+        if (
+            checkpoint
+            and checkpoint["path"] == latest_log
+            and checkpoint["offset"] <= size
+        ):
+            return checkpoint["offset"], checkpoint["connection"]
+
+        if os.path.getmtime(latest_log) + ACTIVE_LOG_MAX_AGE > time.time():
+            # no checkpoint to restore from, skip everything that has been logged so far
+            return size, None
+
+        return None
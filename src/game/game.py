@@ -1,9 +1,10 @@
 "Stores Custom Game manager :class:`Game`."
 
 import asyncio
+import time
 from typing import Any, TypedDict
 
-from ..file_watcher import WorkshopLogFileWatcher
+from ..file_watcher import FileWatcherBackend, WorkshopLogFileWatcher
 from ..input import IInput
 from ..logging import create_logger
 from ..owtp import (
@@ -16,9 +17,19 @@ from ..owtp import (
     define_message_in,
     is_message_in,
 )
+from ..owtp.connection import ConnectionState
+from ..owtp.dispatcher import (
+    MAX_FRAME_SIZE,
+    PARITY_SEGMENTS,
+    PREEMPTING_PRIORITY,
+    WINDOW_SIZE,
+)
+from ..owtp.timing import TimingState
 from ..plugin import IPlugin
+from .checkpoint import SAVE_INTERVAL, Checkpoint
 from .player import Player
 from .state import GameState, GameStateMessage
+from .timing_store import TimingStore
 
 logger = create_logger("Game")
 
@@ -34,10 +45,10 @@ class GameStateChangeData(TypedDict):
 
 
 RegisterPlayer: DefineMessageIn[RegisterPlayerData] = define_message_in(
-    "REGISTER_PLAYER"
+    "REGISTER_PLAYER", RegisterPlayerData
 )
 GameStateChange: DefineMessageIn[GameStateChangeData] = define_message_in(
-    GameStateMessage.GAME_STATE_CHANGE
+    GameStateMessage.GAME_STATE_CHANGE, GameStateChangeData
 )
 
 MESSAGES: list[DefineMessageIn[Any]] = [
@@ -56,6 +67,13 @@ class Game:
         input_method: IInput,
         buttons_down_ticks: int,
         buttons_up_ticks: int,
+        file_watcher_backend: str = FileWatcherBackend.AUTO,
+        file_watcher_coalesce_window: float = 0.0,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        window_size: int = WINDOW_SIZE,
+        adaptive_timing: bool = True,
+        parity_segments: int = PARITY_SEGMENTS,
+        preempting_priority: int | None = PREEMPTING_PRIORITY,
         **_: Any,
     ):
         super().__init__()
@@ -73,13 +91,36 @@ class Game:
         self._connection: OWTP | None = None
         self._plugins = plugins
         self._input_method = input_method
+        self._checkpoint = Checkpoint()
+        self._checkpoint_task: asyncio.Task[None] | None = None
+        self._state_to_restore: ConnectionState | None = None
+        self._timing_store = TimingStore()
+        self._configured_timing: TimingState = {
+            "buttons_down_ticks": buttons_down_ticks,
+            "buttons_up_ticks": buttons_up_ticks,
+        }
 
         def on_log_create(_: str):
             self._connection = OWTP(
-                self._input_method, buttons_down_ticks, buttons_up_ticks
+                self._input_method,
+                buttons_down_ticks,
+                buttons_up_ticks,
+                max_frame_size,
+                window_size,
+                adaptive_timing,
+                parity_segments,
+                preempting_priority,
             )
             owtp = self._connection
 
+            if adaptive_timing and (
+                tuned := self._timing_store.load(
+                    self._input_method.name, self._configured_timing
+                )
+            ):
+                logger.info("Continuing with previously tuned timing %s", tuned)
+                owtp.timing.restore(tuned)
+
             owtp.events.mode_info.on(self._on_mode_info)
             owtp.events.connect.on(self._on_connect)
             owtp.events.disconnect.on(self._on_disconnect)
@@ -92,6 +133,11 @@ class Game:
             owtp.events.send_message_start.on(self._on_send_message_start)
             owtp.events.send_message_finish.on(self._on_send_message_finish)
             owtp.events.send_message_error.on(self._on_send_message_error)
+            owtp.events.send_message_expired.on(self._on_send_message_expired)
+            owtp.events.send_message_replaced.on(
+                self._on_send_message_replaced
+            )
+            owtp.events.timing_change.on(self._on_timing_change)
 
             for msg in MESSAGES:
                 self._connection.register_message_in(msg)
@@ -100,6 +146,10 @@ class Game:
                 for msg in plugin.incoming_messages():
                     self._connection.register_message_in(msg)
 
+            if self._state_to_restore:
+                self._connection.restore(self._state_to_restore)
+                self._state_to_restore = None
+
         def on_log_modify(lines: list[str]):
             if not self._connection:
                 logger.warning(
@@ -108,8 +158,13 @@ class Game:
                 return
 
             self._connection.add_workshop_output(lines)
+            self._schedule_checkpoint(throttled=True)
 
         def on_log_close(_: str):
+            if self._checkpoint_task:
+                self._checkpoint_task.cancel()
+
+            self._checkpoint.clear()
             self._set_state(GameState.ENDED)
 
             if self._connection:
@@ -122,19 +177,34 @@ class Game:
             on_log_create,
             on_log_modify,
             on_log_close,
+            FileWatcherBackend(file_watcher_backend),
+            file_watcher_coalesce_window,
         )
 
         for plugin in self._plugins:
             plugin.game = self
 
-        logger.info("Waiting for the game to start...")
+        if not self._resume():
+            logger.info("Waiting for the game to start...")
 
     async def cleanup(self):
         for plugin in self._plugins:
             plugin.game = None
             await plugin.cleanup()
 
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+
         if self._connection:
+            try:
+                # Workshop output read since the last save shouldn't be handled again after a restart, but neither skipped
+                await asyncio.wait_for(self._connection.join(), SAVE_INTERVAL)
+                self._save_checkpoint()
+            except TimeoutError:
+                logger.warning(
+                    "Workshop output is still being processed, keeping the previous checkpoint"
+                )
+
             self._connection.cleanup()
             self._connection = None
 
@@ -142,6 +212,61 @@ class Game:
             self.workshop_log_watcher.cleanup()
             self.workshop_log_watcher = None
 
+    def _resume(self):
+        "Resumes handling of an already existing Workshop log, in case the application has been (re)started mid-lobby."
+        if not self.workshop_log_watcher:
+            return False
+
+        path = self.workshop_log_watcher.find_latest_log()
+        resume_point = self._checkpoint.find_resume_point(path)
+
+        if not path or not resume_point:
+            return False
+
+        offset, self._state_to_restore = resume_point
+        logger.info('Resuming Workshop log "%s" from offset %s', path, offset)
+        self.workshop_log_watcher.resume(path, offset)
+
+        return True
+
+    def _schedule_checkpoint(self, throttled: bool = False):
+        "Saves the checkpoint once all Workshop output read so far has been processed, so the saved offset never skips lines that haven't been handled. If `throttled`, waits for `SAVE_INTERVAL` since the last save as well."
+        if self._checkpoint_task and not self._checkpoint_task.done():
+            if throttled:
+                # the pending save covers this output as well
+                return
+
+            self._checkpoint_task.cancel()
+
+        delay = (
+            max(self._checkpoint.next_save_at - time.monotonic(), 0)
+            if throttled
+            else 0
+        )
+        self._checkpoint_task = asyncio.create_task(
+            self._save_checkpoint_when_processed(delay)
+        )
+
+    async def _save_checkpoint_when_processed(self, delay: float):
+        await asyncio.sleep(delay)
+
+        if self._connection:
+            await self._connection.join()
+
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        if not self._connection or not self.workshop_log_watcher:
+            return
+
+        self._checkpoint.save(
+            {
+                "path": self.workshop_log_watcher.current_file_path,
+                "offset": self.workshop_log_watcher.offset,
+                "connection": self._connection.snapshot(),
+            }
+        )
+
     @property
     def state(self):
         return self._state
@@ -176,6 +301,8 @@ class Game:
         self._mode_info = mode
 
     def _on_connect(self, mode: ModeInfo):
+        self._schedule_checkpoint()
+
         for plugin in self._plugins:
             plugin.on_workshop_connect(mode)
 
@@ -184,14 +311,23 @@ class Game:
             plugin.on_workshop_connect_error()
 
     def _on_disconnect(self):
+        self._schedule_checkpoint()
+
         for plugin in self._plugins:
             plugin.on_workshop_disconnect()
 
+    def _on_timing_change(self, timing: TimingState):
+        self._timing_store.save(
+            self._input_method.name, self._configured_timing, timing
+        )
+
     def _on_log(self, log: str):
         for plugin in self._plugins:
             plugin.on_workshop_log(log)
 
     def _on_register_message_definition(self, definition: MessageDefinition):
+        self._schedule_checkpoint()
+
         for plugin in self._plugins:
             plugin.on_workshop_register_message_definition(definition)
 
@@ -218,6 +354,16 @@ class Game:
         for plugin in self._plugins:
             plugin.on_workshop_send_message_error(message, reason)
 
+    def _on_send_message_expired(self, message: MessageOut):
+        for plugin in self._plugins:
+            plugin.on_workshop_send_message_expired(message)
+
+    def _on_send_message_replaced(
+        self, message: MessageOut, replacement: MessageOut
+    ):
+        for plugin in self._plugins:
+            plugin.on_workshop_send_message_replaced(message, replacement)
+
     def _on_send_message_finish(self, message: MessageOut):
         for plugin in self._plugins:
             plugin.on_workshop_send_message_finish(message)
@@ -0,0 +1,75 @@
+"Stores :class:`TimingStore` remembering timing of packets tuned at runtime, separately for every input method."
+
+import json
+import os
+from typing import TypedDict
+
+from ..logging import create_logger
+from ..owtp.timing import TimingState
+from ..utils import PROJECT_ROOT, validate_dict
+
+TIMING_PATH = os.path.join(PROJECT_ROOT, "timing.json")
+
+logger = create_logger("TimingStore")
+
+
+class TunedTimingData(TypedDict):
+    configured: TimingState
+    "Timing set up in the config when the tuning happened. If the config changes, the tuned timing is discarded."
+    tuned: TimingState
+
+
+class TimingStore:
+    "Persists timing of packets tuned by :class:`AdaptiveTiming`, so the next run of the application starts from it."
+
+    def __init__(self, path: str = TIMING_PATH):
+        self._path = path
+
+    def load(
+        self, input_method: str, configured: TimingState
+    ) -> TimingState | None:
+        data = self._load_all().get(input_method)
+
+        if data is None:
+            return None
+
+        try:
+            validate_dict(data, TunedTimingData)
+        except (TypeError, KeyError) as e:
+            logger.warning(
+                'Ignoring invalid tuned timing of "%s": %s',
+                input_method,
+                repr(e),
+            )
+            return None
+
+        if data["configured"] != configured:
+            return None
+
+        return data["tuned"]
+
+    def save(
+        self, input_method: str, configured: TimingState, tuned: TimingState
+    ):
+        data = self._load_all()
+        data[input_method] = {"configured": configured, "tuned": tuned}
+
+        # write to a temporary file first, so a crash mid-write won't leave a corrupted file behind
+        temp_path = self._path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+        os.replace(temp_path, self._path)
+
+    def _load_all(self) -> dict[str, TunedTimingData]:
+        if not os.path.isfile(self._path):
+            return {}
+
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring invalid tuned timing: %s", repr(e))
+            return {}
+
+        return data if isinstance(data, dict) else {}
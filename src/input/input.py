@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 from abc import ABC, abstractmethod
 from logging import Logger
 from typing import TYPE_CHECKING, Any, Awaitable, ClassVar, cast
@@ -23,6 +24,16 @@ class IInput(ABC):
         "modify_fov",
         "move_up",
     ]
+    extra_key_order: list[str] = [
+        "move_forward",
+        "move_backward",
+        "move_left",
+        "move_right",
+        "jump",
+        "crouch",
+        "interact",
+    ]
+    "Optional keybinds making packets wider by a bit each, if they're set up."
 
     async def initialize(self):
         pass
@@ -32,8 +43,11 @@ class IInput(ABC):
 
     def set_keys(self, keybinds: "KeybindsConfig") -> None:
         self.keys = []
+        extra_keys = itertools.takewhile(
+            lambda key: key in keybinds, self.extra_key_order
+        )
 
-        for key in self.key_order:
+        for key in [*self.key_order, *extra_keys]:
             keys = cast(str, keybinds[key]).split("+")
 
             for key in keys:
@@ -42,6 +56,11 @@ class IInput(ABC):
 
             self.keys.append([self.key_map[key] for key in keys])
 
+    @property
+    def packet_width(self):
+        "Number of bits of a packet that can be sent at once with the keybinds that are set up."
+        return len(self.keys)
+
     def list_keys(self):
         return self.key_map.keys()
 
@@ -1,8 +1,13 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NotRequired, TypedDict
 
 from ..logging import create_logger
 from . import messages
-from .message import MessageIn
+from .message import (
+    BASE_PACKET_WIDTH,
+    MAX_PACKET_WIDTH,
+    Feature,
+    MessageIn,
+)
 
 if TYPE_CHECKING:
     from .owtp import OWTP
@@ -12,11 +17,26 @@ OWTP_VERSION = "0.2.0"
 logger = create_logger("OWTP.ConnectMgr")
 
 
+class ConnectionState(TypedDict):
+    "Snapshot of a connection with the Workshop mode, allowing to restore it without the Workshop mode having to reconnect."
+
+    connected: bool
+    interactive: bool
+    mode: messages.ModeInfo | None
+    message_definitions: list[messages.SupportsMessageData]
+    features: NotRequired[list[str]]
+    packet_width: NotRequired[int]
+
+
 class ConnectionManager:
     def __init__(self, owtp: "OWTP"):
         self._owtp = owtp
         self.connected = False
         self.interactive = False
+        self.mode: messages.ModeInfo | None = None
+        self.features: set[Feature] = set()
+        self.packet_width = BASE_PACKET_WIDTH
+        "Widest packets (in bits) the Workshop mode can receive."
 
     def connect(self, message: MessageIn[messages.ConnectMessageData]):
         if self.connected:
@@ -26,6 +46,12 @@ class ConnectionManager:
             return
 
         self.interactive = message.data["interactive"]
+        self.features = self._parse_features(
+            message.data.get("features", [])
+        )
+        self.packet_width = self._parse_packet_width(
+            message.data.get("packetWidth", BASE_PACKET_WIDTH)
+        )
         logger.info("Establishing connection with the Workshop mode...")
 
         if message.data["version"] != OWTP_VERSION:
@@ -37,7 +63,7 @@ class ConnectionManager:
 
         def on_connected():
             self.connected = True
-            mode = message.data["mode"]
+            self.mode = mode = message.data["mode"]
             logger.info(
                 'Successfully connected with "%s v%s" by "%s"',
                 mode["name"],
@@ -71,3 +97,56 @@ class ConnectionManager:
         logger.info("Workshop mode requested disconnect...")
         self._owtp.events.disconnect.emit()
         self.connected = False
+        self.features = set()
+        self.packet_width = BASE_PACKET_WIDTH
+
+    def restore(self, state: ConnectionState):
+        self.interactive = state["interactive"]
+        self.mode = state["mode"]
+        self.features = self._parse_features(state.get("features", []))
+        self.packet_width = self._parse_packet_width(
+            state.get("packet_width", BASE_PACKET_WIDTH)
+        )
+
+        if not state["connected"] or not self.mode:
+            return
+
+        self.connected = True
+        logger.info(
+            'Restored connection with "%s v%s" by "%s"',
+            self.mode["name"],
+            self.mode["version"],
+            self.mode["author"],
+        )
+        self._owtp.events.mode_info.emit(self.mode)
+        self._owtp.events.connect.emit(self.mode)
+
+    @staticmethod
+    def _parse_features(names: list[str]):
+        features: set[Feature] = set()
+
+        for name in names:
+            try:
+                features.add(Feature(name))
+            except ValueError:
+                logger.warning('Unknown protocol feature "%s" - ignoring', name)
+
+        if features:
+            logger.info(
+                "Workshop mode supports: %s",
+                ", ".join(sorted(features)),
+            )
+
+        return features
+
+    @staticmethod
+    def _parse_packet_width(width: int):
+        if width < BASE_PACKET_WIDTH:
+            logger.warning(
+                "Workshop mode reported packet width of %s bits, using %s instead",
+                width,
+                BASE_PACKET_WIDTH,
+            )
+            return BASE_PACKET_WIDTH
+
+        return min(width, MAX_PACKET_WIDTH)
@@ -1,18 +1,33 @@
 import asyncio
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Sequence
 from typing import TYPE_CHECKING, Any, Mapping
 
 from ..input import IInput
 from ..logging import create_logger
-from ..utils import AsyncQueue
+from ..utils import AsyncQueue, LRUCache
 from . import messages
 from .message import (
+    BASE_PACKET_WIDTH,
+    MAX_PARITY_SEGMENTS,
+    RETRANSMISSION_WINDOW,
+    SEQUENCE_SPACE,
     DefineMessageOut,
+    ErrorCode,
+    Feature,
     MessageIn,
     MessageName,
     MessageOut,
     MessageOutState,
+    PacketWidth,
+    PreparedPacketsCache,
+    add_parity,
+    count_segments,
+    damaged_segments,
+    encode_frame,
+    encode_repair,
     is_message_out,
+    segment_frame,
 )
 
 if TYPE_CHECKING:
@@ -20,9 +35,40 @@ if TYPE_CHECKING:
 
 logger = create_logger("OWTP.MsgSender")
 
-TICK = 0.016
+MAX_FRAME_SIZE = 64
+"Default maximum number of packets of a frame containing several messages."
 
-type Response = tuple[MessageIn, asyncio.Event]
+FRAME_OVERHEAD = 3
+"Number of packets saved by sending a message in a frame together with others - start, end and checksum packets, minus the separator."
+
+FRAME_ATTEMPTS = 2
+"Number of times a frame of several messages is sent before it's split in half."
+
+WINDOW_SIZE = 4
+"Default maximum number of frames awaiting confirmation at once, if the Workshop mode supports it."
+
+MAX_WINDOW_SIZE = RETRANSMISSION_WINDOW
+"Largest window for which a sequence number can never refer to two different frames the Workshop mode could still be receiving."
+
+PARITY_SEGMENTS = 0
+"Default number of parity segments of every frame long enough, if the Workshop mode supports them, see `PARITY_MIN_SEGMENTS`."
+
+PARITY_MIN_SEGMENTS = 4
+"Number of segments below which a frame carries no parity segments - sending a damaged segment of a short frame again costs less than parity on every try."
+
+PREEMPTING_PRIORITY = -1000
+"Default priority at or below which a message preempts typing of a frame of less urgent messages, see :class:`Preempted`."
+
+PREPARED_PACKETS_CACHE_SIZE = 256
+"Number of most recently prepared distinct messages whose packets are reused."
+
+type Response = tuple[MessageIn[Any], asyncio.Event]
+
+
+class Preempted(Exception):
+    """Raised when typing of a frame is aborted at a packet boundary, so a more urgent message waiting to be sent goes first, or because some of its messages have been removed. Apart from before the first packet, only happens if the Workshop mode supports :attr:`Feature.PREEMPTION`.
+
+    Packets already typed are followed by the :attr:`PacketWidth.abort` packet and the end packet, telling the Workshop mode to throw the frame away, and messages of the frame that haven't been removed are put back into the queue."""
 
 
 class MessageDispatcher:
@@ -30,38 +76,94 @@ class MessageDispatcher:
         self,
         owtp: "OWTP",
         input_method: IInput,
-        buttons_down_ticks: int,
-        buttons_up_ticks: int,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        window_size: int = WINDOW_SIZE,
+        parity_segments: int = PARITY_SEGMENTS,
+        preempting_priority: int | None = PREEMPTING_PRIORITY,
     ):
+        if not 1 <= window_size <= MAX_WINDOW_SIZE:
+            raise ValueError(
+                f"Window size has to be between 1 and {MAX_WINDOW_SIZE}, got {window_size}"
+            )
+
+        if not 0 <= parity_segments <= MAX_PARITY_SEGMENTS:
+            raise ValueError(
+                f"Number of parity segments has to be between 0 and {MAX_PARITY_SEGMENTS}, got {parity_segments}"
+            )
+
         self._owtp = owtp
         self._input_method = input_method
-        self._buttons_down_ticks = buttons_down_ticks
-        self._buttons_up_ticks = buttons_up_ticks
-
-        self._currently_sent_message: MessageOut | None = None
+        self._max_frame_size = max_frame_size
+        self._window_size = window_size
+        self._parity_segments = parity_segments
+        self._preempting_priority = preempting_priority
+        "Priority at or below which a message preempts a frame being typed, or `None` if frames are never preempted."
+
+        self._current_frame: list[MessageOut] = []
+        "Messages currently being sent - of a single frame, or of every frame awaiting confirmation when pipelining."
+        self._removed_from_frame: set[MessageOut] = set()
+        self._acknowledgements: dict[int, asyncio.Future[None]] = {}
+        "Confirmations of frames awaiting them, keyed on their sequence number, oldest first."
+        self._sequence_released = asyncio.Event()
+        self._next_sequence = 0
+        self._packet_width = PacketWidth(BASE_PACKET_WIDTH)
+        self._prepared_packets: PreparedPacketsCache = LRUCache(
+            PREPARED_PACKETS_CACHE_SIZE
+        )
 
         self._messages_queue: AsyncQueue[MessageOut] = AsyncQueue()
         self._responses_queue: asyncio.Queue[Response] = asyncio.Queue()
 
         self._pause_event = asyncio.Event()
         self._cancel_event = asyncio.Event()
+        self._input_lock = asyncio.Lock()
+        self._waiting_priorities: list[int] = []
+        "Priorities of frames waiting for :attr:`_input_lock`, so a frame being typed can give way to a more urgent one."
+        self._window = asyncio.Semaphore(window_size)
         self._process_messages_task = asyncio.create_task(
             self._process_messages()
         )
-        self._send_and_confirm_task: asyncio.Task[Any] | None = None
+        self._frame_tasks: set[asyncio.Task[Any]] = set()
+        self._send_and_confirm_tasks: dict[int | None, asyncio.Task[Any]] = {}
+        "Currently running tries of sending frames, keyed on their sequence number, or `None` when not pipelining."
+        self._damaged_packets: dict[
+            int | None, Sequence[int | Sequence[int]]
+        ] = {}
+        "Packets the Workshop mode has reported as damaged, keyed like :attr:`_send_and_confirm_tasks`, so the next try only sends the segments containing them."
 
     def cleanup(self):
         self._responses_queue.shutdown(True)
         self._messages_queue.shutdown()
 
-        if self._send_and_confirm_task:
-            self._send_and_confirm_task.cancel()
+        for task in [
+            *self._send_and_confirm_tasks.values(),
+            *self._frame_tasks,
+        ]:
+            task.cancel()
 
         if self._process_messages_task:
             self._process_messages_task.cancel()
 
     def is_sending(self):
-        return self._currently_sent_message is not None
+        return bool(self._current_frame)
+
+    @property
+    def packet_width(self):
+        if not self._owtp.is_connected:
+            return BASE_PACKET_WIDTH
+
+        return min(
+            self._owtp._connection.packet_width,  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+            self._input_method.packet_width,
+        )
+
+    @property
+    def prepared_packets_stats(self):
+        return self._prepared_packets.stats
+
+    def clear_prepared_packets(self):
+        "Has to be called whenever a message definition is replaced, so packets encoded with the old one are never sent."
+        self._prepared_packets.clear()
 
     def _prepare_message(self, message: MessageOut):
         if message.name not in self._owtp.registered_msg_def:
@@ -69,7 +171,11 @@ class MessageDispatcher:
                 f"Cannot send message {message.name} - the Workshop mode hasn't reported that it supports it!"
             )
 
-        message.prepare(self._owtp.registered_msg_def[message.name])
+        message.prepare(
+            self._owtp.registered_msg_def[message.name],
+            self._prepared_packets,
+            Feature.COMPRESSION in self._owtp.features,
+        )
 
     def put(self, message: MessageOut):
         self._prepare_message(message)
@@ -79,31 +185,40 @@ class MessageDispatcher:
             message.name,
             message.data,
         )
-        self._messages_queue.put_nowait(message, message.priority)
+        replaced = self._messages_queue.put_nowait(
+            message, message.priority, message.conflation_key
+        )
 
-    def remove_of_type(self, message_type: DefineMessageOut[Any]):
-        copy = self._messages_queue.items()
+        if replaced:
+            logger.debug(
+                'Message "%s" with data %s has been replaced in the queue',
+                replaced.name,
+                replaced.data,
+            )
+            replaced.state = MessageOutState.REPLACED
+            self._owtp.events.send_message_replaced.emit(replaced, message)
 
-        if self._currently_sent_message:
-            copy.append(self._currently_sent_message)
+    def remove_of_type(self, message_type: DefineMessageOut[Any]):
+        copy = self._messages_queue.items() + self._current_frame
 
         for msg in copy:
             if is_message_out(msg, message_type):
                 self.remove(msg)
 
     def remove_of_name(self, name: str):
-        copy = self._messages_queue.items()
-
-        if self._currently_sent_message:
-            copy.append(self._currently_sent_message)
+        copy = self._messages_queue.items() + self._current_frame
 
         for msg in copy:
             if msg.name == name:
                 self.remove(msg)
 
     def remove(self, message: MessageOut):
-        if self._currently_sent_message == message:
-            self.cancel_current()
+        if message in self._current_frame:
+            # the frame is typed again without it, unless it has already been typed in full
+            self._removed_from_frame.add(message)
+
+            if self._removed_from_frame.issuperset(self._current_frame):
+                self.cancel_current()
 
         if message in self._messages_queue.items():
             logger.debug(
@@ -113,9 +228,37 @@ class MessageDispatcher:
             )
             self._messages_queue.remove_nowait(message)
 
-    def retry(self, error_code: str):
-        if self._send_and_confirm_task:
-            self._send_and_confirm_task.cancel(error_code)
+    def retry(
+        self,
+        error_code: str,
+        sequence: int | None = None,
+        packets: Sequence[int | Sequence[int]] = (),
+    ):
+        if task := self._send_and_confirm_tasks.get(sequence):
+            if packets and self._is_retransmitting_selectively():
+                self._damaged_packets[sequence] = packets
+
+            task.cancel(error_code)
+
+    def confirm(self, sequence: int):
+        "Handles a confirmation of the frame with `sequence` number, sent while pipelining."
+        acknowledgement = self._acknowledgements.get(sequence)
+
+        if not acknowledgement:
+            logger.warning(
+                "Received confirmation of frame #%s, which isn't awaiting it",
+                sequence,
+            )
+            return
+
+        if not acknowledgement.done():
+            acknowledgement.set_result(None)
+
+    async def confirm_unsequenced(
+        self, message: MessageIn[messages.ConfirmMessageData]
+    ):
+        "Handles a confirmation of the frame sent without a sequence number, waiting until it's been passed to the frame."
+        await self._pass_response_and_wait(message)
 
     def is_paused(self):
         return self._pause_event.is_set()
@@ -135,14 +278,14 @@ class MessageDispatcher:
             self._pause_event.clear()
 
     def cancel_current(self):
-        if self._currently_sent_message:
+        if self._current_frame:
             logger.debug(
-                'Cancelling currently sent message "%s"',
-                self._currently_sent_message.name,
+                "Cancelling currently sent messages %s",
+                [message.name for message in self._current_frame],
             )
             self._cancel_event.set()
 
-    async def _pass_response_and_wait(self, message: MessageIn):
+    async def _pass_response_and_wait(self, message: MessageIn[Any]):
         event = asyncio.Event()
         self._responses_queue.put_nowait((message, event))
         await event.wait()
@@ -152,105 +295,519 @@ class MessageDispatcher:
             while self._pause_event.is_set():
                 await asyncio.sleep(0.1)
 
+            pipelining = self._is_pipelining()
+
+            if pipelining:
+                await self._window.acquire()
+
             message = await self._messages_queue.get()
-            fail_reason = await self._send_message(message)
+            frame = [message, *self._take_frame_companions(message)]
+
+            if pipelining:
+                # the next frame can be sent while this one awaits confirmation
+                task = asyncio.create_task(self._send_pipelined(frame))
+                self._frame_tasks.add(task)
+                task.add_done_callback(self._frame_tasks.discard)
+                continue
+
+            fail_reason = await self._send_messages(frame, False)
+            self._finish_frame(frame, fail_reason)
+
+    async def _send_pipelined(self, frame: list[MessageOut]):
+        try:
+            fail_reason = await self._send_messages(frame, True)
+        finally:
+            self._window.release()
+
+        self._finish_frame(frame, fail_reason)
 
+    def _finish_frame(self, frame: list[MessageOut], fail_reason: str | None):
+        for _ in frame:
             self._messages_queue.task_done()
 
-            if (
-                self._messages_queue.empty()
-                and not fail_reason
-                and self._owtp._connection.interactive  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
-            ):
-                if message.name != MessageName.TRANSMISSION_FINISHED:
-                    self.put(messages.TransmissionFinishedMessage())
-                else:
-                    self.pause(True)
+        if (
+            self._messages_queue.empty()
+            and not self._current_frame
+            and not fail_reason
+            and self._owtp._connection.interactive  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+        ):
+            if frame[-1].name != MessageName.TRANSMISSION_FINISHED:
+                self.put(messages.TransmissionFinishedMessage())
+            else:
+                self.pause(True)
+
+    def _is_pipelining(self):
+        return (
+            self._window_size > 1
+            and Feature.PIPELINING in self._owtp.features
+            and self._owtp.is_connected
+        )
 
-    async def _send_message(self, message: MessageOut):
-        self._currently_sent_message = message
-        self._cancel_event.clear()
+    async def _take_sequence(self):
+        "Returns the next sequence number, once every frame awaiting confirmation stays within `RETRANSMISSION_WINDOW` numbers of it - otherwise the Workshop mode would take their retransmissions for new frames."
+        while self._acknowledgements and (
+            self._next_sequence - next(iter(self._acknowledgements))
+        ) % SEQUENCE_SPACE >= RETRANSMISSION_WINDOW:
+            self._sequence_released.clear()
+            await self._sequence_released.wait()
+
+        sequence = self._next_sequence
+        self._next_sequence = (sequence + 1) % SEQUENCE_SPACE
+        self._acknowledgements[sequence] = (
+            asyncio.get_running_loop().create_future()
+        )
 
-        logger.debug(
-            'Starting sending message "%s" with data %s, packets: %s',
-            message.name,
-            message.data,
-            message.packets,
+        return sequence
+
+    def _is_retransmitting_selectively(self):
+        return Feature.SELECTIVE_RETRANSMISSION in self._owtp.features
+
+    def _is_segmenting(self):
+        # unlike other features, it already applies to the response to the connection request - the Workshop mode can't tell segmented frames apart
+        return self._is_retransmitting_selectively() or self._has_parity()
+
+    def _has_parity(self):
+        return Feature.PARITY in self._owtp.features
+
+    def _count_parity_segments(self, packets: bytes):
+        "Number of parity segments of a frame returned by :func:`segment_frame`, never more than segments it protects."
+        segments = count_segments(packets)
+
+        if segments < PARITY_MIN_SEGMENTS:
+            return 0
+
+        return min(self._parity_segments, segments)
+
+    def _is_batching(self):
+        return (
+            self._max_frame_size > 0
+            and Feature.BATCHING in self._owtp.features
+            and self._owtp.is_connected
         )
-        message.state = MessageOutState.SENDING
-        self._owtp.events.send_message_start.emit(message)
 
-        fail_reason = await self._send_with_retries(message)
+    def _take_frame_companions(self, first: MessageOut):
+        "Takes messages waiting in the queue that fit into the same frame as `first`, if the Workshop mode supports frames of several messages."
+        companions: list[MessageOut] = []
 
-        if fail_reason:
-            logger.warning(fail_reason)
-            message.state = MessageOutState.ERROR
-            self._owtp.events.send_message_error.emit(message, fail_reason)
+        if not self._is_batching():
+            return companions
+
+        size = len(first.packets)
 
-        self._currently_sent_message = None
+        while (message := self._messages_queue.peek_nowait()) is not None:
+            if message.is_expired:
+                # discarded before the frame is sent, so it doesn't take up any space
+                companions.append(self._messages_queue.get_nowait())
+                continue
+
+            # every additional message shares the start, end and checksum packets, but needs a separator
+            size += len(message.packets) - FRAME_OVERHEAD
+
+            if size > self._max_frame_size:
+                break
+
+            companions.append(self._messages_queue.get_nowait())
+
+        return companions
+
+    async def _send_messages(self, frame: list[MessageOut], pipelined: bool):
+        frame = self._discard_expired(frame)
+
+        if not self._current_frame:
+            self._cancel_event.clear()
+
+        self._current_frame = self._current_frame + frame
+
+        for message in frame:
+            started = message.started
+            message.state = MessageOutState.SENDING
+
+            if started:
+                # put back into the queue after being preempted
+                continue
+
+            logger.debug(
+                'Starting sending message "%s" with data %s, packets: %s',
+                message.name,
+                message.data,
+                list(message.packets),
+            )
+            self._owtp.events.send_message_start.emit(message)
+
+        try:
+            fail_reason = await self._send_frame(frame, pipelined)
+        except Preempted:
+            fail_reason = None
+            self._requeue(frame)
+
+        self._current_frame = [
+            msg for msg in self._current_frame if msg not in frame
+        ]
+        self._removed_from_frame.difference_update(frame)
         return fail_reason
 
-    async def _send_with_retries(self, message: MessageOut):
-        for attempt in range(message.number_of_attempts):
+    async def _send_frame(
+        self, frame: list[MessageOut], pipelined: bool
+    ) -> str | None:
+        removed = [msg for msg in frame if msg in self._removed_from_frame]
+        frame = [msg for msg in frame if msg not in self._removed_from_frame]
+
+        for message in removed:
+            self._fail(
+                [message],
+                f'Cancelling sending message "{message.name}" - removed from the frame',
+            )
+
+        frame = self._discard_expired(frame)
+
+        if not frame:
+            return None
+
+        if len(frame) == 1:
+            description = f'message "{frame[0].name}"'
+            attempts = frame[0].number_of_attempts
+        else:
+            names = ", ".join(msg.name for msg in frame)
+            description = f"frame of {len(frame)} messages ({names})"
+            attempts = FRAME_ATTEMPTS
+
+        sequence = await self._take_sequence() if pipelined else None
+
+        if sequence is not None:
+            description += f" #{sequence}"
+
+        packets = (
+            frame[0].packets
+            if len(frame) == 1 and sequence is None
+            else encode_frame([msg.packets for msg in frame], sequence)
+        )
+
+        if self._is_segmenting():
+            packets = segment_frame(packets)
+
+        try:
+            fail_reason = await self._send_with_retries(
+                frame, description, packets, attempts, sequence
+            )
+        finally:
+            self._damaged_packets.pop(sequence, None)
+
+            if sequence is not None:
+                del self._acknowledgements[sequence]
+                self._sequence_released.set()
+
+        if not fail_reason:
+            for message in frame:
+                definition = message.definition
+
+                if message.keyframe and definition and definition.delta_state:
+                    definition.delta_state.confirm(message.keyframe)
+
+                message.state = MessageOutState.SENT
+                self._owtp.events.send_message_finish.emit(message)
+            return None
+
+        if self._owtp.is_stopped or self._cancel_event.is_set():
+            self._fail(frame, fail_reason)
+            return fail_reason
+
+        if any(
+            msg.is_expired or msg in self._removed_from_frame for msg in frame
+        ):
+            # keypresses of the next tries go only to messages that are still relevant
+            logger.info("%s Sending the rest of the frame...", fail_reason)
+            return await self._send_frame(frame, pipelined)
+
+        if len(frame) == 1:
+            self._fail(frame, fail_reason)
+            return fail_reason
+
+        # one bad message shouldn't block the others - retry both halves separately
+        logger.warning("%s Splitting the frame...", fail_reason)
+        middle = len(frame) // 2
+        first_half = await self._send_frame(frame[:middle], pipelined)
+        second_half = await self._send_frame(frame[middle:], pipelined)
+
+        return first_half or second_half
+
+    def _requeue(self, frame: list[MessageOut]):
+        "Puts messages of a preempted frame that haven't been sent yet back into the queue, in front of others of the same priority."
+        # in reverse, so the messages keep their order at the front of the queue
+        for message in reversed(frame):
+            if message.state != MessageOutState.SENDING:
+                continue
+
+            if message in self._removed_from_frame:
+                self._fail(
+                    [message],
+                    f'Cancelling sending message "{message.name}" - removed from the frame',
+                )
+                continue
+
+            logger.debug(
+                'Putting message "%s" with data %s back into the queue',
+                message.name,
+                message.data,
+            )
+            # it has already started, so it won't start once again
+            message.state = MessageOutState.NONE
+            # without the conflation key - a newer message queued with the same key in the meantime mustn't be replaced by this one
+            self._messages_queue.put_nowait(
+                message, message.priority, first=True
+            )
+
+    def _is_preempted(self, priority: int):
+        "Whether a message urgent enough to preempt a frame of `priority` is waiting to be sent."
+        if (
+            self._preempting_priority is None
+            or Feature.PREEMPTION not in self._owtp.features
+        ):
+            return False
+
+        waiting = list(self._waiting_priorities)
+
+        if (message := self._messages_queue.peek_nowait()) is not None:
+            waiting.append(message.priority)
+
+        return any(
+            other <= self._preempting_priority and other < priority
+            for other in waiting
+        )
+
+    def _has_removed(self, frame: list[MessageOut]):
+        "Whether some messages of the frame have been removed while it was being sent."
+        return not self._removed_from_frame.isdisjoint(frame)
+
+    def _widen(self, packets: bytes) -> Sequence[int]:
+        "Transcodes packets of a frame into wider packets, if both the Workshop mode and the keybinds support them."
+        packet_width = PacketWidth(
+            self.packet_width, Feature.PREEMPTION in self._owtp.features
+        )
+        width = packet_width.width
+
+        if self._packet_width != packet_width:
+            logger.info("Sending packets %s bits wide", width)
+            self._packet_width = packet_width
+
+        if width == BASE_PACKET_WIDTH:
+            return packets
+
+        return self._packet_width.encode(packets)
+
+    def _discard_expired(self, frame: list[MessageOut]):
+        "Reports messages of the frame whose deadline has passed, returning the rest."
+        live: list[MessageOut] = []
+
+        for message in frame:
+            if not message.is_expired:
+                live.append(message)
+                continue
+
+            logger.info(
+                'Discarding message "%s" with data %s - its deadline has passed',
+                message.name,
+                message.data,
+            )
+            message.state = MessageOutState.EXPIRED
+            self._owtp.events.send_message_expired.emit(message)
+
+        return live
+
+    def _fail(self, frame: list[MessageOut], fail_reason: str):
+        logger.warning(fail_reason)
+
+        for message in frame:
+            message.state = MessageOutState.ERROR
+            self._owtp.events.send_message_error.emit(message, fail_reason)
+
+    async def _send_with_retries(
+        self,
+        frame: list[MessageOut],
+        description: str,
+        packets: bytes,
+        attempts: int,
+        sequence: int | None = None,
+    ):
+        for attempt in range(attempts):
             if self._owtp.is_stopped:
-                return f'Cancelling sending message "{message.name}" (try #{attempt + 1}) - received stop event'
+                return f"Cancelling sending {description} (try #{attempt + 1}) - received stop event"
 
             if self._cancel_event.is_set():
-                return f'Cancelling sending message "{message.name}" (try #{attempt + 1}) - received cancel event'
+                return f"Cancelling sending {description} (try #{attempt + 1}) - received cancel event"
 
-            logger.info(
-                'Sending message "%s" (try #%s)...', message.name, attempt + 1
+            if attempt and any(msg.is_expired for msg in frame):
+                return f"Stopping sending {description} (try #{attempt + 1}) - deadline of some of its messages has passed"
+
+            if attempt and self._has_removed(frame):
+                return f"Stopping sending {description} (try #{attempt + 1}) - some of its messages have been removed"
+
+            damaged = self._damaged_packets.pop(sequence, ())
+            segments = damaged_segments(packets, damaged) if damaged else []
+
+            if segments:
+                logger.info(
+                    "Sending %s of %s segments of %s (try #%s)...",
+                    len(segments),
+                    count_segments(packets),
+                    description,
+                    attempt + 1,
+                )
+                attempt_packets = encode_repair(packets, segments, sequence)
+            else:
+                logger.info(
+                    "Sending %s (try #%s)...", description, attempt + 1
+                )
+                attempt_packets = (
+                    add_parity(packets, self._count_parity_segments(packets))
+                    if self._has_parity()
+                    else packets
+                )
+
+            task = asyncio.create_task(
+                self._send_and_confirm(
+                    description,
+                    self._widen(attempt_packets),
+                    attempt,
+                    frame,
+                    sequence,
+                )
             )
+            self._send_and_confirm_tasks[sequence] = task
 
             try:
-                self._send_and_confirm_task = asyncio.create_task(
-                    self._send_and_confirm(message, attempt)
-                )
-                await self._send_and_confirm_task
+                await task
                 return None
+            except Preempted as e:
+                logger.info(
+                    "Preempted sending %s (try #%s) - %s",
+                    description,
+                    attempt + 1,
+                    e,
+                )
+                raise
             except BaseException as e:
                 logger.warning(
-                    'Failed sending message "%s" (try #%s): %s',
-                    message.name,
+                    "Failed sending %s (try #%s): %s",
+                    description,
                     attempt + 1,
                     repr(e),
                 )
 
-            if (
-                self._send_and_confirm_task
-                and not self._send_and_confirm_task.done()
-            ):
-                self._send_and_confirm_task.cancel()
+                if isinstance(e, TimeoutError):
+                    self._owtp.latency.round_trip.record_timeout()
 
-            await asyncio.sleep(1.5)
+                if self._is_lost_packet(e):
+                    self._update_timing(False)
+            finally:
+                del self._send_and_confirm_tasks[sequence]
 
-        return f'Giving up on message "{message.name}" after sending it {message.number_of_attempts} times!'
+            if not task.done():
+                task.cancel()
 
-    async def _send_and_confirm(self, message: MessageOut, attempt: int):
-        for packet in message.packets:
-            await self._input_method.send_input(
-                packet, self._buttons_down_ticks * TICK
+            await asyncio.sleep(
+                self._owtp.latency.round_trip.backoff(attempt + 1)
             )
-            await asyncio.sleep(self._buttons_up_ticks * TICK)
+
+        return f"Giving up on {description} after sending it {attempts} times!"
+
+    async def _send_and_confirm(
+        self,
+        description: str,
+        packets: Sequence[int],
+        attempt: int,
+        frame: list[MessageOut],
+        sequence: int | None = None,
+    ):
+        priority = min(msg.priority for msg in frame)
+
+        # only one frame can be typed at a time, even if several are awaiting confirmation
+        self._waiting_priorities.append(priority)
+
+        try:
+            await self._input_lock.acquire()
+        finally:
+            self._waiting_priorities.remove(priority)
+
+        try:
+            for idx, packet in enumerate(packets):
+                # checked between packets, so an urgent message waits for a single packet rather than the whole frame
+                if self._is_preempted(priority):
+                    if idx:
+                        await self._abort_typing(packets[0])
+
+                    raise Preempted("a more urgent message is waiting")
+
+                if self._has_removed(frame) and (
+                    not idx or Feature.PREEMPTION in self._owtp.features
+                ):
+                    if idx:
+                        await self._abort_typing(packets[0])
+
+                    raise Preempted("some of its messages have been removed")
+
+                # read for every packet, so the timing adapts even in the middle of a frame
+                await self._input_method.send_input(
+                    packet, self._owtp.timing.down_time
+                )
+                await asyncio.sleep(self._owtp.timing.up_time)
+        finally:
+            self._input_lock.release()
 
         logger.debug(
-            'Finished sending packets of message "%s", awaiting for confirmation...',
-            message.name,
+            "Finished sending packets of %s, awaiting for confirmation...",
+            description,
         )
+        sent_at = time.perf_counter()
 
         await asyncio.wait_for(
-            self._wait_for_response(MessageName.CONFIRM.value),
-            1.5,
+            (
+                self._wait_for_response(MessageName.CONFIRM.value)
+                if sequence is None
+                # a confirmation of an earlier try is just as good
+                else asyncio.shield(self._acknowledgements[sequence])
+            ),
+            self._owtp.latency.round_trip.timeout,
         )
 
+        self._owtp.latency.record_confirm(
+            time.perf_counter() - sent_at, attempt == 0
+        )
+        self._update_timing(True)
+
         logger.info(
-            'Message "%s" has been successfully sent after %s tries',
-            message.name,
-            attempt + 1,
+            "Successfully sent %s after %s tries", description, attempt + 1
+        )
+
+    async def _abort_typing(self, start_end: int):
+        "Ends a partially typed frame, started by the `start_end` packet, so the Workshop mode throws it away."
+        packet_width = PacketWidth(start_end.bit_length(), True)
+
+        for packet in (packet_width.abort, packet_width.start_end):
+            await self._input_method.send_input(
+                packet, self._owtp.timing.down_time
+            )
+            await asyncio.sleep(self._owtp.timing.up_time)
+
+    @staticmethod
+    def _is_lost_packet(error: BaseException):
+        "Whether a try failed in a way that suggests packets are sent too fast for the game to register them."
+        if isinstance(error, TimeoutError):
+            return True
+
+        return (
+            isinstance(error, asyncio.CancelledError)
+            and bool(error.args)
+            and error.args[0] == ErrorCode.INVALID_PACKET
+        )
+
+    def _update_timing(self, success: bool):
+        timing = self._owtp.timing
+        changed = (
+            timing.record_success() if success else timing.record_failure()
         )
 
-        message.state = MessageOutState.SENT
-        self._owtp.events.send_message_finish.emit(message)
+        if changed:
+            self._owtp.events.timing_change.emit(timing.snapshot())
 
     async def _wait_for_response(
         self,
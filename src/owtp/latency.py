@@ -0,0 +1,226 @@
+"Measures end-to-end latency of OWTP using timestamps the Workshop prepends to its output."
+
+import random
+import time
+from collections import deque
+from typing import TypedDict
+
+from ..utils import HistogramSummary, LatencyHistogram
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+CLOCK_OFFSET_WINDOW = 256
+"Number of most recent samples :class:`ClockOffsetEstimator` estimates the offset from."
+
+INITIAL_TIMEOUT = 1.5
+"Time (in seconds) a confirmation is awaited for before any round trip has been measured."
+
+MIN_TIMEOUT = 0.25
+
+MAX_TIMEOUT = 10.0
+
+MAX_BACKOFF = 10.0
+
+RTT_GAIN = 1 / 8
+"Weight of a new sample in the smoothed round trip time."
+
+RTT_VARIANCE_GAIN = 1 / 4
+"Weight of a new sample in the round trip time variation."
+
+RTT_VARIANCE_FACTOR = 4
+
+
+def parse_workshop_timestamp(timestamp: str) -> int | None:
+    "Converts `[hh:mm:ss` part of the Workshop output into seconds since midnight, or returns `None` if it isn't a timestamp."
+    hours, _, rest = timestamp.removeprefix("[").partition(":")
+    minutes, _, seconds = rest.partition(":")
+
+    try:
+        return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+    except ValueError:
+        return None
+
+
+def wrap_day(seconds: float) -> float:
+    "Wraps difference of two times of day into `[-12h, 12h)`, so outputs logged right before midnight are handled properly."
+    return (seconds + SECONDS_PER_DAY / 2) % SECONDS_PER_DAY - SECONDS_PER_DAY / 2
+
+
+class ClockOffsetEstimator:
+    """Estimates offset between the clock of the game and the clock of this machine.
+
+    Every observed delay between a Workshop timestamp and the moment the output has been read is the offset plus the latency of writing and reading the log, plus up to a second lost to the timestamp having a resolution of one second. The lowest of the recent delays is the best estimate of the offset alone."""
+
+    def __init__(self, window: int = CLOCK_OFFSET_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._offset: float | None = None
+
+    @property
+    def offset(self):
+        return self._offset
+
+    def add_sample(self, workshop_time: int, received_at: float):
+        "Adds a sample of Workshop output with `workshop_time` timestamp read at `received_at` (seconds since the epoch)."
+        delay = wrap_day(received_at % SECONDS_PER_DAY - workshop_time)
+
+        if self._offset is None:
+            self._samples.append(delay)
+            self._offset = delay
+            return
+
+        # keep the delays relative to the current estimate, so they don't wrap around midnight
+        delay = self._offset + wrap_day(delay - self._offset)
+        evicted = (
+            self._samples[0]
+            if len(self._samples) == self._samples.maxlen
+            else None
+        )
+        self._samples.append(delay)
+
+        if delay < self._offset:
+            self._offset = delay
+        elif evicted == self._offset:
+            self._offset = min(self._samples)
+
+    def to_local_time(self, workshop_time: int, reference: float) -> float:
+        "Converts `workshop_time` into seconds since the epoch, picking the day closest to `reference`."
+        if self._offset is None:
+            raise RuntimeError("Clock offset hasn't been estimated yet")
+
+        return reference + wrap_day(
+            workshop_time + self._offset - reference % SECONDS_PER_DAY
+        )
+
+
+class RoundTripSummary(TypedDict):
+    smoothed: float | None
+    variation: float | None
+    timeout: float
+    timeouts: int
+
+
+class RoundTripEstimator:
+    """Estimates how long a confirmation of a frame can take from round trip times observed so far, the way TCP computes its retransmission timeout (RFC 6298).
+
+    Only confirmations of first tries are sampled, since a confirmation after a retry might belong to an earlier try (Karn's algorithm). Every timeout doubles the timeout until the next sample, so a link that has become slow is never flooded with retries."""
+
+    def __init__(self):
+        self.smoothed: float | None = None
+        "Smoothed round trip time (in seconds)."
+        self.variation: float | None = None
+        "Smoothed mean deviation of round trip times (in seconds)."
+        self.timeouts = 0
+        self._timeout = INITIAL_TIMEOUT
+
+    @property
+    def timeout(self):
+        "Time (in seconds) a confirmation is awaited for before the frame is considered lost."
+        return self._timeout
+
+    def add_sample(self, seconds: float):
+        if self.smoothed is None or self.variation is None:
+            self.smoothed = seconds
+            self.variation = seconds / 2
+        else:
+            self.variation += RTT_VARIANCE_GAIN * (
+                abs(self.smoothed - seconds) - self.variation
+            )
+            self.smoothed += RTT_GAIN * (seconds - self.smoothed)
+
+        self._timeout = self._clamp(
+            self.smoothed + RTT_VARIANCE_FACTOR * self.variation
+        )
+
+    def record_timeout(self):
+        self.timeouts += 1
+        self._timeout = self._clamp(self._timeout * 2)
+
+    def backoff(self, attempt: int) -> float:
+        "Returns time (in seconds) to wait for before retry number `attempt` (starting from 1), giving late responses to the previous try a round trip to arrive. Randomized, so retries of frames that failed together don't stay in lockstep."
+        base = self.smoothed if self.smoothed is not None else INITIAL_TIMEOUT
+        delay = min(base * 2 ** (attempt - 1), MAX_BACKOFF)
+        return random.uniform(delay / 2, delay)
+
+    def summary(self) -> RoundTripSummary:
+        return {
+            "smoothed": self.smoothed,
+            "variation": self.variation,
+            "timeout": self._timeout,
+            "timeouts": self.timeouts,
+        }
+
+    @staticmethod
+    def _clamp(seconds: float):
+        return max(MIN_TIMEOUT, min(seconds, MAX_TIMEOUT))
+
+
+class LatencySummary(TypedDict):
+    clock_offset: float | None
+    emission_to_read: HistogramSummary
+    read_to_delivery: HistogramSummary
+    emission_to_delivery: HistogramSummary
+    packets_to_confirm: HistogramSummary
+    round_trip: RoundTripSummary
+
+
+class LatencyMetrics:
+    "Latency histograms of the OWTP connection, which can be queried at runtime."
+
+    def __init__(self):
+        self.clock = ClockOffsetEstimator()
+
+        self.emission_to_read = LatencyHistogram()
+        "Time from the Workshop logging a message to the log being read."
+        self.read_to_delivery = LatencyHistogram()
+        "Time from the log being read to the message being delivered to plugins."
+        self.emission_to_delivery = LatencyHistogram()
+        "Time from the Workshop logging a message to the message being delivered to plugins."
+        self.packets_to_confirm = LatencyHistogram()
+        "Time from the last packet of an outgoing message being sent to receiving its confirmation."
+        self.round_trip = RoundTripEstimator()
+        "Estimate of the time a confirmation can take, based on :attr:`packets_to_confirm` of first tries."
+
+    def reset(self):
+        self.emission_to_read.reset()
+        self.read_to_delivery.reset()
+        self.emission_to_delivery.reset()
+        self.packets_to_confirm.reset()
+
+    def add_clock_sample(self, workshop_time: int | None, received_at: float):
+        if workshop_time is not None:
+            self.clock.add_sample(workshop_time, received_at)
+
+    def record_delivery(
+        self,
+        workshop_time: int | None,
+        received_at: float,
+        delivered_at: float | None = None,
+    ):
+        "Records latency of a message logged at `workshop_time`, read at `received_at` and delivered at `delivered_at` (seconds since the epoch)."
+        if delivered_at is None:
+            delivered_at = time.time()
+
+        self.read_to_delivery.record(delivered_at - received_at)
+
+        if workshop_time is None or self.clock.offset is None:
+            return
+
+        emitted_at = self.clock.to_local_time(workshop_time, received_at)
+        self.emission_to_read.record(received_at - emitted_at)
+        self.emission_to_delivery.record(delivered_at - emitted_at)
+
+    def record_confirm(self, seconds: float, first_try: bool = True):
+        self.packets_to_confirm.record(seconds)
+
+        if first_try:
+            self.round_trip.add_sample(seconds)
+
+    def summary(self) -> LatencySummary:
+        return {
+            "clock_offset": self.clock.offset,
+            "emission_to_read": self.emission_to_read.summary(),
+            "read_to_delivery": self.read_to_delivery.summary(),
+            "emission_to_delivery": self.emission_to_delivery.summary(),
+            "packets_to_confirm": self.packets_to_confirm.summary(),
+            "round_trip": self.round_trip.summary(),
+        }
@@ -1,83 +1,389 @@
 import asyncio
 import json
-from typing import TYPE_CHECKING, Any
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Mapping
 
 from ..logging import create_logger
-from ..utils import is_key_value_pair, key_value_pair_to_dict
-from .message import MessageData
+from ..utils import (
+    LRUCache,
+    freeze,
+    is_key_value_pair,
+    key_value_pair_to_dict,
+)
+from .latency import parse_workshop_timestamp
+from .message import DefineMessageIn, MessageData, MessageIn, MessageName
 
 if TYPE_CHECKING:
     from .owtp import OWTP
 
 logger = create_logger("OWTP.LogProcess")
 
+MESSAGE_MARKER = f'"{MessageData.MESSAGE_NAME.value}"'
+"Substring every Workshop output containing a message has to include."
+
+CONTROL_MARKERS = [
+    f'"{name.value}"'
+    for name in [
+        MessageName.CONFIRM,
+        MessageName.ERROR,
+        MessageName.TRANSMISSION_READY,
+        MessageName.TRANSMISSION_NOT_READY,
+    ]
+]
+"Substrings identifying control messages, which are handled before any other Workshop output."
+
+PROTOCOL_MARKERS = [f'"{name.value}"' for name in MessageName]
+"Substrings identifying messages of the protocol itself, which are never dropped when the bulk lane is full - losing them would break the connection."
+
+BATCH_HISTORY = 100
+"Number of most recent :class:`BatchTiming` entries kept by :class:`WorkshopLogProcessor`."
+
+BULK_LANE_SIZE = 10_000
+"Default maximum number of ordinary Workshop output lines waiting to be processed."
+
+PARSE_CACHE_SIZE = 1024
+"Default number of recently parsed Workshop output payloads kept by :class:`WorkshopLogProcessor`."
+
+type ParsedLine = MessageIn | str | None
+"Message decoded from Workshop output, Workshop output itself if it's a plain log, or `None` if it should be skipped."
+
+type ParsedPayload = MessageIn | str
+"Message decoded from a payload, or the payload itself if it's a plain log that only looks like a message."
+
+type ReceivedLine = tuple[str, float]
+"Workshop output together with the time (in seconds since the epoch) it has been read at."
+
+
+class OverflowPolicy(Enum):
+    "What happens with Workshop output once the bulk lane of :class:`WorkshopLogProcessor` is full."
+
+    DROP_OLDEST = 0
+    "Discard the oldest waiting line to make room for the new one."
+    DROP_NEWEST = 1
+    "Discard the new line."
+
+
+@dataclass(frozen=True)
+class BatchTiming:
+    "Time it took to process a batch of Workshop output."
+
+    lines: int
+    parse_time: float
+    dispatch_time: float
+    control: bool = False
+
+    @property
+    def total_time(self):
+        return self.parse_time + self.dispatch_time
+
+    @property
+    def lines_per_second(self):
+        return self.lines / self.total_time if self.total_time else 0.0
+
 
 class WorkshopLogProcessor:
-    def __init__(self, owtp: "OWTP"):
+    """Processes Workshop output in two lanes - control messages (confirmations, errors and transmission state changes) that are always handled first, and a bounded lane for everything else."""
+
+    def __init__(
+        self,
+        owtp: "OWTP",
+        bulk_lane_size: int = BULK_LANE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        parse_cache_size: int = PARSE_CACHE_SIZE,
+    ):
         self._owtp = owtp
-        self._queue: asyncio.Queue[str] = asyncio.Queue()
-        self._task = asyncio.create_task(self._process_queue())
+        self._control_lane: deque[ReceivedLine] = deque()
+        self._bulk_lane: deque[ReceivedLine] = deque()
+        self._bulk_lane_size = bulk_lane_size
+        self._overflow_policy = overflow_policy
+        self._lines_available = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = asyncio.create_task(self._process_lanes())
+
+        # Workshop modes tend to log identical messages over and over (heartbeats, confirmations, ...)
+        self._parse_cache: LRUCache[str, ParsedPayload] = LRUCache(
+            parse_cache_size
+        )
+
+        self.batch_timings: deque[BatchTiming] = deque(maxlen=BATCH_HISTORY)
+        self.dropped_lines = 0
 
     def cleanup(self):
-        self._queue.shutdown(True)
         if self._task:
             self._task.cancel()
 
-    def add_lines(self, lines: list[str]):
+    @property
+    def parse_cache_stats(self):
+        return self._parse_cache.stats
+
+    def clear_parse_cache(self):
+        "Has to be called whenever the way messages are decoded changes, e.g. when an incoming message is registered."
+        self._parse_cache.clear()
+
+    def add_lines(self, lines: list[str], received_at: float | None = None):
+        if not lines:
+            return
+
+        if received_at is None:
+            received_at = time.time()
+
+        # the last line has been written right before it was read, so it gives the best estimate of the clock offset
+        timestamp, _ = self.split_workshop_output(lines[-1])
+        self._owtp.latency.add_clock_sample(
+            parse_workshop_timestamp(timestamp), received_at
+        )
+
         for line in lines:
-            self._queue.put_nowait(line)
+            _, payload = self.split_workshop_output(line)
+
+            if self.is_control_payload(payload):
+                self._control_lane.append((line, received_at))
+            elif (
+                len(self._bulk_lane) < self._bulk_lane_size
+                or self.is_protocol_payload(payload)
+            ):
+                self._bulk_lane.append((line, received_at))
+            else:
+                self._overflow((line, received_at))
+
+        self._idle.clear()
+        self._lines_available.set()
+
+    async def join(self):
+        "Waits until all added Workshop output has been processed."
+        # output added while the waiter was being woken up has to be processed as well
+        while not self._idle.is_set():
+            await self._idle.wait()
+
+    def _overflow(self, line: ReceivedLine):
+        self.dropped_lines += 1
+
+        match self._overflow_policy:
+            case OverflowPolicy.DROP_OLDEST:
+                # if only protocol messages are waiting, the new line gives way instead
+                dropped = self._drop_oldest() or line
+
+                if dropped is not line:
+                    self._bulk_lane.append(line)
+            case OverflowPolicy.DROP_NEWEST:
+                dropped = line
+
+        logger.warning(
+            'Too much Workshop output waiting to be processed, dropping "%s"',
+            dropped[0],
+        )
+
+    def _drop_oldest(self) -> ReceivedLine | None:
+        "Removes the oldest waiting line that isn't a protocol message, returning it, or `None` if there's none."
+        for idx, (line, _) in enumerate(self._bulk_lane):
+            _, payload = self.split_workshop_output(line)
+
+            if not self.is_protocol_payload(payload):
+                dropped = self._bulk_lane[idx]
+                del self._bulk_lane[idx]
+                return dropped
 
-    async def _process_queue(self):
+        return None
+
+    async def _process_lanes(self):
         while not self._owtp._stop_event.is_set():  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
-            line = await self._queue.get()
+            await self._lines_available.wait()
+            self._lines_available.clear()
+
+            while self._control_lane or self._bulk_lane:
+                await self._process_control_lane()
+
+                # take everything that's already waiting, so a burst is handled in one go
+                lines = list(self._bulk_lane)
+                self._bulk_lane.clear()
+                await self._process_batch(lines)
+
+            self._idle.set()
+
+    async def _process_control_lane(self):
+        while self._control_lane:
+            lines = list(self._control_lane)
+            self._control_lane.clear()
+            await self._process_batch(lines, control=True)
+
+    async def _process_batch(
+        self, lines: list[ReceivedLine], control: bool = False
+    ):
+        if not lines:
+            return
+
+        start = time.perf_counter()
+        parsed = [self._parse_line(line) for line, _ in lines]
+        parsed_at = time.perf_counter()
+
+        for (line, received_at), item in zip(lines, parsed):
+            # control messages might have arrived while the previous line was being dispatched
+            if not control:
+                await self._process_control_lane()
 
             try:
-                await self._handle_line(line)
+                await self._dispatch(line, item)
             except BaseException as e:
                 logger.error("Failed to handle Workshop output: %s", repr(e))
 
-            self._queue.task_done()
+            if isinstance(item, MessageIn):
+                timestamp, _ = self.split_workshop_output(line)
+                self._owtp.latency.record_delivery(
+                    parse_workshop_timestamp(timestamp), received_at
+                )
 
-    def parse_workshop_output(self, line: str) -> tuple[str, dict[str, Any]]:
-        payload = line.split("] ", 1)[1]
+        timing = BatchTiming(
+            lines=len(lines),
+            parse_time=parsed_at - start,
+            dispatch_time=time.perf_counter() - parsed_at,
+            control=control,
+        )
+        self.batch_timings.append(timing)
+
+        logger.debug(
+            "Processed %s batch of %s lines in %.3f ms (parsing: %.3f ms)",
+            "control" if control else "bulk",
+            timing.lines,
+            timing.total_time * 1e3,
+            timing.parse_time * 1e3,
+        )
+
+    @staticmethod
+    def split_workshop_output(line: str) -> tuple[str, str]:
+        "Splits Workshop output into its `[hh:mm:ss]` timestamp and the payload."
+        timestamp, _, payload = line.partition("] ")
+        return timestamp, payload
+
+    @staticmethod
+    def is_message_payload(payload: str) -> bool:
+        "Cheap structural check whether payload of a Workshop output looks like a message, without decoding it."
+        return (
+            payload.startswith("[")
+            and payload.endswith("]")
+            and MESSAGE_MARKER in payload
+        )
+
+    @staticmethod
+    def is_control_payload(payload: str) -> bool:
+        "Cheap structural check whether payload of a Workshop output looks like a control message."
+        return WorkshopLogProcessor.is_message_payload(payload) and any(
+            marker in payload for marker in CONTROL_MARKERS
+        )
+
+    @staticmethod
+    def is_protocol_payload(payload: str) -> bool:
+        "Cheap structural check whether payload of a Workshop output looks like a message of the protocol itself."
+        return WorkshopLogProcessor.is_message_payload(payload) and any(
+            marker in payload for marker in PROTOCOL_MARKERS
+        )
+
+    @staticmethod
+    def parse_payload(payload: str) -> tuple[str, list[Any]]:
+        "Decodes payload of a Workshop output into name of the message and its key value pairs."
         arr: list[Any] = json.loads(payload)
 
-        if not is_key_value_pair(arr):
+        if not isinstance(arr, list):
             raise TypeError(
-                f"The following Workshop output is not a key-value pair structure: {line}"
+                f"The following Workshop output is not a key-value pair structure: {payload}"
             )
 
-        data: dict[str, Any] = key_value_pair_to_dict(arr)
-        name = data.pop(MessageData.MESSAGE_NAME.value)
+        for item in arr:
+            if (
+                isinstance(item, list)
+                and len(item) == 2  # pyright: ignore[reportUnknownArgumentType]
+                and item[0] == MessageData.MESSAGE_NAME.value
+            ):
+                name = item[1]  # pyright: ignore[reportUnknownVariableType]
+                break
+        else:
+            raise KeyError(MessageData.MESSAGE_NAME.value)
 
         if not isinstance(name, str):
             raise TypeError(
                 f"Name of the message must be a string, but passed {name}"
             )
 
-        return name, data
+        return name, arr
+
+    @staticmethod
+    def decode_data(
+        message_class: DefineMessageIn[Any], pairs: list[Any]
+    ) -> Mapping[str, Any]:
+        "Converts key value pairs into `data` of the message, using decoder of the message if it has one."
+        if message_class.decoder:
+            return message_class.decoder(pairs)
+
+        if not is_key_value_pair(pairs):
+            raise TypeError(
+                f"Data of the message {message_class.name} is not a key-value pair structure: {pairs}"
+            )
+
+        data = key_value_pair_to_dict(pairs)
+        data.pop(MessageData.MESSAGE_NAME.value)
+        return data
+
+    @staticmethod
+    def parse_workshop_output(line: str) -> tuple[str, list[Any]]:
+        _, payload = WorkshopLogProcessor.split_workshop_output(line)
+        return WorkshopLogProcessor.parse_payload(payload)
+
+    def _handle_log(self, line: str):
+        logger.info('Workshop log: "%s"', line)
+        self._owtp.events.log.emit(line)
+
+    def _parse_line(self, line: str) -> ParsedLine:
+        _, payload = self.split_workshop_output(line)
+
+        # most of the Workshop output is plain text - don't bother decoding it
+        if not self.is_message_payload(payload):
+            return line
+
+        parsed = self._parse_cache.get(payload)
+
+        if parsed is None:
+            parsed = self._parse_message_payload(payload)
 
-    async def _handle_line(self, line: str):
+            # failures aren't cached, so they keep being reported
+            if parsed is None:
+                return None
+
+            self._parse_cache.put(payload, parsed)
+
+        return line if isinstance(parsed, str) else parsed
+
+    def _parse_message_payload(self, payload: str) -> ParsedPayload | None:
         try:
-            name, data = self.parse_workshop_output(line)
+            name, pairs = self.parse_payload(payload)
         except Exception:
-            logger.info('Workshop log: "%s"', line)
-            self._owtp.events.log.emit(line)
-            return
+            return payload
 
         message_class = self._owtp.registered_messages_in.get(name)
 
         if not message_class:
             logger.warning('Unregistered message "%s" - skipping', name)
-            return
+            return None
 
         try:
-            message = message_class(data)
+            # the message might be handed out again from the cache, so nobody can be allowed to modify it
+            data = self.decode_data(message_class, pairs)
+            return message_class(freeze(data))
         except Exception as e:
             logger.warning(
                 'Failed to handle message "%s" (%s) - skipping', name, repr(e)
             )
+            return None
+
+    async def _dispatch(self, line: str, item: ParsedLine):
+        if item is None:
+            return
+
+        if isinstance(item, str):
+            self._handle_log(line)
             return
 
-        logger.debug('Received message "%s" with data %s', name, data)
-        await self._owtp._dispatch_message(message)  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+        logger.debug('Received message "%s" with data %s', item.name, item.data)
+        await self._owtp._dispatch_message(item)  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
@@ -1,5 +1,11 @@
 from .alphabet import *
+from .compression import *
+from .delta import *
+from .encoder import *
 from .enums import *
+from .fixed_point import *
 from .incoming import *
 from .outgoing import *
+from .packet_width import *
+from .segments import *
 from .types import *
@@ -3,6 +3,12 @@
 ALPHABET = " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~"
 "List of characters supported by OWTP."
 
+ENCODE_TABLE = bytes(
+    ALPHABET.index(chr(byte)) + 1 if chr(byte) in ALPHABET else 0
+    for byte in range(256)
+)
+"Translation table for :meth:`bytes.translate` mapping every byte of an ASCII string into its numeric value, or `0` if it's not in the alphabet."
+
 
 def encode_character(char: str):
     "Encodes passed character into a numeric value."
@@ -20,6 +26,21 @@ def encode_character(char: str):
     return ALPHABET.index(char) + 1
 
 
+def encode_bytes(string: str) -> bytes:
+    "Encodes passed string into a buffer of numeric values using :data:`ENCODE_TABLE`."
+    try:
+        encoded = string.encode("ascii").translate(ENCODE_TABLE)
+    except UnicodeEncodeError:
+        encoded = b"\0"
+
+    if 0 in encoded:
+        # slow path, only to report which character cannot be encoded
+        for char in string:
+            encode_character(char)
+
+    return encoded
+
+
 def encode_string(string: str):
     "Encodes passed string into an array of numeric values."
-    return [encode_character(char) for char in string]
+    return list(encode_bytes(string))
@@ -0,0 +1,140 @@
+"""Optional compression of data packets, used only if the Workshop mode reports it supports it.
+
+Characters of the alphabet are encoded as values `1-95`, so the values between the alphabet and :class:`ReservedPackets` are free to be used as compression tokens:
+
+- `1-95` - literal character,
+- :data:`REPEAT_PACKET`, `n` - repeats the previous character `n + 2` more times,
+- :data:`MATCH_PACKETS`, `distance` - copies `token - MATCH_PACKETS.start + MIN_MATCH` characters starting `distance` characters back (the copied range may overlap with the copy itself).
+
+Compressed data therefore never has to be marked - plain data never contains any of the tokens."""
+
+from .alphabet import ALPHABET
+from .enums import ReservedPackets
+
+REPEAT_PACKET = len(ALPHABET) + 1
+MATCH_PACKETS = range(REPEAT_PACKET + 1, ReservedPackets.CONNECT.value)
+
+MAX_OPERAND = ReservedPackets.CONNECT.value - 1
+"Highest value of the packet following a token, so it never collides with :class:`ReservedPackets`."
+
+MIN_REPEAT = 3
+MAX_REPEAT = MAX_OPERAND + MIN_REPEAT - 1
+MIN_MATCH = 3
+MAX_MATCH = len(MATCH_PACKETS) + MIN_MATCH - 1
+MAX_DISTANCE = MAX_OPERAND
+
+_MAX_CANDIDATES = 16
+"Number of most recent occurrences of a prefix checked when looking for a match."
+
+
+def _run_length(data: bytes, start: int):
+    previous = data[start - 1]
+    end = start
+
+    while (
+        end < len(data)
+        and end - start < MAX_REPEAT
+        and data[end] == previous
+    ):
+        end += 1
+
+    return end - start
+
+
+def _longest_match(data: bytes, start: int, candidates: list[int]):
+    best_length, best_distance = 0, 0
+    limit = min(len(data) - start, MAX_MATCH)
+
+    for position in reversed(candidates):
+        distance = start - position
+
+        if distance > MAX_DISTANCE:
+            break
+
+        length = 0
+        while (
+            length < limit
+            and data[position + length] == data[start + length]
+        ):
+            length += 1
+
+        if length > best_length:
+            best_length, best_distance = length, distance
+
+            if length == limit:
+                break
+
+    return best_length, best_distance
+
+
+def compress(data: bytes) -> bytes:
+    "Greedily compresses data packets with run-length encoding and back-references into the last :data:`MAX_DISTANCE` characters."
+    result = bytearray()
+    prefixes: dict[bytes, list[int]] = {}
+    position = 0
+
+    while position < len(data):
+        run = _run_length(data, position) if position else 0
+        prefix = data[position : position + MIN_MATCH]
+        length, distance = _longest_match(
+            data, position, prefixes.get(prefix, [])
+        )
+
+        if run >= MIN_REPEAT and run >= length:
+            result += bytes((REPEAT_PACKET, run - MIN_REPEAT + 1))
+            consumed = run
+        elif length >= MIN_MATCH:
+            result += bytes(
+                (MATCH_PACKETS.start + length - MIN_MATCH, distance)
+            )
+            consumed = length
+        else:
+            result.append(data[position])
+            consumed = 1
+
+        for idx in range(position, position + consumed):
+            candidates = prefixes.setdefault(data[idx : idx + MIN_MATCH], [])
+            candidates.append(idx)
+
+            if len(candidates) > _MAX_CANDIDATES:
+                del candidates[0]
+
+        position += consumed
+
+    return bytes(result)
+
+
+def decompress(data: bytes) -> bytes:
+    "Reference decoder of :func:`compress`, doing what the Workshop mode does with compressed data packets."
+    result = bytearray()
+    position = 0
+
+    while position < len(data):
+        token = data[position]
+
+        if token < REPEAT_PACKET:
+            result.append(token)
+            position += 1
+            continue
+
+        if position + 1 >= len(data):
+            raise ValueError(f"Missing operand of token {token}")
+
+        operand = data[position + 1]
+        position += 2
+
+        if token == REPEAT_PACKET:
+            if not result:
+                raise ValueError("Nothing to repeat")
+
+            result += result[-1:] * (operand + MIN_REPEAT - 1)
+        elif token in MATCH_PACKETS:
+            if operand > len(result):
+                raise ValueError(f"Back-reference {operand} is out of range")
+
+            for _ in range(token - MATCH_PACKETS.start + MIN_MATCH):
+                result.append(result[-operand])
+        else:
+            raise ValueError(f"Unknown token {token}")
+
+    return bytes(result)
@@ -0,0 +1,127 @@
+"""Delta encoding of fields packed as fixed-point values, for messages sending streams of values that barely change, like positions of the camera.
+
+A message of a definition with any field registered as `[type, scale, width, delta_width]` starts with a header packet. Header `tag + 1` marks a keyframe, which carries every packed field in full and which the Workshop mode stores under `tag`. Header `KEYFRAME_TAGS + tag + 1` marks a message carrying only the differences from the keyframe stored under `tag`, each component in `delta_width` packets. Fields without `delta_width` are always sent in full, the rest of the fields as text as usual.
+
+Differences are always taken from a keyframe the Workshop mode has confirmed, never from the previous message, so lost, repeated or reordered messages can't make the Workshop mode drift away from the actual values. A new keyframe is sent periodically, in case the Workshop mode lost its state, and whenever a difference doesn't fit."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from .fixed_point import FixedPoint
+from .types import MessageDataType
+
+KEYFRAME_TAGS = 47
+"Number of keyframes the Workshop mode keeps at once - headers of keyframes and of differences share a single packet."
+
+KEYFRAME_INTERVAL = 16
+"Maximum number of messages sent as differences from a single keyframe."
+
+type QuantizedValues = tuple[tuple[int, ...], ...]
+"Quantized components of every packed field, in the order of the definition."
+
+
+@dataclass(frozen=True)
+class Keyframe:
+    tag: int
+    serial: int
+    "Increasing number of the keyframe, telling which of two keyframes is newer even after tags have wrapped around."
+    values: QuantizedValues
+
+
+class DeltaState:
+    "Keyframes of a single message definition, sent and confirmed by the Workshop mode."
+
+    def __init__(self):
+        self.confirmed: Keyframe | None = None
+        "Newest keyframe the Workshop mode has confirmed, which differences are taken from."
+        self._serial = 0
+        self._since_keyframe = 0
+
+    def reference(self) -> Keyframe | None:
+        "Returns the keyframe the next message can be sent as a difference from, or `None` if it should be sent as a keyframe."
+        if self._since_keyframe >= KEYFRAME_INTERVAL:
+            return None
+
+        # keyframes prepared since the confirmed one may have reused its tag, e.g. while messages pile up in the queue
+        if (
+            self.confirmed
+            and self._serial - self.confirmed.serial >= KEYFRAME_TAGS
+        ):
+            return None
+
+        return self.confirmed
+
+    def add_keyframe(self, values: QuantizedValues) -> Keyframe:
+        keyframe = Keyframe(self._serial % KEYFRAME_TAGS, self._serial, values)
+        self._serial += 1
+        self._since_keyframe = 0
+        return keyframe
+
+    def add_delta(self):
+        self._since_keyframe += 1
+
+    def confirm(self, keyframe: Keyframe):
+        if self.confirmed is None or keyframe.serial > self.confirmed.serial:
+            self.confirmed = keyframe
+
+
+class DeltaDecoder:
+    "Reference decoder of delta encoded messages of a single message definition, doing what the Workshop mode does with them."
+
+    def __init__(
+        self,
+        data_types: Mapping[str, MessageDataType],
+        fixed_point: Mapping[str, FixedPoint],
+    ):
+        self._fields = [
+            (
+                name,
+                fixed_point[name],
+                data_types[name] == MessageDataType.VECTOR,
+            )
+            for name in data_types
+            if name in fixed_point
+        ]
+        self._keyframes: dict[int, QuantizedValues] = {}
+
+    def decode(
+        self, data: bytes
+    ) -> tuple[dict[str, float | list[float]], bytes]:
+        "Decodes packed fields of a message, returning them together with data packets of the rest of the fields."
+        header = data[0] - 1
+        is_keyframe = header < KEYFRAME_TAGS
+        tag = header if is_keyframe else header - KEYFRAME_TAGS
+
+        if not is_keyframe and tag not in self._keyframes:
+            raise ValueError(f"Unknown keyframe {tag}")
+
+        position = 1
+        quantized: list[tuple[int, ...]] = []
+
+        for idx, (_, packing, is_vector) in enumerate(self._fields):
+            components: list[int] = []
+
+            for component in range(3 if is_vector else 1):
+                is_delta = not is_keyframe and packing.delta_width > 0
+                width = packing.delta_width if is_delta else packing.width
+                packets = data[position : position + width]
+                position += width
+
+                if is_delta:
+                    reference = self._keyframes[tag][idx][component]
+                    components.append(reference + packing.unpack_delta(packets))
+                else:
+                    components.append(packing.unpack_quantized(packets))
+
+            quantized.append(tuple(components))
+
+        if is_keyframe:
+            self._keyframes[tag] = tuple(quantized)
+
+        values: dict[str, float | list[float]] = {}
+
+        for (name, packing, is_vector), field in zip(self._fields, quantized):
+            unpacked = [value / 10**packing.scale for value in field]
+            values[name] = unpacked if is_vector else unpacked[0]
+
+        return values, data[position:]
@@ -0,0 +1,322 @@
+"Compiles message definitions into encoders turning `data` of outgoing messages into packets."
+
+import json
+import math
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from types import UnionType
+from json.encoder import encode_basestring_ascii
+from typing import Any
+
+from .alphabet import ALPHABET, encode_bytes
+from .compression import compress as compress_packets
+from .delta import KEYFRAME_TAGS, DeltaState, Keyframe
+from .enums import ReservedPackets
+from .fixed_point import FixedPoint
+from .types import TYPE_MAP, MessageDataType, Vector
+
+SEQUENCE_SPACE = len(ALPHABET)
+"Number of distinct sequence numbers of frames, each one sent as a single packet of the alphabet."
+
+RETRANSMISSION_WINDOW = SEQUENCE_SPACE // 2
+"Number of sequence numbers up to the newest one received within which a frame can be a retransmission, see :func:`encode_frame`."
+
+CHECKSUM_MOD = 113
+"Prime modulus of the checksum. Values going above 112 have higher chance of collision."
+
+# coprimes of the modulus; mixing factors to increase the avalanche effect
+_MIX_A = 73
+_MIX_B = 59
+
+# every step of the checksum only depends on the position modulo CHECKSUM_MOD, so it can be precomputed
+_NORM = bytes(
+    value % CHECKSUM_MOD or CHECKSUM_MOD - 1
+    for value in range(2 * CHECKSUM_MOD)
+)
+_SUM_TERMS = [
+    bytes(x * (i + 1) * _MIX_A % CHECKSUM_MOD for x in range(256))
+    for i in range(CHECKSUM_MOD)
+]
+_PROD_TERMS = [
+    bytes((x + _MIX_B + i) % CHECKSUM_MOD for x in range(256))
+    for i in range(CHECKSUM_MOD)
+]
+_PRODUCTS = [
+    bytes(_NORM[a * b % CHECKSUM_MOD] for b in range(CHECKSUM_MOD))
+    for a in range(CHECKSUM_MOD)
+]
+
+
+@dataclass(frozen=True)
+class ChecksumState:
+    """Running checksum based on Fletcher's checksum algorithm, computed from lookup tables.
+
+    Since it can be continued, the part covering the id of a message is computed only once per definition."""
+
+    sum_part: int = 0
+    prod_part: int = 1
+    length: int = 0
+
+    def update(self, data: Iterable[int]) -> "ChecksumState":
+        sum_part, prod_part, length = self.sum_part, self.prod_part, self.length
+        position = length % CHECKSUM_MOD
+
+        for x in data:
+            sum_part = _NORM[sum_part + _SUM_TERMS[position][x]]
+            prod_part = _PRODUCTS[prod_part][_PROD_TERMS[position][x]]
+            length += 1
+            position += 1
+
+            if position == CHECKSUM_MOD:
+                position = 0
+
+        return ChecksumState(sum_part, prod_part, length)
+
+    def digest(self):
+        return bytes((self.sum_part, self.prod_part))
+
+
+def _encode_number(value: int | float) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, int):
+        return int.__repr__(value)
+
+    if not math.isfinite(value):
+        return json.dumps(value)
+
+    return float.__repr__(value)
+
+
+def _encode_vector(value: Vector) -> str:
+    return f"[{_encode_number(value.x)},{_encode_number(value.y)},{_encode_number(value.z)}]"
+
+
+def _pack_vector(packing: FixedPoint, value: Vector) -> bytes:
+    return packing.pack(value.x) + packing.pack(value.y) + packing.pack(value.z)
+
+
+def _encode_array(value: list[Any]) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+_FIELD_ENCODERS: dict[MessageDataType, Callable[[Any], str]] = {
+    MessageDataType.ARRAY: _encode_array,
+    MessageDataType.BOOLEAN: _encode_number,
+    MessageDataType.NUMBER: _encode_number,
+    MessageDataType.STRING: encode_basestring_ascii,
+    MessageDataType.VECTOR: _encode_vector,
+}
+
+
+def _validate(
+    message_name: str,
+    name: str,
+    data_type: MessageDataType,
+    expected: type | UnionType,
+    data: Mapping[str, Any],
+):
+    value = data[name]
+
+    if not isinstance(value, expected):
+        raise TypeError(
+            f"{message_name} data validation error: value {value} of key {name} is not of a type {data_type.name}"
+        )
+
+    return value
+
+
+_START_END = bytes((ReservedPackets.START_END_CONFIRM.value,))
+_COMMA = bytes((ReservedPackets.COMMA.value,))
+
+
+class MessageEncoder:
+    """Encoder specialized for a single message definition, producing packets of a message as a compact buffer.
+
+    Fields with :class:`FixedPoint` packing are sent first, in the order of the definition, followed by the rest of the fields as text. If any of them can be sent as a difference from a keyframe, :meth:`encode_delta_data` has to be used instead of :meth:`encode_data`."""
+
+    def __init__(
+        self,
+        id: Iterable[int],
+        data_types: Mapping[str, MessageDataType],
+        fixed_point: Mapping[str, FixedPoint] | None = None,
+    ):  # pylint: disable=W0622
+        fixed_point = fixed_point or {}
+
+        self._id = bytes(id)
+        self._packed_fields = [
+            (
+                name,
+                data_type,
+                TYPE_MAP[data_type],
+                fixed_point[name],
+                data_type == MessageDataType.VECTOR,
+            )
+            for name, data_type in data_types.items()
+            if name in fixed_point
+        ]
+        self._fields = [
+            (name, data_type, TYPE_MAP[data_type], _FIELD_ENCODERS[data_type])
+            for name, data_type in data_types.items()
+            if name not in fixed_point
+        ]
+        self._id_checksum = ChecksumState().update(self._id)
+
+    def encode(
+        self,
+        message_name: str,
+        data: Mapping[str, Any],
+        compress: bool = False,
+    ) -> bytes:
+        "Validates `data` and encodes it together with the id into packets ready to be sent."
+        return self.encode_packets(
+            self.encode_data(message_name, data), compress
+        )
+
+    def encode_data(self, message_name: str, data: Mapping[str, Any]) -> bytes:
+        "Validates `data` and converts it into data packets. Equal data always results in the same packets."
+        packed: list[bytes] = []
+
+        for (
+            name,
+            data_type,
+            expected,
+            packing,
+            is_vector,
+        ) in self._packed_fields:
+            value = _validate(message_name, name, data_type, expected, data)
+            packed.append(
+                _pack_vector(packing, value)
+                if is_vector
+                else packing.pack(value)
+            )
+
+        return b"".join(packed) + self._encode_text(message_name, data)
+
+    def encode_delta_data(
+        self, message_name: str, data: Mapping[str, Any], state: DeltaState
+    ) -> tuple[bytes, Keyframe | None]:
+        "Validates `data` and converts it into data packets, sending packed fields as differences from the keyframe last confirmed by the Workshop mode when possible. Returns the packets together with the new keyframe, if the message is one."
+        quantized: list[tuple[int, ...]] = []
+
+        for (
+            name,
+            data_type,
+            expected,
+            packing,
+            is_vector,
+        ) in self._packed_fields:
+            value = _validate(message_name, name, data_type, expected, data)
+            components = (value.x, value.y, value.z) if is_vector else (value,)
+            quantized.append(tuple(packing.quantize(c) for c in components))
+
+        text = self._encode_text(message_name, data)
+        reference = state.reference()
+
+        if reference is not None:
+            deltas = self._pack_deltas(quantized, reference)
+
+            if deltas is not None:
+                state.add_delta()
+                header = KEYFRAME_TAGS + reference.tag + 1
+                return bytes((header,)) + deltas + text, None
+
+        keyframe = state.add_keyframe(tuple(quantized))
+        packed = bytearray((keyframe.tag + 1,))
+
+        for (_, _, _, packing, _), components in zip(
+            self._packed_fields, quantized
+        ):
+            for value in components:
+                packed += packing.pack_quantized(value)
+
+        return bytes(packed) + text, keyframe
+
+    def _pack_deltas(
+        self, quantized: list[tuple[int, ...]], reference: Keyframe
+    ) -> bytes | None:
+        packed = bytearray()
+
+        for (_, _, _, packing, _), components, reference_components in zip(
+            self._packed_fields, quantized, reference.values
+        ):
+            for value, reference_value in zip(components, reference_components):
+                packets = (
+                    packing.pack_delta(value - reference_value)
+                    if packing.delta_width
+                    else packing.pack_quantized(value)
+                )
+
+                if packets is None:
+                    return None
+
+                packed += packets
+
+        return bytes(packed)
+
+    def _encode_text(self, message_name: str, data: Mapping[str, Any]):
+        fragments: list[str] = []
+
+        for name, data_type, expected, encode in self._fields:
+            value = _validate(message_name, name, data_type, expected, data)
+            fragments.append(encode(value))
+
+        # same as a JSON array of all the values, without the brackets
+        return encode_bytes(",".join(fragments))
+
+    def encode_packets(
+        self, data_packets: bytes, compress: bool = False
+    ) -> bytes:
+        "Encodes data packets returned by :meth:`encode_data` together with the id and checksum into packets ready to be sent. If `compress` is set, data packets are compressed whenever it makes them shorter."
+        if compress:
+            compressed = compress_packets(data_packets)
+
+            if len(compressed) < len(data_packets):
+                data_packets = compressed
+        checksum = self._id_checksum.update(data_packets).digest()
+
+        parts = [_START_END, checksum, _COMMA, self._id]
+
+        if data_packets:
+            parts += [_COMMA, data_packets]
+
+        parts.append(_START_END)
+
+        return b"".join(parts)
+
+
+def encode_frame(
+    messages_packets: Sequence[bytes], sequence: int | None = None
+) -> bytes:
+    """Joins packets of several messages into a single frame with one checksum, so all of them can be confirmed at once.
+
+    Messages are separated by two :attr:`ReservedPackets.COMMA` packets, which never appear next to each other in a single message, since neither its id nor its data is ever empty. The checksum covers ids and data of all the messages, which for a single message gives exactly its own packets.
+
+    If `sequence` is passed, it's sent as packet `sequence + 1` right after the start packet and is covered by the checksum. It can be told apart from a frame without one, since the separator after the checksum moves by one packet.
+
+    Sequence numbers wrap around, so the same number is reused by a different frame that may be identical. A frame is a retransmission, confirmed again but not received twice, only if it's identical to the last frame received with its sequence number and that number is one of the `RETRANSMISSION_WINDOW` numbers up to the newest one received. Any other frame is new, and its sequence number becomes the newest one unless it's among those numbers. Frames received with numbers that drop out of the window are forgotten. The sender never lets a frame awaiting confirmation fall `RETRANSMISSION_WINDOW` or more numbers behind the newest one it has sent."""
+    bodies = [packets[4:-1] for packets in messages_packets]
+    checksum = ChecksumState()
+    header = b""
+
+    if sequence is not None:
+        if not 0 <= sequence < SEQUENCE_SPACE:
+            raise ValueError(f"Invalid sequence number {sequence}")
+
+        header = bytes((sequence + 1,))
+        checksum = checksum.update(header)
+
+    for body in bodies:
+        checksum = checksum.update(body.replace(_COMMA, b""))
+
+    return b"".join(
+        [
+            _START_END,
+            header,
+            checksum.digest(),
+            _COMMA,
+            (_COMMA * 2).join(bodies),
+            _START_END,
+        ]
+    )
@@ -1,4 +1,4 @@
-from enum import StrEnum
+from enum import Enum, StrEnum
 
 
 class MessageName(StrEnum):
@@ -26,9 +26,33 @@ class MessageData(StrEnum):
     REGISTER_MESSAGE_STRUCTURE_INTERACTIVE = "interactive"
 
 
+class Feature(StrEnum):
+    "Optional protocol features a Workshop mode can report to support when connecting."
+
+    COMPRESSION = "compression"
+    BATCHING = "batching"
+    "Several messages can be sent in a single frame, see :func:`encode_frame`."
+    PIPELINING = "pipelining"
+    "Several frames can be awaiting confirmation at once, each one carrying a sequence number, see :func:`encode_frame`."
+    SELECTIVE_RETRANSMISSION = "selective_retransmission"
+    "Frames are split into segments verified on their own, so only damaged segments are sent again, see :func:`segment_frame`."
+    PARITY = "parity"
+    "Frames are split into segments and carry parity segments, so damaged segments can be rebuilt without sending them again, see :func:`add_parity`."
+    PREEMPTION = "preemption"
+    "Typing of a frame can be aborted for a more urgent one, by sending :attr:`PacketWidth.abort` and the end packet, see :class:`Preempted`."
+
+
 class ErrorCode(StrEnum):
     "Error codes."
 
     INVALID_PACKET = "INVALID_PACKET"
     INVALID_MESSAGE = "INVALID_MESSAGE"
     TIMED_OUT = "TIMED_OUT"
+
+
+class ReservedPackets(Enum):
+    "Packets reserved by `OWTP` that cannot be used by other means."
+
+    START_END_CONFIRM = 127
+    COMMA = 126
+    CONNECT = 125
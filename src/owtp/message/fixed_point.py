@@ -0,0 +1,124 @@
+"""Binary packing of NUMBER and VECTOR fields as fixed-point values, used for fields a Workshop mode has registered with a scale.
+
+A field registered as `[type, scale]` or `[type, scale, width]` instead of just `type` has every number multiplied by `10 ** scale`, rounded and sent as `width` base-95 digits (most significant first), each digit `d` as packet `d + 1`, so packed values stay within the alphabet range and can still be compressed. Values are offset by half of the range, so negative numbers never need a sign.
+
+A field registered as `[type, scale, width, delta_width]` can also be sent as a difference from a keyframe, see :mod:`delta`."""
+
+import math
+from dataclasses import dataclass
+
+from .alphabet import ALPHABET
+from .types import MessageDataType
+
+FIXED_POINT_BASE = len(ALPHABET)
+
+FIXED_POINT_TYPES = (MessageDataType.NUMBER, MessageDataType.VECTOR)
+"Types of fields that can be packed as fixed-point values."
+
+DEFAULT_FIXED_POINT_WIDTH = 3
+"Default number of packets per packed value, covering a bit over 850 thousand values."
+
+
+@dataclass(frozen=True)
+class FixedPoint:
+    "Packing of a single number - number of decimal places kept, and the number of packets it's spread over."
+
+    scale: int
+    width: int = DEFAULT_FIXED_POINT_WIDTH
+    delta_width: int = 0
+    "Number of packets of a difference from the keyframe, or `0` if the field is always sent in full."
+
+    def __post_init__(self):
+        if (
+            self.scale < 0
+            or self.width < 1
+            or not 0 <= self.delta_width < self.width
+        ):
+            raise ValueError(
+                f"Invalid fixed-point packing with scale {self.scale}, width {self.width} and delta width {self.delta_width}"
+            )
+
+    @property
+    def offset(self):
+        return FIXED_POINT_BASE**self.width // 2
+
+    @property
+    def min_value(self) -> float:
+        return -self.offset / 10**self.scale
+
+    @property
+    def max_value(self) -> float:
+        return (
+            FIXED_POINT_BASE**self.width - 1 - self.offset
+        ) / 10**self.scale
+
+    def quantize(self, value: float) -> int:
+        "Converts `value` into the number of units of the last kept decimal place."
+        if not math.isfinite(value):
+            raise self._out_of_range(value)
+
+        return round(value * 10**self.scale)
+
+    def pack(self, value: float) -> bytes:
+        return self.pack_quantized(self.quantize(value))
+
+    def pack_quantized(self, quantized: int) -> bytes:
+        "Packs a value already converted by :meth:`quantize`."
+        packets = _pack_digits(quantized, self.width)
+
+        if packets is None:
+            raise self._out_of_range(quantized / 10**self.scale)
+
+        return packets
+
+    def pack_delta(self, delta: int) -> bytes | None:
+        "Packs a difference of two quantized values, or returns `None` if it doesn't fit into :attr:`delta_width` packets."
+        return _pack_digits(delta, self.delta_width)
+
+    def unpack(self, packets: bytes) -> float:
+        "Reference decoder of :meth:`pack`, doing what the Workshop mode does with packed values."
+        return self.unpack_quantized(packets) / 10**self.scale
+
+    def unpack_quantized(self, packets: bytes) -> int:
+        "Reference decoder of :meth:`pack_quantized`."
+        return _unpack_digits(packets, self.width)
+
+    def unpack_delta(self, packets: bytes) -> int:
+        "Reference decoder of :meth:`pack_delta`."
+        return _unpack_digits(packets, self.delta_width)
+
+    def _out_of_range(self, value: float):
+        return ValueError(
+            f"Value {value} is out of the range <{self.min_value}, {self.max_value}> of fixed-point packing with scale {self.scale} and width {self.width}"
+        )
+
+
+def _pack_digits(number: int, width: int) -> bytes | None:
+    "Packs a signed integer into `width` base-95 digits, or returns `None` if it doesn't fit."
+    encoded = number + FIXED_POINT_BASE**width // 2
+
+    if not 0 <= encoded < FIXED_POINT_BASE**width:
+        return None
+
+    packets = bytearray(width)
+
+    for idx in range(width - 1, -1, -1):
+        encoded, digit = divmod(encoded, FIXED_POINT_BASE)
+        packets[idx] = digit + 1
+
+    return bytes(packets)
+
+
+def _unpack_digits(packets: bytes, width: int) -> int:
+    if len(packets) != width:
+        raise ValueError(f"Expected {width} packets, got {len(packets)}")
+
+    encoded = 0
+
+    for packet in packets:
+        if not 1 <= packet <= FIXED_POINT_BASE:
+            raise ValueError(f"Packet {packet} is not a base-95 digit")
+
+        encoded = encoded * FIXED_POINT_BASE + packet - 1
+
+    return encoded - FIXED_POINT_BASE**width // 2
@@ -3,7 +3,11 @@
 from dataclasses import dataclass
 from typing import Any, Mapping, Protocol, TypeGuard, cast
 
-from ...utils import EmptyData
+from ...utils import (
+    EmptyData,
+    KeyValuePairDecoder,
+    compile_key_value_pair_decoder,
+)
 
 
 @dataclass(frozen=True)
@@ -18,20 +22,28 @@ class DefineMessageIn[T: Mapping[str, Any] = EmptyData](Protocol):
     "Helper for defining a type of an incoming message :class:`MessageIn`."
 
     name: str
+    decoder: KeyValuePairDecoder[T] | None
+    "Converts key value pairs received from the Workshop mode into validated `data`, if the message was defined with a structure."
 
     def __call__(self, data: T | None = None) -> MessageIn[T]: ...
 
 
 def define_message_in[T: Mapping[str, Any] = EmptyData](
     name: str,
+    structure: type[T] | None = None,
 ) -> DefineMessageIn[T]:
-    "Incoming message :class:`MessageIn` creator."
+    "Incoming message :class:`MessageIn` creator. If `structure` TypedDict is passed, a decoder for the message's `data` is compiled from it."
 
     def creator(data: T | None = None) -> MessageIn[T]:
         final_data = data if data is not None else cast(T, {})
         return MessageIn(name, final_data)
 
     setattr(creator, "name", name)
+    setattr(
+        creator,
+        "decoder",
+        compile_key_value_pair_decoder(structure) if structure else None,
+    )
 
     return cast(DefineMessageIn[T], creator)
 
@@ -1,18 +1,38 @@
 "Stores anything related to outgoing messages from a Workshop mode."
 
-import json
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Hashable, Iterable
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Mapping, Protocol, TypeGuard, cast
 
-from ...utils import EmptyData
-from .alphabet import encode_string
-from .types import TYPE_MAP, MessageDataType, Vector
+from ...utils import EmptyData, LRUCache
+from .delta import Keyframe
+from .encoder import ChecksumState
 
 if TYPE_CHECKING:
     from ..messages import MessageDefinition
 
 
+type PreparedPacketsCache = LRUCache[
+    tuple[MessageDefinition, Hashable, bool], bytes
+]
+"Packets of already prepared messages, keyed on the definition, the hashable form of the data (see :func:`_data_key`) and whether they are compressed."
+
+
+def _data_key(value: Any) -> Hashable:
+    "Hashable form of message data, telling apart values that compare equal, but are encoded differently, like `1`, `1.0` and `True`."
+    if isinstance(value, Mapping):
+        return (
+            dict,
+            tuple((k, _data_key(v)) for k, v in value.items()),  # pyright: ignore[reportUnknownVariableType]
+        )
+
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_data_key(v) for v in value))  # pyright: ignore[reportUnknownVariableType]
+
+    return (type(value), value)
+
+
 class MessageOutState(Enum):
     "Possible states of the :class:`MessageOut`."
 
@@ -20,14 +40,10 @@ class MessageOutState(Enum):
     SENDING = 1
     SENT = 2
     ERROR = 3
-
-
-class ReservedPackets(Enum):
-    "Packets reserved by `OWTP` that cannot be used by other means."
-
-    START_END_CONFIRM = 127
-    COMMA = 126
-    CONNECT = 125
+    EXPIRED = 4
+    "Discarded without being sent, because its deadline has passed."
+    REPLACED = 5
+    "Discarded without being sent, because a newer message with the same conflation key took its place in the queue."
 
 
 class MessageOut[T: Mapping[str, Any] = EmptyData]:
@@ -40,6 +56,8 @@ class MessageOut[T: Mapping[str, Any] = EmptyData]:
         on_start: Callable[[], None] | None = None,
         on_finish: Callable[[], None] | None = None,
         on_error: Callable[[], None] | None = None,
+        conflation_key: Hashable | None = None,
+        deadline: float | None = None,
     ):
 
         self.name = name
@@ -50,9 +68,13 @@ class MessageOut[T: Mapping[str, Any] = EmptyData]:
         self._on_start = on_start
         self._on_finish = on_finish
         self._on_error = on_error
+        self._conflation_key = conflation_key
+        self._deadline = deadline
 
         self._state = MessageOutState.NONE
-        self._packets: list[int]
+        self._started = False
+        self._packets: bytes
+        self._keyframe: Keyframe | None = None
 
     @property
     def data(self):
@@ -62,14 +84,42 @@ class MessageOut[T: Mapping[str, Any] = EmptyData]:
     def packets(self):
         return self._packets
 
+    @property
+    def keyframe(self):
+        "Keyframe the message carries, if it's delta encoded and sent in full."
+        return self._keyframe
+
+    @property
+    def definition(self):
+        return self._definition
+
     @property
     def number_of_attempts(self):
         return self._number_of_attempts
 
+    @property
+    def conflation_key(self):
+        "Putting a message with the same key replaces this one, if it hasn't started being sent yet - only the latest state reaches the game."
+        return self._conflation_key
+
+    @property
+    def deadline(self):
+        "Time (as returned by :func:`time.monotonic`) after which the message is no longer relevant and is discarded instead of being sent."
+        return self._deadline
+
+    @property
+    def is_expired(self):
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
     @property
     def state(self):
         return self._state
 
+    @property
+    def started(self):
+        "Whether the message has ever been in the sending state - it stays started after being put back into the queue."
+        return self._started
+
     @property
     def priority(self):
         return self._priority
@@ -80,84 +130,54 @@ class MessageOut[T: Mapping[str, Any] = EmptyData]:
 
         match value:
             case MessageOutState.SENDING:
-                if self._on_start:
+                if self._on_start and not self._started:
                     self._on_start()
+
+                self._started = True
             case MessageOutState.SENT:
                 if self._on_finish:
                     self._on_finish()
-            case MessageOutState.ERROR:
+            case (
+                MessageOutState.ERROR
+                | MessageOutState.EXPIRED
+                | MessageOutState.REPLACED
+            ):
                 if self._on_error:
                     self._on_error()
             case _:
                 pass
 
     @staticmethod
-    def generate_checksum(data: list[int]):
+    def generate_checksum(data: Iterable[int]):
         """Based to Fletcher's checksum algorithm. Values going above 112 have higher chance of collision."""
+        return list(ChecksumState().update(data).digest())
 
-        mod = 113  # prime
-        # coprimes of mod; mixing factors to increase the avalanche effect
-        mix_a = 73
-        mix_b = 59
-
-        def _norm(value: int) -> int:
-            """Return value reduced modulo MOD, never 0."""
-            v = value % mod
-            return v if v != 0 else mod - 1
-
-        sum_part = 0
-        prod_part = 1
-
-        for i, x in enumerate(data):
-            # incorporate the position (i+1) so the order matters
-            sum_part = _norm(sum_part + (x * (i + 1) * mix_a))
-            prod_part = _norm(prod_part * (x + mix_b + i))
-
-        return [sum_part, prod_part]
-
-    def prepare(self, definition: MessageDefinition):
-        prepared_data: list[Any] = []
-        data_packets: list[int] = []
-        packets: list[int] = []
-
+    def prepare(
+        self,
+        definition: MessageDefinition,
+        cache: PreparedPacketsCache | None = None,
+        compress: bool = False,
+    ):
+        encoder = definition.encoder
         self._definition = definition
 
-        for name in definition.data_types:
-            data_type = definition.data_types[name]
-            value = self._data[name]
-
-            if not isinstance(value, TYPE_MAP[data_type]):
-                raise TypeError(
-                    f"{self.name} data validation error: value {value} of key {name} is not of a type {data_type.name}"
-                )
-
-            if data_type == MessageDataType.VECTOR:
-                vector: Vector = value
-                value = [vector.x, vector.y, vector.z]
-
-            prepared_data.append(value)
-
-        if prepared_data:
-            data_packets = encode_string(
-                json.dumps(prepared_data, separators=(",", ":"))[1:-1]
+        if definition.delta_state is not None:
+            # delta encoded data depends on the previously sent messages, so it can't be cached
+            data_packets, self._keyframe = encoder.encode_delta_data(
+                self.name, self._data, definition.delta_state
             )
+            self._packets = encoder.encode_packets(data_packets, compress)
+            return
 
-        checksum = MessageOut.generate_checksum(definition.id + data_packets)
+        key = (definition, _data_key(self._data), compress)
+        packets = cache.get(key) if cache is not None else None
 
-        # TODO: optional args
-        # TODO: automatically convert dict/class to array of key value pairs
+        if packets is None:
+            data_packets = encoder.encode_data(self.name, self._data)
+            packets = encoder.encode_packets(data_packets, compress)
 
-        packets = [ReservedPackets.START_END_CONFIRM.value]
-        packets += checksum
-        packets.append(ReservedPackets.COMMA.value)
-
-        packets += definition.id
-
-        if data_packets:
-            packets.append(ReservedPackets.COMMA.value)
-            packets += data_packets
-
-        packets.append(ReservedPackets.START_END_CONFIRM.value)
+            if cache is not None:
+                cache.put(key, packets)
 
         self._packets = packets
 
@@ -172,20 +192,30 @@ class DefineMessageOut[T: Mapping[str, Any] = EmptyData](Protocol):
         on_start: Callable[[], None] | None = None,
         on_finish: Callable[[], None] | None = None,
         on_error: Callable[[], None] | None = None,
+        conflation_key: Hashable | None = None,
+        deadline: float | None = None,
     ) -> MessageOut[T]: ...
 
 
 def define_message_out[T: Mapping[str, Any] = EmptyData](
     name: str,
     priority: int = 0,
+    time_to_live: float | None = None,
 ) -> DefineMessageOut[T]:
+    "Creates a creator of outgoing messages `name`. If `time_to_live` (in seconds) is given, messages that haven't been sent in that time after being created are discarded, unless the creator is given a `deadline` of its own."
+
     def creator(
         data: T | None = None,
         number_of_attempts: int = 5,
         on_start: Callable[[], None] | None = None,
         on_finish: Callable[[], None] | None = None,
         on_error: Callable[[], None] | None = None,
+        conflation_key: Hashable | None = None,
+        deadline: float | None = None,
     ) -> MessageOut[T]:
+        if deadline is None and time_to_live is not None:
+            deadline = time.monotonic() + time_to_live
+
         return MessageOut(
             name,
             data if data is not None else cast(T, {}),
@@ -194,6 +224,8 @@ def define_message_out[T: Mapping[str, Any] = EmptyData](
             on_start,
             on_finish,
             on_error,
+            conflation_key,
+            deadline,
         )
 
     setattr(creator, "name", name)
@@ -0,0 +1,137 @@
+"""Transcoding of frames into packets wider than 7 bits, sent using additional keybinds.
+
+Packets of a frame are still encoded, checksummed and compressed as 7-bit values - only the way they're typed changes. Between the start and the end packet, which become a packet with all `width` bits set, packets of the frame are read as digits of a number in base 127 (the first packet being the least significant) and converted, block by block, into digits of base `2 ** width - 2`. Every digit `d` is sent as packet `d + 1`, so no packet is ever empty or mistaken for the start or the end of the frame. If the Workshop mode supports :attr:`Feature.PREEMPTION`, the base is `2 ** width - 3` instead, so no packet is mistaken for the :attr:`PacketWidth.abort` packet either.
+
+Packets of a frame are never 0, so the number of packets of a block is given by the number itself, and the last block doesn't need any padding."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cached_property
+
+from .enums import ReservedPackets
+
+BASE_PACKET_WIDTH = 7
+"Number of bits of a packet that every Workshop mode supports, typed using the 7 basic keybinds."
+
+MAX_PACKET_WIDTH = 14
+
+MAX_BLOCK_SIZE = 16
+"Largest number of 7-bit packets transcoded at once, limiting the size of integers the Workshop mode has to work with."
+
+_BASE = ReservedPackets.START_END_CONFIRM.value
+
+
+@dataclass(frozen=True)
+class PacketWidth:
+    width: int
+    preemption: bool = False
+    "Whether the :attr:`abort` packet is reserved, see :attr:`Feature.PREEMPTION`."
+
+    def __post_init__(self):
+        if not BASE_PACKET_WIDTH <= self.width <= MAX_PACKET_WIDTH:
+            raise ValueError(
+                f"Packet width has to be between {BASE_PACKET_WIDTH} and {MAX_PACKET_WIDTH} bits, got {self.width}"
+            )
+
+    @property
+    def start_end(self):
+        "Packet marking the start and the end of a frame - all bits set."
+        return (1 << self.width) - 1
+
+    @property
+    def abort(self):
+        "Packet marking a frame as aborted when it's sent right before the end packet, so a more urgent frame can be typed instead. A 7-bit frame never ends with a separator, and wider frames with :attr:`preemption` never contain this packet at all."
+        return self.start_end - 1
+
+    @property
+    def digit_base(self):
+        return (1 << self.width) - (3 if self.preemption else 2)
+
+    @cached_property
+    def block(self) -> tuple[int, int]:
+        "Number of 7-bit packets transcoded at once and the number of wide packets they're transcoded into, picked to waste as little of the wider packets as possible."
+        best = (1, 1)
+
+        for size in range(1, MAX_BLOCK_SIZE + 1):
+            digits = self._count_digits(_BASE**size - 1)
+
+            if size * best[1] > best[0] * digits:
+                best = (size, digits)
+
+        return best
+
+    def encode(self, frame: bytes) -> list[int]:
+        "Transcodes packets of a frame, from the start packet to the end packet inclusive."
+        if self.width == BASE_PACKET_WIDTH:
+            return list(frame)
+
+        body = frame[1:-1]
+        block_size, block_digits = self.block
+        packets = [self.start_end]
+
+        for offset in range(0, len(body), block_size):
+            block = body[offset : offset + block_size]
+            number = 0
+
+            for packet in reversed(block):
+                number = number * _BASE + packet
+
+            # only the last block can be shorter, so only it can leave out leading zeros
+            digits = (
+                block_digits
+                if len(block) == block_size
+                else self._count_digits(number)
+            )
+
+            for _ in range(digits):
+                number, digit = divmod(number, self.digit_base)
+                packets.append(digit + 1)
+
+        packets.append(self.start_end)
+        return packets
+
+    def decode(self, packets: Sequence[int]) -> bytes:
+        "Reference decoder of :meth:`encode`, doing what the Workshop mode does with wide packets it receives."
+        if self.width == BASE_PACKET_WIDTH:
+            return bytes(packets)
+
+        if (
+            len(packets) < 2
+            or packets[0] != self.start_end
+            or packets[-1] != self.start_end
+        ):
+            raise ValueError(f"Malformed frame {list(packets)}")
+
+        body = packets[1:-1]
+        block_digits = self.block[1]
+        frame = bytearray((ReservedPackets.START_END_CONFIRM.value,))
+
+        for offset in range(0, len(body), block_digits):
+            number = 0
+
+            for packet in reversed(body[offset : offset + block_digits]):
+                if not 1 <= packet <= self.digit_base:
+                    raise ValueError(f"Invalid packet {packet}")
+
+                number = number * self.digit_base + packet - 1
+
+            while number:
+                number, packet = divmod(number, _BASE)
+
+                if not packet:
+                    raise ValueError(f"Invalid block {list(body[offset:])}")
+
+                frame.append(packet)
+
+        frame.append(ReservedPackets.START_END_CONFIRM.value)
+        return bytes(frame)
+
+    def _count_digits(self, number: int):
+        "Number of digits of base :attr:`digit_base` needed to write `number`, at least one."
+        digits = 1
+
+        while number >= self.digit_base:
+            number //= self.digit_base
+            digits += 1
+
+        return digits
@@ -0,0 +1,265 @@
+"""Splitting of frames into segments that can be verified on their own, so only damaged segments of a frame have to be sent again.
+
+Packets of a frame between the start and the end packet are split into segments of `SEGMENT_SIZE` packets, each followed by a check packet. When a segment doesn't match its check packet, the Workshop mode reports the damaged packets (as indices or `[first, last]` ranges, the start packet being packet 0) in `packets` of `OWTP_ERROR`, keeping the rest of the frame.
+
+Damaged segments are then sent in a repair frame - `START COMMA sequence count (index segment)... END`, where `sequence` is the sequence number of the damaged frame plus one (or `SEQUENCE_SPACE + 1` for a frame without one), `count` is the number of segments of the damaged frame and every `index` is followed by the packets of the segment, including its check packet. A regular frame never has a separator right after the start packet, so the two can't be mistaken for each other. Numbers are sent as two packets of base `INDEX_BASE`, each one plus one.
+
+If the Workshop mode supports :attr:`Feature.PARITY`, regular frames also carry parity segments after the data segments, followed by a packet telling their number plus one. Data segment `k` belongs to the group `k % parity_segments` and every packet of a parity segment is the sum of packets at the same position of all segments of its group, all of them minus one and modulo `PARITY_MOD` (a missing packet of the last segment counts as zero). Since check packets tell which segments are damaged, a single damaged segment of every group can be rebuilt without a round trip - consecutive damaged segments fall into different groups.
+
+Segments are found by their position, so both check packets and parity segments only deal with packets received with a wrong value. A packet that's lost entirely shifts every segment after it, so all of them are reported as damaged and sent again."""
+
+from collections.abc import Iterable, Sequence
+
+from .encoder import SEQUENCE_SPACE, ChecksumState
+from .enums import ReservedPackets
+
+SEGMENT_SIZE = 16
+"Number of packets of a frame covered by a single check packet."
+
+INDEX_BASE = ReservedPackets.CONNECT.value - 1
+"Base of numbers of a repair frame, so none of their packets is reserved."
+
+PARITY_MOD = ReservedPackets.START_END_CONFIRM.value - 1
+"Number of distinct packets inside a frame - every packet but the start and the end one."
+
+MAX_PARITY_SEGMENTS = 8
+
+_START_END = ReservedPackets.START_END_CONFIRM.value
+_COMMA = ReservedPackets.COMMA.value
+_STRIDE = SEGMENT_SIZE + 1
+
+
+class DamagedSegments(ValueError):
+    "Raised by :class:`SegmentReassembler` when some segments of a frame don't match their check packets."
+
+    def __init__(self, packets: list[list[int]], sequence: int | None):
+        super().__init__(f"Damaged packets {packets}")
+        self.packets = packets
+        "Ranges of damaged packets, as reported to the application."
+        self.sequence = sequence
+
+
+def _check(segment: bytes):
+    return ChecksumState().update(segment).sum_part
+
+
+def _is_intact(segment: bytes):
+    return len(segment) > 1 and segment[-1] == _check(segment[:-1])
+
+
+def _split(body: bytes):
+    "Splits packets of a segmented frame into segments, each one with its check packet."
+    return [
+        body[offset : offset + _STRIDE]
+        for offset in range(0, len(body), _STRIDE)
+    ]
+
+
+def _encode_number(number: int):
+    high, low = divmod(number, INDEX_BASE)
+    return bytes((high + 1, low + 1))
+
+
+def _decode_number(packets: bytes):
+    return (packets[0] - 1) * INDEX_BASE + packets[1] - 1
+
+
+def segment_frame(frame: bytes) -> bytes:
+    "Adds a check packet after every segment of a frame, from the start packet to the end packet inclusive."
+    segmented = bytearray((_START_END,))
+    body = frame[1:-1]
+
+    for offset in range(0, len(body), SEGMENT_SIZE):
+        segment = body[offset : offset + SEGMENT_SIZE]
+        segmented += segment
+        segmented.append(_check(segment))
+
+    segmented.append(_START_END)
+    return bytes(segmented)
+
+
+def add_parity(frame: bytes, parity_segments: int) -> bytes:
+    "Appends `parity_segments` parity segments to a frame returned by :func:`segment_frame`."
+    if not 0 <= parity_segments <= MAX_PARITY_SEGMENTS:
+        raise ValueError(
+            f"Number of parity segments has to be between 0 and {MAX_PARITY_SEGMENTS}, got {parity_segments}"
+        )
+
+    body = frame[1:-1]
+    segments = [segment[:-1] for segment in _split(body)]
+    parity = bytearray(body)
+
+    for group in range(parity_segments):
+        sums = _parity_sums(segments[group::parity_segments])
+        segment = bytes(value + 1 for value in sums)
+        parity += segment
+        parity.append(_check(segment))
+
+    return bytes((_START_END, *parity, parity_segments + 1, _START_END))
+
+
+def _parity_sums(segments: Iterable[bytes]) -> list[int]:
+    sums = [0] * SEGMENT_SIZE
+
+    for segment in segments:
+        for idx, packet in enumerate(segment):
+            sums[idx] = (sums[idx] + packet - 1) % PARITY_MOD
+
+    return sums
+
+
+def count_segments(frame: bytes):
+    "Number of segments of a frame returned by :func:`segment_frame`."
+    return -(-(len(frame) - 2) // _STRIDE)
+
+
+def damaged_segments(
+    frame: bytes, packets: Iterable[int | Sequence[int]]
+) -> list[int]:
+    "Returns indices of segments of a frame returned by :func:`segment_frame` containing any of the damaged `packets`, reported by the Workshop mode as indices or `[first, last]` ranges."
+    count = count_segments(frame)
+    segments: set[int] = set()
+
+    for item in packets:
+        first, last = (item, item) if isinstance(item, int) else item
+
+        segments.update(
+            range(max((first - 1) // _STRIDE, 0), (last - 1) // _STRIDE + 1)
+        )
+
+    return sorted(segment for segment in segments if segment < count)
+
+
+def encode_repair(
+    frame: bytes, segments: Iterable[int], sequence: int | None = None
+) -> bytes:
+    "Encodes a repair frame carrying `segments` of a frame returned by :func:`segment_frame`."
+    body = frame[1:-1]
+    repair = bytearray(
+        (
+            _START_END,
+            _COMMA,
+            SEQUENCE_SPACE + 1 if sequence is None else sequence + 1,
+        )
+    )
+    repair += _encode_number(count_segments(frame))
+
+    for segment in sorted(segments):
+        repair += _encode_number(segment)
+        repair += body[segment * _STRIDE : (segment + 1) * _STRIDE]
+
+    repair.append(_START_END)
+    return bytes(repair)
+
+
+class SegmentReassembler:
+    "Reference decoder of segmented frames and their repairs, doing what the Workshop mode does with them. Segments of a damaged frame are kept until it's repaired, separately for every sequence number."
+
+    def __init__(self, parity: bool = False):
+        self._parity = parity
+        "Whether regular frames carry parity segments, see :func:`add_parity`."
+        self._damaged: dict[int | None, list[bytes]] = {}
+
+    def receive(self, frame: bytes, sequence: int | None = None) -> bytes:
+        """Returns the frame without check packets and parity segments, rebuilt using parity segments or repaired by a repair frame.
+
+        `sequence` is the sequence number of a regular frame, as far as it can be read, under which its segments are kept if it's damaged."""
+        if len(frame) > 2 and frame[1] == _COMMA:
+            sequence, segments = self._repair(frame)
+        else:
+            body = frame[1:-1]
+            parity: list[bytes] = []
+
+            if self._parity and body:
+                # the last packet tells the number of parity segments before it
+                start = max(len(body) - 1 - (body[-1] - 1) * _STRIDE, 0)
+                parity = _split(body[start:-1])
+                body = body[:start]
+
+            segments = _split(body)
+
+            if parity:
+                self._rebuild(segments, parity)
+
+        damaged = [
+            idx
+            for idx, segment in enumerate(segments)
+            if not _is_intact(segment)
+        ]
+
+        if damaged:
+            self._damaged[sequence] = segments
+            raise DamagedSegments(self._ranges(damaged), sequence)
+
+        self._damaged.pop(sequence, None)
+
+        return bytes(
+            (
+                _START_END,
+                *b"".join(segment[:-1] for segment in segments),
+                _START_END,
+            )
+        )
+
+    def _repair(self, frame: bytes) -> tuple[int | None, list[bytes]]:
+        sequence = frame[2] - 1 if frame[2] != SEQUENCE_SPACE + 1 else None
+
+        if sequence not in self._damaged:
+            raise ValueError(f"No damaged frame #{sequence} to repair")
+
+        count = _decode_number(frame[3:5])
+        segments = self._damaged[sequence][:count]
+        segments += [b""] * (count - len(segments))
+        position = 5
+
+        while position < len(frame) - 1:
+            idx = _decode_number(frame[position : position + 2])
+            position += 2
+
+            if idx >= count:
+                raise ValueError(f"Invalid segment {idx} of {count}")
+
+            end = position + _STRIDE if idx < count - 1 else len(frame) - 1
+            segments[idx] = frame[position:end]
+            position = end
+
+        return sequence, segments
+
+    @staticmethod
+    def _rebuild(segments: list[bytes], parity: list[bytes]):
+        "Rebuilds damaged segments using parity segments, if there's at most one in their group."
+        for group, parity_segment in enumerate(parity):
+            members = range(group, len(segments), len(parity))
+            damaged = [idx for idx in members if not _is_intact(segments[idx])]
+
+            if len(damaged) != 1 or not _is_intact(parity_segment):
+                continue
+
+            sums = _parity_sums(
+                segments[idx][:-1] for idx in members if idx != damaged[0]
+            )
+            length = (
+                SEGMENT_SIZE
+                if damaged[0] < len(segments) - 1
+                else len(segments[-1]) - 1
+            )
+            rebuilt = bytes(
+                (parity_segment[idx] - 1 - sums[idx]) % PARITY_MOD + 1
+                for idx in range(length)
+            )
+            segments[damaged[0]] = rebuilt + bytes((_check(rebuilt),))
+
+    @staticmethod
+    def _ranges(damaged: list[int]) -> list[list[int]]:
+        "Merges consecutive damaged segments into ranges of their packets."
+        ranges: list[list[int]] = []
+
+        for idx in damaged:
+            first, last = idx * _STRIDE + 1, (idx + 1) * _STRIDE
+
+            if ranges and ranges[-1][1] == first - 1:
+                ranges[-1][1] = last
+            else:
+                ranges.append([first, last])
+
+        return ranges
@@ -1,11 +1,15 @@
 "Contains definitions for :class:`OWTP`'s internal messages."
 
-from typing import Any, TypedDict
+from typing import Any, NotRequired, TypedDict
 
 from .message import (
+    FIXED_POINT_TYPES,
     DefineMessageIn,
     DefineMessageOut,
+    DeltaState,
+    FixedPoint,
     MessageDataType,
+    MessageEncoder,
     MessageName,
     ReservedPackets,
     define_message_in,
@@ -17,15 +21,57 @@ class MessageDefinition:
     "Definition of a message that Workshop mode supports and can receive."
 
     def __init__(
-        self, name: str, id: list[int], dataTypes: dict[str, int] | None = None
+        self,
+        name: str,
+        id: list[int],
+        dataTypes: dict[str, int | list[int]] | None = None,
     ):  # pylint: disable=W0622,C0103
         self.name = name
         self.id = id
-        self.data_types = (
-            {key: MessageDataType(value) for key, value in dataTypes.items()}
-            if dataTypes
-            else {}
+        self.data_types: dict[str, MessageDataType] = {}
+        self.fixed_point: dict[str, FixedPoint] = {}
+        "Packing of fields the Workshop mode has registered as `[type, scale]`, `[type, scale, width]` or `[type, scale, width, delta_width]`."
+
+        for key, value in (dataTypes or {}).items():
+            if isinstance(value, int):
+                self.data_types[key] = MessageDataType(value)
+                continue
+
+            data_type, *packing = value
+            self.data_types[key] = MessageDataType(data_type)
+
+            if self.data_types[key] not in FIXED_POINT_TYPES:
+                raise ValueError(
+                    f"Field {key} of message {name} is a {self.data_types[key].name}, which cannot be packed as a fixed-point value"
+                )
+
+            self.fixed_point[key] = FixedPoint(*packing)
+
+        self.encoder = MessageEncoder(
+            self.id, self.data_types, self.fixed_point
         )
+        self.delta_state = (
+            DeltaState()
+            if any(packing.delta_width for packing in self.fixed_point.values())
+            else None
+        )
+        "Keyframes of messages sent as differences, if any field supports it. Registering the definition again starts over with a keyframe."
+
+    def as_data(self) -> "SupportsMessageData":
+        "Converts the definition back into the structure it has been registered with."
+        return {
+            "name": self.name,
+            "id": self.id,
+            "dataTypes": {
+                key: (
+                    [value.value, packing.scale, packing.width]
+                    + ([packing.delta_width] if packing.delta_width else [])
+                    if (packing := self.fixed_point.get(key))
+                    else value.value
+                )
+                for key, value in self.data_types.items()
+            },
+        }
 
 
 class ModeInfo(TypedDict):
@@ -43,6 +89,10 @@ class ConnectMessageData(TypedDict):
     interactive: bool
     version: str
     mode: ModeInfo
+    features: NotRequired[list[str]]
+    "Optional protocol features (:class:`Feature`) supported by the Workshop mode."
+    packetWidth: NotRequired[int]
+    "Widest packets (in bits) the Workshop mode can receive, see :class:`PacketWidth`."
 
 
 class SupportsMessageData(TypedDict):
@@ -50,30 +100,42 @@ class SupportsMessageData(TypedDict):
 
     name: str
     id: list[int]
-    dataTypes: dict[str, int]
+    dataTypes: dict[str, int | list[int]]
+
+
+class ConfirmMessageData(TypedDict):
+    sequence: NotRequired[int]
+    "Sequence number of the confirmed frame, if the Workshop mode supports :attr:`Feature.PIPELINING`."
 
 
 class ErrorMessageData(TypedDict):
     errorCode: str
-    packets: list[int]
+    packets: list[int | list[int]]
+    "Indices or `[first, last]` ranges of damaged packets of the frame, if the Workshop mode supports :attr:`Feature.SELECTIVE_RETRANSMISSION`."
+    sequence: NotRequired[int]
+    "Sequence number of the rejected frame, if the Workshop mode supports :attr:`Feature.PIPELINING`."
 
 
 ConnectResponse: DefineMessageOut = define_message_out(
     MessageName.CONNECT, priority=-99999
 )
 ConnectMessage: DefineMessageIn[ConnectMessageData] = define_message_in(
-    MessageName.CONNECT
+    MessageName.CONNECT, ConnectMessageData
 )
 TransmissionFinishedMessage: DefineMessageOut = define_message_out(
     MessageName.TRANSMISSION_FINISHED
 )
 DisconnectMessage: DefineMessageIn = define_message_in(MessageName.DISCONNECT)
 RegisterMessageDefinition: DefineMessageIn[SupportsMessageData] = (
-    define_message_in(MessageName.REGISTER_MESSAGE_DEFINITION)
+    define_message_in(
+        MessageName.REGISTER_MESSAGE_DEFINITION, SupportsMessageData
+    )
+)
+ConfirmMessage: DefineMessageIn[ConfirmMessageData] = define_message_in(
+    MessageName.CONFIRM, ConfirmMessageData
 )
-ConfirmMessage: DefineMessageIn = define_message_in(MessageName.CONFIRM)
 ErrorMessage: DefineMessageIn[ErrorMessageData] = define_message_in(
-    MessageName.ERROR
+    MessageName.ERROR, ErrorMessageData
 )
 TransmissionReadyMessage: DefineMessageIn = define_message_in(
     MessageName.TRANSMISSION_READY
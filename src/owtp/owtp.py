@@ -5,8 +5,15 @@ from ..input import IInput
 from ..logging import create_logger
 from ..utils import EventListener
 from . import MessageDefinition, ModeInfo, messages
-from .connection import ConnectionManager
-from .dispatcher import MessageDispatcher
+from .connection import ConnectionManager, ConnectionState
+from .dispatcher import (
+    MAX_FRAME_SIZE,
+    PARITY_SEGMENTS,
+    PREEMPTING_PRIORITY,
+    WINDOW_SIZE,
+    MessageDispatcher,
+)
+from .latency import LatencyMetrics
 from .log_processor import WorkshopLogProcessor
 from .message import (
     DefineMessageIn,
@@ -15,6 +22,7 @@ from .message import (
     MessageOut,
     is_message_in,
 )
+from .timing import AdaptiveTiming, TimingState
 
 logger = create_logger("OWTP")
 
@@ -31,6 +39,9 @@ class OWTPEvents:
         self.send_message_start = EventListener[[MessageOut]]()
         self.send_message_finish = EventListener[[MessageOut]]()
         self.send_message_error = EventListener[[MessageOut, str]]()
+        self.send_message_expired = EventListener[[MessageOut]]()
+        self.send_message_replaced = EventListener[[MessageOut, MessageOut]]()
+        self.timing_change = EventListener[[TimingState]]()
 
 
 class OWTP:
@@ -39,17 +50,31 @@ class OWTP:
         input_method: IInput,
         buttons_down_ticks: int,
         buttons_up_ticks: int,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        window_size: int = WINDOW_SIZE,
+        adaptive_timing: bool = True,
+        parity_segments: int = PARITY_SEGMENTS,
+        preempting_priority: int | None = PREEMPTING_PRIORITY,
     ):
         self.events = OWTPEvents()
 
         self._stop_event = asyncio.Event()
+        self.latency = LatencyMetrics()
+        self.timing = AdaptiveTiming(
+            buttons_down_ticks, buttons_up_ticks, adaptive_timing
+        )
 
         self._registered_msg_def: dict[str, MessageDefinition] = {}
         self._registered_msg_in: dict[str, DefineMessageIn[Any]] = {}
 
         self._connection = ConnectionManager(self)
         self._sender = MessageDispatcher(
-            self, input_method, buttons_down_ticks, buttons_up_ticks
+            self,
+            input_method,
+            max_frame_size,
+            window_size,
+            parity_segments,
+            preempting_priority,
         )
         self._log_processor = WorkshopLogProcessor(self)
 
@@ -60,6 +85,12 @@ class OWTP:
             self.register_message_in(message)
 
     def cleanup(self):
+        logger.debug("Latency summary: %s", self.latency.summary())
+        logger.debug("Timing of packets: %s", self.timing.snapshot())
+        logger.debug(
+            "Workshop output parse cache: %s",
+            self._log_processor.parse_cache_stats,
+        )
         self._stop_event.set()
         self._log_processor.cleanup()
         self._sender.cleanup()
@@ -73,6 +104,16 @@ class OWTP:
     def is_stopped(self):
         return self._stop_event.is_set()
 
+    @property
+    def features(self):
+        "Optional protocol features negotiated with the Workshop mode."
+        return self._connection.features
+
+    @property
+    def packet_width(self):
+        "Width (in bits) of packets sent to the Workshop mode - the widest both the Workshop mode and the keybinds support."
+        return self._sender.packet_width
+
     @property
     def registered_msg_def(self):
         return self._registered_msg_def
@@ -81,6 +122,45 @@ class OWTP:
     def registered_messages_in(self):
         return self._registered_msg_in
 
+    @property
+    def log_batch_timings(self):
+        "Timings of the most recently processed batches of Workshop output."
+        return self._log_processor.batch_timings
+
+    @property
+    def log_parse_cache_stats(self):
+        "Hit rate of the cache of recently parsed Workshop output."
+        return self._log_processor.parse_cache_stats
+
+    @property
+    def prepared_packets_cache_stats(self):
+        "Hit rate of the cache of packets of already prepared outgoing messages."
+        return self._sender.prepared_packets_stats
+
+    def snapshot(self) -> ConnectionState:
+        "Returns the current state of the connection, which can be later passed to :func:`restore`."
+        builtin = {definition.name for definition in messages.MESSAGE_DEFINITIONS}
+
+        return {
+            "connected": self._connection.connected,
+            "interactive": self._connection.interactive,
+            "mode": self._connection.mode,
+            "message_definitions": [
+                definition.as_data()
+                for definition in self._registered_msg_def.values()
+                if definition.name not in builtin
+            ],
+            "features": sorted(self._connection.features),
+            "packet_width": self._connection.packet_width,
+        }
+
+    def restore(self, state: ConnectionState):
+        "Restores the connection from a :func:`snapshot`, e.g. after the application has been restarted mid-lobby."
+        for data in state["message_definitions"]:
+            self._register_message_definition(MessageDefinition(**data))
+
+        self._connection.restore(state)
+
     def pause(self, pause: bool):
         self._sender.pause(pause)
 
@@ -102,9 +182,16 @@ class OWTP:
                 "Incoming message %s has already been registered!", cls.name
             )
         self._registered_msg_in[cls.name] = cls
+        self._log_processor.clear_parse_cache()
 
-    def add_workshop_output(self, lines: list[str]):
-        self._log_processor.add_lines(lines)
+    def add_workshop_output(
+        self, lines: list[str], received_at: float | None = None
+    ):
+        self._log_processor.add_lines(lines, received_at)
+
+    async def join(self):
+        "Waits until all Workshop output added so far has been processed."
+        await self._log_processor.join()
 
     def _register_message_definition(self, data: MessageDefinition):
         logger.info(
@@ -113,6 +200,9 @@ class OWTP:
             data.id,
             data.data_types,
         )
+        if data.name in self._registered_msg_def:
+            self._sender.clear_prepared_packets()
+
         self._registered_msg_def[data.name] = data
         self.events.register_message_definition.emit(data)
 
@@ -125,9 +215,16 @@ class OWTP:
         elif is_message_in(message, messages.RegisterMessageDefinition):
             self._register_message_definition(MessageDefinition(**message.data))
         elif is_message_in(message, messages.ConfirmMessage):
-            await self._sender._pass_response_and_wait(message)  # pyright: ignore[reportPrivateUsage] # pylint: disable=W0212
+            if "sequence" in message.data:
+                self._sender.confirm(message.data["sequence"])
+            else:
+                await self._sender.confirm_unsequenced(message)
         elif is_message_in(message, messages.ErrorMessage):
-            self._sender.retry(message.data["errorCode"])
+            self._sender.retry(
+                message.data["errorCode"],
+                message.data.get("sequence"),
+                message.data["packets"],
+            )
         elif is_message_in(message, messages.TransmissionReadyMessage):
             self.pause(False)
         elif is_message_in(message, messages.TransmissionNotReadyMessage):
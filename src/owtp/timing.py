@@ -0,0 +1,129 @@
+"Adapts the time buttons are held down and released for while sending packets, based on how reliably the Workshop mode receives them."
+
+import math
+from typing import TypedDict
+
+from ..logging import create_logger
+
+logger = create_logger("OWTP.Timing")
+
+TICK = 0.016
+
+MIN_TICKS = 1
+"The game samples buttons once per tick, so a button can't be held down or released for any shorter."
+
+MAX_TICKS = 15
+
+CLEAN_STREAK = 4
+"Number of frames confirmed in a row before the timing is shortened by a tick."
+
+MAX_CLEAN_STREAK = 128
+
+BACKOFF_FACTOR = 2
+
+
+class TimingState(TypedDict):
+    buttons_down_ticks: int
+    buttons_up_ticks: int
+
+
+class AdaptiveTiming:
+    """Shortens the time buttons are held down and released for by a tick whenever enough frames have been confirmed in a row, and lengthens it multiplicatively whenever a frame is corrupted or not confirmed in time.
+
+    Every failure also doubles the number of clean confirmations needed before the next shortening, so the timing settles right above the point where packets start getting lost instead of oscillating around it. Every clean streak halves it again, so conditions that have improved since are eventually picked up."""
+
+    def __init__(
+        self,
+        buttons_down_ticks: int,
+        buttons_up_ticks: int,
+        adaptive: bool = True,
+    ):
+        self.buttons_down_ticks = buttons_down_ticks
+        self.buttons_up_ticks = buttons_up_ticks
+        self.adaptive = adaptive
+
+        self._clean_streak = 0
+        self._clean_streak_needed = CLEAN_STREAK
+
+    @property
+    def down_time(self):
+        "Time (in seconds) a button is held down for."
+        return self.buttons_down_ticks * TICK
+
+    @property
+    def up_time(self):
+        "Time (in seconds) after a button is released before the next one is pressed."
+        return self.buttons_up_ticks * TICK
+
+    def snapshot(self) -> TimingState:
+        return {
+            "buttons_down_ticks": self.buttons_down_ticks,
+            "buttons_up_ticks": self.buttons_up_ticks,
+        }
+
+    def restore(self, state: TimingState):
+        "Continues from the timing tuned earlier, e.g. in a previous run of the application."
+        self.buttons_down_ticks = self._clamp(state["buttons_down_ticks"])
+        self.buttons_up_ticks = self._clamp(state["buttons_up_ticks"])
+
+    def record_success(self) -> bool:
+        "Records a frame confirmed by the Workshop mode. Returns whether the timing has changed."
+        if not self.adaptive:
+            return False
+
+        self._clean_streak += 1
+
+        if self._clean_streak < self._clean_streak_needed:
+            return False
+
+        self._clean_streak = 0
+        self._clean_streak_needed = max(
+            self._clean_streak_needed // 2, CLEAN_STREAK
+        )
+
+        # shorten the longer of the two, so both of them approach the limit evenly - releasing is usually the less demanding one
+        if self.buttons_up_ticks >= self.buttons_down_ticks:
+            if self.buttons_up_ticks > MIN_TICKS:
+                self.buttons_up_ticks -= 1
+                return self._log_change("Shortening")
+        elif self.buttons_down_ticks > MIN_TICKS:
+            self.buttons_down_ticks -= 1
+            return self._log_change("Shortening")
+
+        return False
+
+    def record_failure(self) -> bool:
+        "Records a frame that has been corrupted or hasn't been confirmed in time. Returns whether the timing has changed."
+        if not self.adaptive:
+            return False
+
+        self._clean_streak = 0
+        self._clean_streak_needed = min(
+            self._clean_streak_needed * 2, MAX_CLEAN_STREAK
+        )
+
+        previous = self.snapshot()
+        self.buttons_down_ticks = self._clamp(
+            math.ceil(self.buttons_down_ticks * BACKOFF_FACTOR)
+        )
+        self.buttons_up_ticks = self._clamp(
+            math.ceil(self.buttons_up_ticks * BACKOFF_FACTOR)
+        )
+
+        if self.snapshot() == previous:
+            return False
+
+        return self._log_change("Backing off")
+
+    def _log_change(self, action: str):
+        logger.info(
+            "%s timing of packets to %s ticks down, %s ticks up",
+            action,
+            self.buttons_down_ticks,
+            self.buttons_up_ticks,
+        )
+        return True
+
+    @staticmethod
+    def _clamp(ticks: int):
+        return max(MIN_TICKS, min(ticks, MAX_TICKS))
@@ -91,6 +91,14 @@ class IPlugin(ABC):
     def on_workshop_send_message_error(self, message: MessageOut, reason: str):
         "Called when failed to send message to the Workshop mode."
 
+    def on_workshop_send_message_expired(self, message: MessageOut):
+        "Called when message was discarded, because its deadline passed before it could be sent to the Workshop mode."
+
+    def on_workshop_send_message_replaced(
+        self, message: MessageOut, replacement: MessageOut
+    ):
+        "Called when message was discarded, because `replacement` with the same conflation key took its place in the queue before it could be sent to the Workshop mode."
+
     def on_workshop_send_message_finish(self, message: MessageOut):
         "Called when message was successfully sent to the Workshop mode."
 
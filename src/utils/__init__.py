@@ -1,5 +1,8 @@
 from .async_queue import *
 from .event_listener import *
+from .frozen import *
 from .helpers import *
+from .histogram import *
 from .key_value_pair import *
+from .lru_cache import *
 from .typeddict import *
@@ -1,5 +1,6 @@
 import asyncio
 import bisect
+from collections.abc import Hashable
 from dataclasses import dataclass, field
 
 
@@ -7,12 +8,15 @@ from dataclasses import dataclass, field
 class AsyncQueueItem[T]:
     priority: int
     item: T = field(compare=False)
+    key: Hashable | None = field(default=None, compare=False)
 
 
 class AsyncQueue[T]:
     def __init__(self):
         self._is_on = True
         self._queue: list[AsyncQueueItem[T]] = []
+        self._keyed: dict[Hashable, AsyncQueueItem[T]] = {}
+        "Queued items put with a key, so putting another item with the same key can replace them without searching the queue."
         self._cond = asyncio.Condition()
         self._unfinished_tasks = 0
         self._finished = asyncio.Event()
@@ -27,27 +31,40 @@ class AsyncQueue[T]:
     def qsize(self) -> int:
         return len(self._queue)
 
-    async def put(self, item: T, priority: int) -> None:
+    async def put(
+        self, item: T, priority: int, key: Hashable | None = None
+    ) -> T | None:
+        "Puts `item` into the queue. If an item with the same `key` is still queued, `item` takes its place instead and the replaced item is returned."
         async with self._cond:
             if not self._is_on:
                 raise RuntimeError("Queue is shut down")
 
+            if (replaced := self._replace(item, key)) is not None:
+                return replaced
+
             # self._queue.append(item))
-            bisect.insort(
-                self._queue, AsyncQueueItem(priority=priority, item=item)
-            )
-            self._unfinished_tasks += 1
-            self._finished.clear()
+            self._insert(item, priority, key)
             self._cond.notify()
-
-    def put_nowait(self, item: T, priority: int) -> None:
+            return None
+
+    def put_nowait(
+        self,
+        item: T,
+        priority: int,
+        key: Hashable | None = None,
+        first: bool = False,
+    ) -> T | None:
+        """Puts `item` into the queue. If an item with the same `key` is still queued, `item` takes its place instead and the replaced item is returned.
+
+        If `first`, `item` goes in front of queued items of the same priority, e.g. when it's put back after being taken from the queue."""
         if not self._is_on:
             raise RuntimeError("Queue is shut down")
 
+        if (replaced := self._replace(item, key)) is not None:
+            return replaced
+
         # self._queue.append(item)
-        bisect.insort(self._queue, AsyncQueueItem(priority=priority, item=item))
-        self._unfinished_tasks += 1
-        self._finished.clear()
+        self._insert(item, priority, key, first)
 
         try:
             loop = asyncio.get_running_loop()
@@ -62,25 +79,41 @@ class AsyncQueue[T]:
 
             loop.create_task(_notify())
 
+        return None
+
     async def remove(self, item: T) -> None:
         async with self._cond:
             if item in self.items():
-                self._queue = [t for t in self._queue if t.item != item]
+                self._queue = [
+                    t for t in self._queue if not self._drop(t, item)
+                ]
                 self.task_done()
                 self._cond.notify()
 
     def remove_nowait(self, item: T) -> None:
         if item in self.items():
-            self._queue = [t for t in self._queue if t.item != item]
+            self._queue = [
+                t for t in self._queue if not self._drop(t, item)
+            ]
             self.task_done()
 
+    def peek_nowait(self) -> T | None:
+        "Returns the next item without removing it from the queue, or `None` if the queue is empty."
+        return self._queue[0].item if self._queue else None
+
+    def get_nowait(self) -> T:
+        if not self._queue:
+            raise asyncio.QueueEmpty()
+
+        return self._pop()
+
     async def get(self) -> T:
         async with self._cond:
             while not self._queue:
                 if not self._is_on:
                     raise RuntimeError("Queue is shut down")
                 await self._cond.wait()
-            return self._queue.pop(0).item
+            return self._pop()
 
     def task_done(self) -> None:
         if self._unfinished_tasks <= 0:
@@ -112,3 +145,48 @@ class AsyncQueue[T]:
 
     def items(self) -> list[T]:
         return list(i.item for i in self._queue)
+
+    def _insert(
+        self,
+        item: T,
+        priority: int,
+        key: Hashable | None,
+        first: bool = False,
+    ):
+        queue_item = AsyncQueueItem(priority=priority, item=item, key=key)
+        (bisect.insort_left if first else bisect.insort)(
+            self._queue, queue_item
+        )
+
+        if key is not None:
+            self._keyed[key] = queue_item
+
+        self._unfinished_tasks += 1
+        self._finished.clear()
+
+    def _replace(self, item: T, key: Hashable | None) -> T | None:
+        "Swaps the item queued with `key` for `item`, keeping its position in the queue. Returns the replaced item, or `None` if there's none."
+        if key is None or (queue_item := self._keyed.get(key)) is None:
+            return None
+
+        replaced = queue_item.item
+        queue_item.item = item
+        return replaced
+
+    def _pop(self) -> T:
+        queue_item = self._queue.pop(0)
+
+        if queue_item.key is not None:
+            del self._keyed[queue_item.key]
+
+        return queue_item.item
+
+    def _drop(self, queue_item: AsyncQueueItem[T], item: T) -> bool:
+        "Whether `queue_item` holds `item`, forgetting its key if it does."
+        if queue_item.item != item:
+            return False
+
+        if queue_item.key is not None:
+            del self._keyed[queue_item.key]
+
+        return True
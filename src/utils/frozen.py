@@ -0,0 +1,38 @@
+from typing import Any, NoReturn
+
+
+def _immutable(self: Any, *_: Any, **__: Any) -> NoReturn:
+    raise TypeError(f"{type(self).__name__} is immutable")
+
+
+class FrozenDict[K, V](dict[K, V]):
+    "Read-only `dict`. Being a `dict` subclass, it can still be serialized to JSON or passed anywhere a `dict` is expected."
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList[T](list[T]):
+    "Read-only `list`. Being a `list` subclass, it can still be serialized to JSON or passed anywhere a `list` is expected."
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = (
+        _immutable
+    )
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    "Recursively converts dicts and lists inside `value` into :class:`FrozenDict` and :class:`FrozenList`."
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})  # pyright: ignore[reportUnknownVariableType]
+
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)  # pyright: ignore[reportUnknownVariableType]
+
+    return value
@@ -0,0 +1,85 @@
+import bisect
+import math
+from typing import TypedDict
+
+HISTOGRAM_MIN = 1e-4
+"Upper bound (in seconds) of the first bucket of :class:`LatencyHistogram`."
+HISTOGRAM_MAX = 60.0
+"Upper bound (in seconds) of the last bucket of :class:`LatencyHistogram` - anything above ends up in an overflow bucket."
+HISTOGRAM_BUCKETS_PER_DOUBLING = 4
+
+
+class HistogramSummary(TypedDict):
+    count: int
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+
+
+class LatencyHistogram:
+    "Histogram of latencies (in seconds) with logarithmically sized buckets, cheap enough to record every sample."
+
+    _bounds: list[float] = [
+        HISTOGRAM_MIN * 2 ** (i / HISTOGRAM_BUCKETS_PER_DOUBLING)
+        for i in range(
+            math.ceil(
+                math.log2(HISTOGRAM_MAX / HISTOGRAM_MIN)
+                * HISTOGRAM_BUCKETS_PER_DOUBLING
+            )
+            + 1
+        )
+    ]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float):
+        value = max(value, 0.0)
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        "Returns upper bound of the bucket containing given percentile of recorded values."
+        if not self.count:
+            return 0.0
+
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+
+        for idx, count in enumerate(self._counts):
+            seen += count
+
+            if seen >= rank:
+                # clamp to the actual range of recorded values
+                bound = self._bounds[idx] if idx < len(self._bounds) else self.max
+                return min(max(bound, self.min), self.max)
+
+        return self.max
+
+    def summary(self) -> HistogramSummary:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
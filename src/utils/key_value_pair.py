@@ -1,4 +1,20 @@
-from typing import Any, TypeGuard, cast
+from collections.abc import Callable
+from types import NoneType, UnionType
+from typing import (
+    Any,
+    TypeGuard,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+    get_type_hints,
+    is_typeddict,
+)
+
+type KeyValuePairDecoder[T] = Callable[[list[Any]], T]
+"Converts an array of key value pairs straight into a validated structure."
+
+type _Converter = Callable[[Any], Any]
 
 
 def is_key_value_pair(data: Any) -> TypeGuard[list[tuple[str, Any]]]:
@@ -26,3 +42,119 @@ def key_value_pair_to_dict(data: list[tuple[str, Any]]) -> dict[str, Any]:
         )
 
     return dictionary
+
+
+def _expect(value: Any, t: type | tuple[type, ...]):
+    if not isinstance(value, t):
+        raise TypeError(f"Expected {t}, got {value!r}")
+
+    return value
+
+
+def _expect_number(value: Any) -> int | float:
+    # `bool` is a subclass of `int`, but booleans should never be treated as numbers
+    if isinstance(value, bool):
+        raise TypeError(f"Expected a number, got {value!r}")
+
+    return _expect(value, (int, float))
+
+
+def _to_int(value: Any) -> int:
+    value = _expect_number(value)
+
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise TypeError(f"Expected an integer, got {value!r}")
+        return int(value)
+
+    return value
+
+
+def _to_float(value: Any) -> float:
+    return float(_expect_number(value))
+
+
+def _to_any(value: Any) -> Any:
+    return key_value_pair_to_dict(value) if is_key_value_pair(value) else value
+
+
+def _compile_converter(t: Any) -> _Converter:
+    origin = get_origin(t) or t
+    args = get_args(t)
+
+    if is_typeddict(t):
+        return compile_key_value_pair_decoder(t)
+
+    if origin in (Union, UnionType):
+        converters = [_compile_converter(arm) for arm in args]
+
+        def convert_union(value: Any):
+            for converter in converters:
+                try:
+                    return converter(value)
+                except (TypeError, KeyError):
+                    pass
+
+            raise TypeError(f"Expected {t}, got {value!r}")
+
+        return convert_union
+
+    if origin is list:
+        item = _compile_converter(args[0]) if args else _to_any
+        return lambda value: [item(v) for v in _expect(value, list)]
+
+    if origin is dict:
+        item = _compile_converter(args[1]) if args else _to_any
+
+        def convert_dict(value: Any):
+            if not is_key_value_pair(value):
+                raise TypeError(f"Expected key value pairs, got {value!r}")
+
+            return {k: item(v) for k, v in value}
+
+        return convert_dict
+
+    if t is int:
+        return _to_int
+
+    if t is float:
+        return _to_float
+
+    if t in (str, bool, NoneType):
+        return lambda value: _expect(value, t)
+
+    return _to_any
+
+
+def compile_key_value_pair_decoder[T](
+    structure: type[T],
+) -> KeyValuePairDecoder[T]:
+    "Compiles a decoder converting an array of key value pairs into a `structure` TypedDict in a single pass, converting and validating values of every key. Keys not present in `structure` are skipped."
+    converters = {
+        key: _compile_converter(t)
+        for key, t in get_type_hints(structure).items()
+    }
+    required: frozenset[str] = getattr(
+        structure, "__required_keys__", frozenset()
+    )
+
+    def decode(data: list[Any]) -> T:
+        result: dict[str, Any] = {}
+
+        for item in _expect(data, list):
+            if not isinstance(item, list) or len(item) != 2:  # pyright: ignore[reportUnknownArgumentType]
+                raise TypeError(f"Expected a key value pair, got {item!r}")
+
+            key, value = cast(list[Any], item)
+            converter = converters.get(key)
+
+            if converter:
+                result[key] = converter(value)
+
+        missing = required - result.keys()
+        if missing:
+            raise KeyError(f"Missing keys {sorted(missing)}")
+
+        return cast(T, result)
+
+    return decode
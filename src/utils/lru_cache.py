@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class LRUCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class LRUCache[K, V]:
+    "Bounded mapping discarding the least recently used entries once it's full."
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError(
+                f"Size of the cache must be positive, passed {max_size}"
+            )
+
+        self._max_size = max_size
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self.stats = LRUCacheStats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def get(self, key: K) -> V | None:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: K, value: V):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
@@ -1,4 +1,29 @@
-from typing import Any, get_origin
+from types import UnionType
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+
+def _validate_value(val: Any, t: Any, path: str):
+    origin_t = get_origin(t) or t
+
+    if origin_t in (Union, UnionType):
+        for arm in get_args(t):
+            try:
+                _validate_value(val, arm, path)
+                return
+            except (TypeError, KeyError):
+                pass
+
+        raise TypeError(f'Value at "{path}" must be a {t}')
+
+    # JSON doesn't differentiate between integers and floats
+    if origin_t is float:
+        origin_t = int | float
+
+    if hasattr(t, "__annotations__"):
+        validate_dict(val, t, path)
+    elif not isinstance(val, origin_t):
+        type_name = getattr(t, "__name__", str(t))
+        raise TypeError(f'Value at "{path}" must be a {type_name}')
 
 
 def validate_dict(data: Any, typeddict: type[Any], path: str = ""):
@@ -8,17 +33,17 @@ def validate_dict(data: Any, typeddict: type[Any], path: str = ""):
     if not hasattr(typeddict, "__annotations__"):
         raise TypeError("'typeddict' must be a TypedDict")
 
-    for k, t in typeddict.__annotations__.items():
+    optional_keys: frozenset[str] = getattr(
+        typeddict, "__optional_keys__", frozenset()
+    )
+
+    for k, t in get_type_hints(typeddict).items():
         path_k = f"{(path + '.') if path else ''}{k}"
 
         if k not in data:
-            raise KeyError(f'Missing key "{path_k}"')
+            if k in optional_keys:
+                continue
 
-        origin_t = get_origin(t) or t
-        val = data[k]  # pyright: ignore[reportUnknownVariableType]
+            raise KeyError(f'Missing key "{path_k}"')
 
-        if hasattr(t, "__annotations__"):
-            validate_dict(val, t, f"{(path + '.') if path else ''}{k}")
-        elif not isinstance(val, origin_t):
-            type_name = getattr(t, "__name__", str(t))
-            raise TypeError(f'Value at "{path_k}" must be a {type_name}')
+        _validate_value(data[k], t, path_k)
@@ -0,0 +1,197 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any, TypedDict
+
+from scripts.simulation.link import SimulatedLink
+from src.owtp import (
+    RETRANSMISSION_WINDOW,
+    SEQUENCE_SPACE,
+    DefineMessageOut,
+    Feature,
+    MessageDataType,
+    MessageDefinition,
+    MessageOut,
+    define_message_out,
+)
+from src.owtp.dispatcher import PREEMPTING_PRIORITY
+
+TIMEOUT = 10
+RESPONSE_DELAY = 0.01
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+KICK = MessageDefinition(
+    "KICK", [4, 5], {"slot": MessageDataType.NUMBER.value}
+)
+LONG_TEXT = "the quick brown fox jumps over the lazy dog, " * 2
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+class KickData(TypedDict):
+    slot: int
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+UrgentChat: DefineMessageOut[ChatData] = define_message_out(
+    CHAT.name, PREEMPTING_PRIORITY - 1
+)
+Kick: DefineMessageOut[KickData] = define_message_out(KICK.name)
+
+
+def _run(test: Callable[[], Coroutine[Any, Any, None]]):
+    asyncio.run(asyncio.wait_for(test(), TIMEOUT))
+
+
+async def _wait_until(condition: Callable[[], bool]):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+class _Results:
+    "Messages that have been started, sent and failed."
+
+    def __init__(self, link: SimulatedLink):
+        self.started: list[MessageOut] = []
+        self.finished: list[MessageOut] = []
+        self.failed: list[MessageOut] = []
+
+        events = link.owtp.events
+        events.send_message_start.on(self.started.append)
+        events.send_message_finish.on(self.finished.append)
+        events.send_message_error.on(
+            lambda message, _: self.failed.append(message)
+        )
+
+    @property
+    def done(self):
+        return len(self.finished) + len(self.failed)
+
+
+async def _connect(features: list[Feature], **owtp_options: Any):
+    link = SimulatedLink(
+        [CHAT, KICK],
+        features,
+        RESPONSE_DELAY,
+        adaptive_timing=False,
+        **owtp_options,
+    )
+    await link.connect()
+    return link, _Results(link)
+
+
+def _texts(link: SimulatedLink):
+    return [message.text for message in link.workshop.received[1:]]
+
+
+def test_sequence_numbers_wrap():
+    async def test():
+        link, results = await _connect([Feature.PIPELINING], window_size=4)
+        sender = link.owtp._sender  # pyright: ignore[reportPrivateUsage]
+        sender._next_sequence = SEQUENCE_SPACE - 3  # pyright: ignore[reportPrivateUsage]
+
+        for idx in range(8):
+            link.owtp.add_message(Chat({"text": f"hello {idx}"}))
+
+        await _wait_until(lambda: results.done == 8)
+        link.owtp.cleanup()
+
+        assert len(results.finished) == 8
+        assert sender._next_sequence == 5  # pyright: ignore[reportPrivateUsage]
+        assert not link.workshop.errors
+        assert link.workshop.duplicates == 0
+        assert sorted(_texts(link)) == sorted(
+            f'"hello {idx}"' for idx in range(8)
+        )
+
+    _run(test)
+
+
+def test_sequence_waits_for_retransmission_window():
+    async def test():
+        link, _ = await _connect([Feature.PIPELINING])
+        sender = link.owtp._sender  # pyright: ignore[reportPrivateUsage]
+        oldest = await sender._take_sequence()  # pyright: ignore[reportPrivateUsage]
+        newest = (oldest + RETRANSMISSION_WINDOW) % SEQUENCE_SPACE
+        sender._next_sequence = newest  # pyright: ignore[reportPrivateUsage]
+
+        task = asyncio.create_task(sender._take_sequence())  # pyright: ignore[reportPrivateUsage]
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        # the oldest frame has been confirmed
+        del sender._acknowledgements[oldest]  # pyright: ignore[reportPrivateUsage]
+        sender._sequence_released.set()  # pyright: ignore[reportPrivateUsage]
+
+        assert await task == newest
+        link.owtp.cleanup()
+
+    _run(test)
+
+
+def test_failed_frame_split_in_half():
+    async def test():
+        link, results = await _connect([Feature.BATCHING])
+        link.rejected_ids.add(bytes(KICK.id))
+
+        link.owtp.add_message(Chat({"text": "gg"}))
+        link.owtp.add_message(Kick({"slot": 3}, number_of_attempts=1))
+        link.owtp.add_message(Chat({"text": "wp"}))
+        link.owtp.add_message(Chat({"text": "rematch?"}))
+
+        await _wait_until(lambda: results.done == 4)
+        link.owtp.cleanup()
+
+        assert [message.name for message in results.failed] == [KICK.name]
+        assert [message.data for message in results.finished] == [
+            {"text": "gg"},
+            {"text": "wp"},
+            {"text": "rematch?"},
+        ]
+
+    _run(test)
+
+
+def test_preempted_frame_requeued():
+    async def test():
+        link, results = await _connect([Feature.PREEMPTION])
+        packets = link.workshop.packets
+
+        link.owtp.add_message(Chat({"text": LONG_TEXT}))
+        await _wait_until(lambda: link.workshop.packets >= packets + 5)
+        link.owtp.add_message(UrgentChat({"text": "urgent"}))
+
+        await _wait_until(lambda: results.done == 2)
+        link.owtp.cleanup()
+
+        assert link.workshop.aborted == 1
+        assert _texts(link) == ['"urgent"', f'"{LONG_TEXT}"']
+        # the preempted message isn't started once again
+        assert len(results.started) == 2
+
+    _run(test)
+
+
+def test_removed_message_left_out_of_frame():
+    async def test():
+        link, results = await _connect(
+            [Feature.BATCHING, Feature.PREEMPTION], max_frame_size=128
+        )
+        packets = link.workshop.packets
+        kick = Kick({"slot": 1})
+
+        link.owtp.add_message(Chat({"text": LONG_TEXT}))
+        link.owtp.add_message(kick)
+        link.owtp.add_message(Chat({"text": "gg"}))
+        await _wait_until(lambda: link.workshop.packets >= packets + 5)
+        link.owtp.remove_message(kick)
+
+        await _wait_until(lambda: results.done == 3)
+        link.owtp.cleanup()
+
+        assert results.failed == [kick]
+        # the rest of the frame keeps its order
+        assert _texts(link) == [f'"{LONG_TEXT}"', '"gg"']
+
+    _run(test)
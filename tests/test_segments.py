@@ -0,0 +1,78 @@
+from typing import TypedDict
+
+import pytest
+
+from src.owtp import (
+    SEGMENT_SIZE,
+    DamagedSegments,
+    DefineMessageOut,
+    MessageDataType,
+    MessageDefinition,
+    SegmentReassembler,
+    add_parity,
+    count_segments,
+    damaged_segments,
+    define_message_out,
+    encode_repair,
+    segment_frame,
+)
+
+CHAT = MessageDefinition("CHAT", [2, 3], {"text": MessageDataType.STRING.value})
+
+
+class ChatData(TypedDict):
+    text: str
+
+
+Chat: DefineMessageOut[ChatData] = define_message_out(CHAT.name)
+
+
+def _frame():
+    message = Chat({"text": "the quick brown fox jumps over the lazy dog, " * 2})
+    message.prepare(CHAT)
+    return message.packets
+
+
+def _corrupt(frame: bytes, segment: int, offset: int = 3):
+    "Changes a packet of `segment` of a frame returned by :func:`segment_frame` to a different valid one."
+    position = 1 + segment * (SEGMENT_SIZE + 1) + offset
+    packets = bytearray(frame)
+    packets[position] = packets[position] % 95 + 1
+    return bytes(packets)
+
+
+def test_segmented_frame_round_trip():
+    frame = _frame()
+
+    assert SegmentReassembler().receive(segment_frame(frame)) == frame
+
+
+def test_damaged_segment_repaired():
+    frame = _frame()
+    segmented = segment_frame(frame)
+    reassembler = SegmentReassembler()
+
+    with pytest.raises(DamagedSegments) as error:
+        reassembler.receive(_corrupt(segmented, 1))
+
+    assert damaged_segments(segmented, error.value.packets) == [1]
+    assert reassembler.receive(encode_repair(segmented, [1])) == frame
+
+
+def test_parity_rebuilds_damaged_segments():
+    frame = _frame()
+    segmented = segment_frame(frame)
+    assert count_segments(segmented) >= 4
+
+    # consecutive segments fall into different groups
+    damaged = _corrupt(_corrupt(add_parity(segmented, 2), 1), 2)
+
+    assert SegmentReassembler(True).receive(damaged) == frame
+
+
+def test_parity_doesnt_repair_lost_packet():
+    sent = add_parity(segment_frame(_frame()), 2)
+
+    # every segment after the lost packet is shifted, so there are too many damaged ones to rebuild
+    with pytest.raises(DamagedSegments):
+        SegmentReassembler(True).receive(sent[:5] + sent[6:])